@@ -1,7 +1,19 @@
-from map2rml import Map2RML
-from automap.converters.rml2graph import map2graph
+from .map2rml import Map2RML, TranslationError, translate_directory
+from automap.converters.rml2graph import MappingError, map2graph
+from automap.converters.rmlmapper_pool import RMLMapperPool
+from automap.converters.rml_engine import UnsupportedMapping, materialize
+from automap.converters.ntriples import canonicalize_line, sort_ntriples, sort_ntriples_file
 
 __all__ = [
     "Map2RML",
-    "map2graph"
+    "TranslationError",
+    "translate_directory",
+    "MappingError",
+    "map2graph",
+    "RMLMapperPool",
+    "UnsupportedMapping",
+    "materialize",
+    "canonicalize_line",
+    "sort_ntriples",
+    "sort_ntriples_file",
 ]
@@ -1,27 +1,328 @@
+"""YARRRML to RML translation with yatter.
+
+Translations are cached on disk, keyed by the SHA-256 of the normalised YARRRML
+document (key order, formatting and comments play no part) and the yatter
+version, so a mapping generated again in a later run is not translated again.
+Exact duplicates are also found by the hash of their text, without parsing them.
+Documents are parsed with PyYAML's libyaml-based loader when it is available,
+restricted to the scalars YAML 1.1 and YAML 1.2 read alike; any other document
+is parsed with ruamel's pure-Python YAML 1.2 loader, as before.
+``translate_directory`` translates every YARRRML file of a directory in a pool
+of worker processes.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
 import yatter
-from ruamel.yaml import YAML
+import yaml
+from ruamel.yaml import YAML, YAMLError
+
+YARRRML_SUFFIXES = (".yml", ".yaml")
+
+
+def _default_cache_dir() -> Path:
+    return Path.home() / ".cache" / "automap" / "map2rml_cache"
+
+
+def _yatter_version() -> str:
+    try:
+        return version("yatter")
+    except PackageNotFoundError:
+        return getattr(yatter, "__version__", "unknown")
+
+
+class TranslationError(ValueError):
+    """The YARRRML mapping is empty, is not valid YAML, or yatter cannot translate it."""
+
+
+class _AmbiguousScalar(Exception):
+    """A scalar YAML 1.1 (PyYAML) and YAML 1.2 (ruamel) would load differently."""
+
+
+class _YamlLoader(getattr(yaml, "CSafeLoader", yaml.SafeLoader)):
+    """libyaml parser with YAML 1.2 scalar resolution for the scalars both versions agree on.
+
+    Plain scalars that PyYAML (YAML 1.1) and ruamel (YAML 1.2) read differently,
+    such as ``yes``/``on``, ``010``, ``0o10``, ``1_000``, ``1:20``, dates or
+    ``.inf``, ordered maps and duplicate keys (which ruamel rejects) raise
+    ``_AmbiguousScalar``.
+    """
+
+    yaml_implicit_resolvers: dict = {}
+
+    def construct_ambiguous(self, node):
+        raise _AmbiguousScalar(node.value)
+
+    def construct_mapping(self, node, deep=False):
+        keys = [self.construct_object(key_node, deep=True) for key_node, _ in node.value]
+        if len(set(map(repr, keys))) != len(keys):
+            raise _AmbiguousScalar("duplicate key")
+        return super().construct_mapping(node, deep)
+
+
+_AMBIGUOUS_TAG = "tag:automap,2025:ambiguous"
+for _tag, _pattern, _first in (
+    ("tag:yaml.org,2002:bool", r"(?:true|True|TRUE|false|False|FALSE)$", "tTfF"),
+    ("tag:yaml.org,2002:int", r"[-+]?(?:0|[1-9][0-9]*)$", "-+0123456789"),
+    ("tag:yaml.org,2002:float", r"[-+]?(?:[0-9]+\.[0-9]*(?:[eE][-+]?[0-9]+)?|\.[0-9]+)$", "-+0123456789."),
+    ("tag:yaml.org,2002:null", r"(?:~|null|Null|NULL|)$", ["~", "n", "N", ""]),
+    (_AMBIGUOUS_TAG, r"(?:y|Y|yes|Yes|YES|n|N|no|No|NO|on|On|ON|off|Off|OFF|<<|=)$", "yYnNoO<="),
+    # Numbers with leading zeros, bases, separators or exponents without a dot, sexagesimal numbers, dates
+    (_AMBIGUOUS_TAG, r"[-+]?(?:0[0-9a-zA-Z_]|[0-9][0-9_]*[_:]|[0-9]+[eE]|\.[0-9]+[eE]|\.(?:inf|Inf|INF)$)",
+     "-+0123456789."),
+    (_AMBIGUOUS_TAG, r"[0-9]{4}-[0-9]{1,2}-[0-9]{1,2}", "0123456789"),
+    (_AMBIGUOUS_TAG, r"\.(?:nan|NaN|NAN)$", "."),
+):
+    _YamlLoader.add_implicit_resolver(_tag, re.compile(_pattern), list(_first))
+for _tag in (_AMBIGUOUS_TAG, "tag:yaml.org,2002:omap", "tag:yaml.org,2002:pairs"):
+    _YamlLoader.add_constructor(_tag, _YamlLoader.construct_ambiguous)
+
+
+def _canonical(document) -> str:
+    """Serialise a loaded YARRRML document independently of its key order and formatting."""
+    try:
+        return json.dumps(document, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=repr)
+    except TypeError:
+        # Keys of mixed types cannot be sorted, their order is then part of the key
+        return json.dumps(document, separators=(",", ":"), ensure_ascii=False, default=repr)
 
 
 class Map2RML:
-    def __init__(self):
+    # Translations already made or read by this process, by cache key
+    _translated: dict[str, str] = {}
+
+    def __init__(self, cache_dir: Path | str | None = None, cache: bool = True):
+        """
+        Args:
+            cache_dir: Translation cache directory (default: ~/.cache/automap/map2rml_cache)
+            cache: Whether to read and write the cache
+        """
+        # ruamel's C parser is YAML 1.1 and rejects prefixed names in flow sequences ("[schema:name, $(name)]")
         self.yaml = YAML(typ="safe", pure=True)
+        self.cache_dir = Path(cache_dir) if cache_dir else _default_cache_dir()
+        self.cache = cache
+        self.yatter_version = _yatter_version()
+
+    def load(self, yarrrml_content: str):
+        """Load a YARRRML document, with libyaml when its scalars read the same in YAML 1.1 and 1.2."""
+        try:
+            return yaml.load(yarrrml_content, Loader=_YamlLoader)
+        except (_AmbiguousScalar, yaml.YAMLError):
+            # Also parse errors: they are reported by ruamel, as before
+            try:
+                return self.yaml.load(yarrrml_content)
+            except YAMLError as exc:
+                raise TranslationError(f"Invalid YARRRML document: {exc}") from exc
+
+    def cache_key(self, yaml_content) -> str:
+        """Content hash of a loaded YARRRML document and the yatter version."""
+        return self._key("document", _canonical(yaml_content))
+
+    def _key(self, kind: str, text: str) -> str:
+        digest = hashlib.sha256(f"{kind}\0".encode())
+        digest.update(text.encode("utf-8"))
+        digest.update(f"\0yatter {self.yatter_version}".encode())
+        return digest.hexdigest()
 
     def __call__(self, yarrrml_content: str) -> str:
         if not yarrrml_content:
-            raise ValueError("Input YARRRML string is empty")
+            raise TranslationError("Input YARRRML string is empty")
+
+        if not self.cache:
+            return _yatter_translate(self.load(yarrrml_content))
+
+        text_key = self._key("text", yarrrml_content)
+        rml_content = self._lookup(text_key)
+        if rml_content is not None:
+            return rml_content
+
+        yaml_content = self.load(yarrrml_content)
+        key = self.cache_key(yaml_content)
+        rml_content = self._lookup(key)
+        if rml_content is None:
+            rml_content = _yatter_translate(yaml_content)
+            if not isinstance(rml_content, str) or not rml_content:
+                return rml_content
+            self._store(key, rml_content)
+        self._store(text_key, rml_content)
+        return rml_content
 
-        yaml_content = self.yaml.load(yarrrml_content)
+    def _lookup(self, key: str) -> str | None:
+        rml_content = self._translated.get(key)
+        if rml_content is None:
+            try:
+                rml_content = (self.cache_dir / f"{key}.rml.ttl").read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                return None
+            self._translated[key] = rml_content
+        return rml_content
 
+    def _store(self, key: str, rml_content: str) -> None:
+        self._translated[key] = rml_content
+        try:
+            _write_text(self.cache_dir / f"{key}.rml.ttl", rml_content)
+        except OSError:
+            # If caching fails, just continue without cache
+            pass
+
+
+def _yatter_translate(yaml_content) -> str | None:
+    """Translate a loaded YARRRML document, raising ``TranslationError`` for what yatter raises."""
+    try:
         return yatter.translate(yaml_content)
+    except Exception as exc:
+        # yatter reports invalid mappings with bare Exceptions (and its own checks with None)
+        raise TranslationError(f"yatter cannot translate the mapping: {exc}") from exc
+
+
+def _write_text(path: Path, text: str) -> None:
+    """Replace ``path`` with ``text`` atomically, so concurrent readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp creates the file readable by its owner only, give it the default permissions
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+
+        with os.fdopen(fd, "w", encoding="utf-8") as output:
+            output.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+# Translator of each pool worker process, created by _init_worker
+_worker_map2rml: Map2RML | None = None
+
+
+def _init_worker(cache_dir: Path | None, cache: bool) -> None:
+    global _worker_map2rml
+    _worker_map2rml = Map2RML(cache_dir, cache)
+
+
+def _translate(yarrrml_content: str) -> str:
+    return _worker_map2rml(yarrrml_content)
+
+
+def _rml_path(mapping: Path) -> Path:
+    return mapping.with_name(f"{mapping.stem}.rml.ttl")
+
+
+def translate_directory(
+    directory: Path,
+    *,
+    workers: int | None = None,
+    cache_dir: Path | None = None,
+    cache: bool = True,
+) -> dict[Path, Path | Exception]:
+    """
+    Translate every YARRRML file under ``directory`` (recursively) to RML.
+
+    Each ``<name>.yml``/``<name>.yaml`` is translated to ``<name>.rml.ttl`` next
+    to it. Files with identical content are translated once. Mappings that would
+    write the same file (``a.yml`` and ``a.yaml``) are not translated, and get a
+    ``ValueError``.
+
+    Args:
+        directory: Directory holding the YARRRML mappings
+        workers: Number of worker processes (default: one per CPU)
+        cache_dir: Translation cache directory (default: ~/.cache/automap/map2rml_cache)
+        cache: Whether to read and write the translation cache
+
+    Returns:
+        dict: RML mapping path of each YARRRML mapping, or the exception its translation raised
+    """
+    mappings = sorted(
+        path for path in Path(directory).rglob("*") if path.suffix.lower() in YARRRML_SUFFIXES and path.is_file()
+    )
+
+    results: dict[Path, Path | Exception] = {}
+    by_output: dict[Path, list[Path]] = {}
+    for mapping in mappings:
+        by_output.setdefault(_rml_path(mapping), []).append(mapping)
+    for output, sources in by_output.items():
+        if len(sources) > 1:
+            for mapping in sources:
+                results[mapping] = ValueError(
+                    f"{output.name} would be written by {', '.join(source.name for source in sources)}"
+                )
+
+    by_content: dict[str, list[Path]] = {}
+    for mapping in mappings:
+        if mapping not in results:
+            by_content.setdefault(mapping.read_text(encoding="utf-8"), []).append(mapping)
+
+    if not by_content:
+        return {mapping: results[mapping] for mapping in mappings}
+
+    workers = min(workers or os.cpu_count() or 1, len(by_content))
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(cache_dir, cache)) as executor:
+        futures = {content: executor.submit(_translate, content) for content in by_content}
+        for content, future in futures.items():
+            try:
+                rml_content = future.result()
+                if not rml_content:
+                    raise ValueError("yatter produced no RML mapping")
+            except Exception as exc:
+                for mapping in by_content[content]:
+                    results[mapping] = exc
+                continue
+
+            for mapping in by_content[content]:
+                output = _rml_path(mapping)
+                _write_text(output, rml_content)
+                results[mapping] = output
+
+    return {mapping: results[mapping] for mapping in mappings}
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Translate a YARRRML mapping read from stdin to RML, or a directory of them"
+    )
+    parser.add_argument(
+        "--batch",
+        type=Path,
+        metavar="DIRECTORY",
+        help="Translate every .yml/.yaml file under DIRECTORY to <name>.rml.ttl next to it",
+    )
+    parser.add_argument("--workers", type=int, help="Number of worker processes for --batch (default: one per CPU)")
+    parser.add_argument("--cache-dir", type=Path, help="Translation cache directory")
+    parser.add_argument("--no-cache", action="store_true", help="Neither read nor write the translation cache")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
 
+    if args.batch is None:
+        yarrrml_str = sys.stdin.read()
 
-def main():
-    yarrrml_str = sys.stdin.read()
+        map2rml = Map2RML(args.cache_dir, not args.no_cache)
+        output = map2rml(yarrrml_str)
+        print(output)
+        return 0
 
-    map2rml = Map2RML()
-    output = map2rml(yarrrml_str)
-    print(output)
+    failed = False
+    results = translate_directory(args.batch, workers=args.workers, cache_dir=args.cache_dir, cache=not args.no_cache)
+    for mapping, result in results.items():
+        if isinstance(result, Exception):
+            print(f"Error: {mapping}: {result}", file=sys.stderr)
+            failed = True
+        else:
+            print(result, file=sys.stderr)
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
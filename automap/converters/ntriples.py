@@ -0,0 +1,348 @@
+"""Canonicalise and sort N-Triples files.
+
+Every line is rewritten in canonical N-Triples form (single spaces between
+terms, minimal escaping, lower-case language tags, plain literals instead of
+``xsd:string`` and canonical lexical forms for integers and booleans), and
+the result is sorted in byte order with a bounded-memory external merge sort
+and de-duplicated. The output is what ``compute_metrics.py --streaming``
+expects, and equivalent graphs produce identical files.
+"""
+
+import argparse
+import heapq
+import os
+import re
+import sys
+import tempfile
+from itertools import groupby
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+# Approximate number of characters held in memory before a sorted run is spilled to disk
+DEFAULT_BUFFER_SIZE = 64 * 1024 * 1024
+
+# Maximum number of runs merged at once (bounds the number of open files)
+MAX_OPEN_RUNS = 64
+
+_IRI = r'<[^>]*>'
+_BNODE = r'_:[^\s<>"]+?'
+_LITERAL = r'"(?:[^"\\]|\\.)*"(?:@[A-Za-z]+(?:-[A-Za-z0-9]+)*|\^\^<[^>]*>)?'
+_TRIPLE = re.compile(
+    rf'\s*({_IRI}|{_BNODE})\s*({_IRI})\s*({_IRI}|{_BNODE}|{_LITERAL})\s*\.\s*(?:#.*)?$'
+)
+_LITERAL_PARTS = re.compile(r'"((?:[^"\\]|\\.)*)"(?:@([A-Za-z0-9-]+)|\^\^<([^>]*)>)?$', re.DOTALL)
+_ESCAPE = re.compile(r'\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)', re.DOTALL)
+
+_ECHARS = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+_IRI_ESCAPED = set('<>"{}|^`\\')
+
+_INTEGER_TYPES = {
+    XSD + name for name in (
+        "integer", "int", "long", "short", "byte", "nonNegativeInteger", "nonPositiveInteger",
+        "positiveInteger", "negativeInteger", "unsignedLong", "unsignedInt", "unsignedShort", "unsignedByte",
+    )
+}
+_BOOLEANS = {"true": "true", "1": "true", "false": "false", "0": "false"}
+
+
+def _unescape(text: str) -> str:
+    def replace(match: re.Match) -> str:
+        escape = match.group(1)
+        if escape[0] in "uU" and len(escape) > 1:
+            return chr(int(escape[1:], 16))
+        if escape not in _ECHARS:
+            raise ValueError(f"Invalid escape sequence '\\{escape}'")
+        return _ECHARS[escape]
+
+    return _ESCAPE.sub(replace, text)
+
+
+def _canonical_iri(iri: str) -> str:
+    iri = _unescape(iri)
+    chars = [
+        f"\\u{ord(char):04X}" if char in _IRI_ESCAPED or ord(char) <= 0x20 else char
+        for char in iri
+    ]
+    return "<" + "".join(chars) + ">"
+
+
+def _canonical_lexical(lexical: str, datatype: str | None) -> str:
+    if datatype in _INTEGER_TYPES:
+        try:
+            return str(int(lexical.strip()))
+        except ValueError:
+            return lexical
+    if datatype == XSD + "boolean":
+        return _BOOLEANS.get(lexical.strip(), lexical)
+    return lexical
+
+
+def canonicalize_term(term: str) -> str:
+    """Return the canonical N-Triples form of a single term."""
+
+    if term.startswith("<"):
+        return _canonical_iri(term[1:-1])
+    if term.startswith("_:"):
+        return term
+
+    match = _LITERAL_PARTS.match(term)
+    if match is None:
+        raise ValueError(f"Invalid N-Triples term: {term!r}")
+    lexical, language, datatype = match.groups()
+
+    lexical = _unescape(lexical)
+    suffix = ""
+    if language:
+        suffix = "@" + language.lower()
+    elif datatype:
+        datatype = _canonical_iri(datatype)[1:-1]
+        lexical = _canonical_lexical(lexical, datatype)
+        if datatype != XSD + "string":
+            suffix = f"^^<{datatype}>"
+
+    lexical = (lexical.replace("\\", "\\\\").replace('"', '\\"')
+               .replace("\n", "\\n").replace("\r", "\\r"))
+    return f'"{lexical}"{suffix}'
+
+
+def canonicalize_line(line: str) -> str | None:
+    """
+    Return the canonical ``<s> <p> <o> .`` form of an N-Triples line.
+
+    Blank lines and comments yield ``None``.
+    """
+
+    stripped = line.strip()
+    if not stripped or stripped.startswith("#"):
+        return None
+
+    match = _TRIPLE.match(stripped)
+    if match is None:
+        raise ValueError(f"Invalid N-Triples line: {stripped!r}")
+    return " ".join(canonicalize_term(term) for term in match.groups()) + " ."
+
+
+def _iter_lines(lines: Iterable[str], canonicalize: bool) -> Iterator[str]:
+    for number, line in enumerate(lines, start=1):
+        if canonicalize:
+            try:
+                line = canonicalize_line(line)
+            except ValueError as exc:
+                raise ValueError(f"line {number}: {exc}") from None
+        else:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                line = None
+        if line is not None:
+            yield line
+
+
+def _write_run(lines: list[str], directory: Path, unique: bool) -> Path:
+    lines.sort()
+    fd, path = tempfile.mkstemp(dir=directory, suffix=".run")
+    with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as run:
+        for line in _dedupe(lines) if unique else lines:
+            run.write(line + "\n")
+    return Path(path)
+
+
+def _read_run(path: Path) -> Iterator[str]:
+    with open(path, "r", encoding="utf-8", newline="\n") as run:
+        for line in run:
+            yield line[:-1]
+
+
+def _dedupe(lines: Iterable[str]) -> Iterator[str]:
+    return (line for line, _ in groupby(lines))
+
+
+def _merge_runs(runs: list[Path], directory: Path, unique: bool) -> Iterator[str]:
+    """Merge sorted runs, in several passes if there are more than MAX_OPEN_RUNS."""
+
+    while len(runs) > MAX_OPEN_RUNS:
+        merged_runs = []
+        for start in range(0, len(runs), MAX_OPEN_RUNS):
+            batch = runs[start:start + MAX_OPEN_RUNS]
+            fd, path = tempfile.mkstemp(dir=directory, suffix=".run")
+            with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as run:
+                merged = heapq.merge(*(_read_run(batch_run) for batch_run in batch))
+                for line in _dedupe(merged) if unique else merged:
+                    run.write(line + "\n")
+            for batch_run in batch:
+                batch_run.unlink()
+            merged_runs.append(Path(path))
+        runs = merged_runs
+
+    merged = heapq.merge(*(_read_run(run) for run in runs))
+    return _dedupe(merged) if unique else merged
+
+
+def sort_ntriples(
+    lines: Iterable[str],
+    output: IO[str],
+    *,
+    canonicalize: bool = True,
+    unique: bool = True,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    temp_dir: Path | None = None,
+) -> int:
+    """
+    Sort N-Triples lines in byte order with a bounded-memory external merge sort.
+
+    Lines are buffered until about ``buffer_size`` characters, then sorted and
+    spilled to a temporary run; the runs are finally merged into ``output``.
+
+    Args:
+        lines: Input N-Triples lines
+        output: Text stream the sorted lines are written to
+        canonicalize: Rewrite every line in canonical N-Triples form first
+        unique: Drop duplicate lines
+        buffer_size: Approximate number of characters kept in memory
+        temp_dir: Directory for the spilled runs (system default if not provided)
+
+    Returns:
+        int: Number of lines written
+    """
+
+    written = 0
+    with tempfile.TemporaryDirectory(prefix="automap-sort-", dir=temp_dir) as tmpdir:
+        directory = Path(tmpdir)
+        runs: list[Path] = []
+        buffer: list[str] = []
+        buffered = 0
+
+        for line in _iter_lines(lines, canonicalize):
+            buffer.append(line)
+            buffered += len(line) + 64
+            if buffered >= buffer_size:
+                runs.append(_write_run(buffer, directory, unique))
+                buffer, buffered = [], 0
+
+        if runs:
+            if buffer:
+                runs.append(_write_run(buffer, directory, unique))
+            sorted_lines = _merge_runs(runs, directory, unique)
+        else:
+            buffer.sort()
+            sorted_lines = _dedupe(buffer) if unique else buffer
+
+        for line in sorted_lines:
+            output.write(line + "\n")
+            written += 1
+
+    return written
+
+
+def _read_files(paths: Iterable[Path]) -> Iterator[str]:
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as graph_file:
+            yield from graph_file
+
+
+def _sort_into(lines: Iterable[str], destination: Path, **kwargs) -> int:
+    destination = Path(destination).resolve()
+    destination.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write next to the destination and rename, so the destination may also be an input
+    fd, tmp_path = tempfile.mkstemp(dir=destination.parent, prefix=f".{destination.name}.", suffix=".tmp")
+    try:
+        # mkstemp creates the file readable by its owner only, give it the default permissions
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+
+        with os.fdopen(fd, "w", encoding="utf-8", newline="\n") as output:
+            written = sort_ntriples(lines, output, **kwargs)
+        os.replace(tmp_path, destination)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return written
+
+
+def sort_ntriples_file(
+    source: Path | Iterable[Path],
+    destination: Path,
+    **kwargs,
+) -> int:
+    """
+    Sort one or more N-Triples files into ``destination``.
+
+    The destination is replaced atomically, so it may be one of the sources.
+    Keyword arguments are passed to ``sort_ntriples``.
+
+    Returns:
+        int: Number of lines written
+    """
+
+    sources = [Path(source)] if isinstance(source, (str, Path)) else [Path(path) for path in source]
+    return _sort_into(_read_files(sources), destination, **kwargs)
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Canonicalise, sort and de-duplicate N-Triples files"
+    )
+    parser.add_argument(
+        "inputs",
+        type=Path,
+        nargs="*",
+        help="N-Triples files to sort. Reads stdin if none is given",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="File to write the sorted graph to (may be an input). Defaults to stdout",
+    )
+    parser.add_argument(
+        "--no-canonicalize",
+        action="store_true",
+        help="Sort the lines as they are, without rewriting the terms",
+    )
+    parser.add_argument(
+        "--keep-duplicates",
+        action="store_true",
+        help="Do not remove duplicate triples",
+    )
+    parser.add_argument(
+        "--buffer-size",
+        type=int,
+        default=DEFAULT_BUFFER_SIZE,
+        help="Approximate number of characters sorted in memory per run",
+    )
+    parser.add_argument(
+        "--temp-dir",
+        type=Path,
+        help="Directory for the temporary sorted runs",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    options = {
+        "canonicalize": not args.no_canonicalize,
+        "unique": not args.keep_duplicates,
+        "buffer_size": args.buffer_size,
+        "temp_dir": args.temp_dir,
+    }
+
+    lines = _read_files(args.inputs) if args.inputs else sys.stdin
+
+    try:
+        if args.output is not None:
+            _sort_into(lines, args.output, **options)
+        else:
+            sort_ntriples(lines, sys.stdout, **options)
+    except Exception as exc:  # pragma: no cover - thin wrapper
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    sys.exit(main())
@@ -5,7 +5,17 @@ import shutil
 import subprocess
 import sys
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Iterator
+
+from rdflib import Graph, Literal, Namespace, RDF, URIRef
+from rdflib.util import guess_format
+
+from automap.converters.ntriples import sort_ntriples_file
+
+if TYPE_CHECKING:  # pragma: no cover - the pool imports this module
+    from automap.converters.rmlmapper_pool import RMLMapperPool
 
 
 def _escape_property_value(value: Path) -> str:
@@ -16,6 +26,26 @@ def _escape_property_value(value: Path) -> str:
     return text.replace("\n", "\\n")
 
 
+RML = Namespace("http://semweb.mmlab.be/ns/rml#")
+RML_CORE = Namespace("http://w3id.org/rml/")
+R2RML = Namespace("http://www.w3.org/ns/r2rml#")
+QL_CSV = URIRef("http://semweb.mmlab.be/ns/ql#CSV")
+
+# Mapping features whose triples depend on rows of other shards, or that produce quads
+_UNSHARDABLE = (
+    R2RML.parentTriplesMap, RML_CORE.parentTriplesMap,
+    R2RML.graphMap, R2RML.graph, RML_CORE.graphMap, RML_CORE.graph,
+)
+# Blank node labels are counters of each RMLMapper run: merging shards would conflate distinct nodes
+_BLANK_NODE_TERM_TYPES = ((R2RML.termType, R2RML.BlankNode), (RML_CORE.termType, RML_CORE.BlankNode))
+
+_SIZE_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+
+
+class MappingError(RuntimeError):
+    """The mapping was run but failed, or produced no triples."""
+
+
 def _validate_path(path: Path | None, description: str) -> Path | None:
     if path is None:
         return None
@@ -50,11 +80,10 @@ def _run_mapper(
     parameters: Path | None,
     *,
     working_directory: Path | None = None,
+    pool: "RMLMapperPool | None" = None,
+    java_options: list[str] | None = None,
 ) -> subprocess.CompletedProcess[str]:
-    command = [
-        "java",
-        "-jar",
-        str(mapper),
+    arguments = [
         "-m",
         str(mapping),
         "-o",
@@ -64,10 +93,17 @@ def _run_mapper(
     ]
 
     if parameters is not None:
-        command.extend(["-p", str(parameters)])
+        arguments.extend(["-p", str(parameters)])
+
+    # A warm JVM of the pool if it runs this jar with these options (e.g. the same -Xmx),
+    # a fresh one otherwise (or if the pool's one failed)
+    if pool is not None and pool.rmlmapper == mapper and pool.java_options == (java_options or []):
+        result = pool.run(arguments, working_directory or Path.cwd())
+        if result is not None:
+            return result
 
     return subprocess.run(
-        command,
+        ["java", *(java_options or []), "-jar", str(mapper), *arguments],
         check=False,
         capture_output=True,
         text=True,
@@ -75,6 +111,189 @@ def _run_mapper(
     )
 
 
+def _csv_sources(mapping: Graph, base: Path) -> dict[Path, list[tuple]]:
+    """CSV files read by the logical sources of ``mapping``, with the triples naming them."""
+
+    sources: dict[Path, list[tuple]] = {}
+    for rml in (RML, RML_CORE):
+        for logical_source, source in mapping.subject_objects(rml.source):
+            # rml:source "file.csv" (legacy RML) or rml:source [ rml:path "file.csv" ] (RML-core)
+            if isinstance(source, Literal):
+                naming = (logical_source, rml.source, source)
+            else:
+                path = mapping.value(source, rml.path)
+                if not isinstance(path, Literal):
+                    continue
+                naming = (source, rml.path, path)
+
+            formulation = mapping.value(logical_source, rml.referenceFormulation)
+            if formulation not in (QL_CSV, RML_CORE.CSV) and not str(naming[2]).lower().endswith(".csv"):
+                continue
+            path = base / str(naming[2])
+            if path.is_file():
+                sources.setdefault(path.resolve(), []).append(naming)
+    return sources
+
+
+def _csv_records(csv_file: BinaryIO) -> Iterator[bytes]:
+    """Raw CSV records of ``csv_file``; quoted fields may span several lines."""
+
+    lines: list[bytes] = []
+    quotes = 0
+    for line in csv_file:
+        lines.append(line)
+        # Escaped quotes are doubled, so a record ends on a line leaving an even number of them
+        quotes += line.count(b'"')
+        if quotes % 2 == 0:
+            yield b"".join(lines)
+            lines, quotes = [], 0
+    if lines:
+        yield b"".join(lines)
+
+
+def _split_csv(source: Path, shards: int, directory: Path) -> list[Path]:
+    """Split ``source`` into at most ``shards`` row ranges of similar size, each with the header."""
+
+    paths: list[Path] = []
+    with open(source, "rb") as csv_file:
+        records = _csv_records(csv_file)
+        header = next(records, b"")
+        target = (source.stat().st_size - len(header)) / shards
+
+        shard = None
+        written = 0
+        try:
+            for record in records:
+                if shard is None or (written >= target and len(paths) < shards):
+                    if shard is not None:
+                        shard.close()
+                    paths.append(directory / f"{source.stem}.{len(paths)}{source.suffix}")
+                    shard = open(paths[-1], "wb")
+                    shard.write(header if header.endswith(b"\n") else header + b"\n")
+                    written = 0
+                shard.write(record)
+                written += len(record)
+        finally:
+            if shard is not None:
+                shard.close()
+    return paths
+
+
+def _parse_size(size: str) -> int:
+    """Bytes of a JVM memory size such as ``512m`` or ``4g``."""
+
+    unit = size[-1:].lower() if size[-1:].isalpha() else ""
+    return int(size[: len(size) - len(unit)]) * _SIZE_UNITS[unit]
+
+
+def _java_options(max_heap: str | None) -> list[str]:
+    """JVM options of an RMLMapper run with at most ``max_heap`` of heap."""
+
+    return [f"-Xmx{max_heap}"] if max_heap else []
+
+
+def _shard_workers(shards: int, max_heap: str | None) -> int:
+    """Concurrent shard runs: one per CPU, as long as their JVM heaps fit in memory."""
+
+    workers = min(shards, os.cpu_count() or 1)
+    try:
+        memory = os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        return workers
+    # Without -Xmx the JVM may grow its heap up to a quarter of the physical memory
+    heap = _parse_size(max_heap) if max_heap else memory // 4
+    return max(1, min(workers, memory // heap))
+
+
+def _run_sharded(
+    mapper: Path,
+    mapping: Path,
+    destination: Path,
+    parameters: Path | None,
+    shards: int,
+    directory: Path,
+    *,
+    max_heap: str | None = None,
+    pool: "RMLMapperPool | None" = None,
+) -> bool:
+    """Run ``mapping`` over row-range shards of its largest CSV source, concurrently.
+
+    The shard outputs are concatenated, canonicalised, sorted and de-duplicated
+    into ``destination`` (N-Triples). Returns False, without running anything,
+    when the mapping cannot be sharded: it joins triples maps, assigns named
+    graphs or generates blank nodes, or it reads no local CSV file. The caller then runs it as a whole.
+    """
+
+    try:
+        graph = Graph().parse(mapping, format=guess_format(str(mapping)) or "turtle")
+    except Exception:
+        return False
+    if any(next(graph.triples((None, predicate, None)), None) for predicate in _UNSHARDABLE):
+        return False
+    if any((None, predicate, term_type) in graph for predicate, term_type in _BLANK_NODE_TERM_TYPES):
+        return False
+
+    sources = _csv_sources(graph, mapping.parent)
+    if not sources:
+        return False
+    source = max(sources, key=lambda path: path.stat().st_size)
+    shard_paths = _split_csv(source, shards, directory)
+    if len(shard_paths) < 2:
+        return False
+
+    # Triples maps over other sources run in the first shard only
+    sharded = {node for node, _, _ in sources[source]}
+    other_maps = [
+        triples_map
+        for rml in (RML, RML_CORE)
+        for triples_map, logical_source in graph.subject_objects(rml.logicalSource)
+        if logical_source not in sharded and graph.value(logical_source, rml.source) not in sharded
+    ]
+
+    jobs = []
+    for index, shard_path in enumerate(shard_paths):
+        shard_graph = Graph()
+        for triple in graph:
+            shard_graph.add(triple)
+        for subject, predicate, path in sources[source]:
+            shard_graph.remove((subject, predicate, path))
+            shard_graph.add((subject, predicate, Literal(str(shard_path))))
+        if index:
+            for triples_map in other_maps:
+                shard_graph.remove((triples_map, None, None))
+
+        shard_mapping = directory / f"mapping.{index}.ttl"
+        shard_graph.serialize(shard_mapping, format="turtle")
+        jobs.append((shard_mapping, directory / f"graph.{index}.nq"))
+
+    java_options = _java_options(max_heap)
+    with ThreadPoolExecutor(_shard_workers(len(jobs), max_heap)) as executor:
+        results = list(executor.map(
+            lambda job: _run_mapper(
+                mapper,
+                job[0],
+                job[1],
+                "nquads",
+                parameters,
+                working_directory=mapping.parent,
+                pool=pool,
+                java_options=java_options,
+            ),
+            jobs,
+        ))
+
+    for result in results:
+        if result.returncode != 0:
+            raise MappingError(
+                "RMLMapper failed with exit code "
+                f"{result.returncode}: {result.stderr.strip()}"
+            )
+
+    outputs = [output for _, output in jobs if output.exists()]
+    sort_ntriples_file(outputs, destination, temp_dir=directory)
+    return True
+
+
 def map2graph(
     mapping: Path,
     ontology: Path | None = None,
@@ -82,8 +301,30 @@ def map2graph(
     output: Path | None = None,
     serialization: str = "turtle",
     rmlmapper: Path | None = None,
+    pool: "RMLMapperPool | None" = None,
+    shards: int | None = None,
+    max_heap: str | None = None,
+    in_process: bool = False,
 ) -> Path:
-    """Execute the RML ``mapping`` and return the path to the generated graph."""
+    """Execute the RML ``mapping`` and return the path to the generated graph.
+
+    With a started ``pool`` (see ``RMLMapperPool``) the mapping runs on one of its
+    warm JVMs instead of a new ``java -jar`` process, if they were started with
+    the same ``max_heap`` (``java_options``).
+
+    With ``shards``, the largest CSV source is split into that many row ranges
+    (keeping the header), mapped concurrently and merged into one sorted,
+    de-duplicated N-Triples graph (``serialization`` must then be ``nquads``).
+    Mappings with joins, named graphs or blank nodes are run as a whole. ``max_heap`` (e.g.
+    ``2g``) sets the heap of each JVM and bounds how many run at once.
+
+    With ``in_process``, mappings within the subset of ``rml_engine`` are
+    materialised as N-Triples without RMLMapper (``serialization`` must then be
+    ``nquads``); the others still run with RMLMapper.
+
+    Raises ``MappingError`` if the mapping fails or produces no triples; missing
+    files or a missing RMLMapper jar raise ``FileNotFoundError``/``RuntimeError``.
+    """
 
     mapping_path = _validate_path(mapping, "Mapping file")
     if mapping_path is None:  # pragma: no cover - defensive, arg required
@@ -91,11 +332,63 @@ def map2graph(
     ontology = _validate_path(ontology, "Ontology")
     headers = _validate_path(headers, "Headers")
 
-    mapper_path = _get_rmlmapper_path(rmlmapper)
+    if shards is not None and shards > 1 and serialization != "nquads":
+        raise ValueError("Sharded runs produce N-Triples, use the 'nquads' serialization")
+    if in_process and serialization != "nquads":
+        raise ValueError("In-process runs produce N-Triples, use the 'nquads' serialization")
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        tmp_output = Path(tmpdir) / "graph.ttl"
+    if output is None:
+        final_output = Path.cwd() / "graph.ttl"
+    else:
+        final_output = Path(output).resolve()
+        final_output.parent.mkdir(parents=True, exist_ok=True)
+
+    # The graph is written next to its destination and renamed into place, instead of copied there
+    fd, tmp_name = tempfile.mkstemp(dir=final_output.parent, prefix=f".{final_output.name}.", suffix=".tmp")
+    os.close(fd)
+    tmp_output = Path(tmp_name)
+    try:
+        _map_into(
+            mapping_path,
+            tmp_output,
+            ontology=ontology,
+            headers=headers,
+            serialization=serialization,
+            rmlmapper=rmlmapper,
+            pool=pool,
+            shards=shards,
+            max_heap=max_heap,
+            in_process=in_process,
+        )
+
+        # mkstemp creates the file readable by its owner only, give it the default permissions
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_output, 0o666 & ~umask)
+        os.replace(tmp_output, final_output)
+    except BaseException:
+        tmp_output.unlink(missing_ok=True)
+        raise
 
+    return final_output
+
+
+def _map_into(
+    mapping_path: Path,
+    tmp_output: Path,
+    *,
+    ontology: Path | None,
+    headers: Path | None,
+    serialization: str,
+    rmlmapper: Path | None,
+    pool: "RMLMapperPool | None",
+    shards: int | None,
+    max_heap: str | None,
+    in_process: bool,
+) -> None:
+    """Run ``mapping_path`` into ``tmp_output`` (see map2graph)."""
+
+    with tempfile.TemporaryDirectory() as tmpdir:
         parameters_path: Path | None = None
         if ontology or headers:
             parameters_path = Path(tmpdir) / "parameters.properties"
@@ -108,44 +401,70 @@ def map2graph(
                 parameter_lines.append(f"headers={escaped}")
             parameters_path.write_text("\n".join(parameter_lines), encoding="utf-8")
 
-        result = _run_mapper(
-            mapper_path,
-            mapping_path,
-            tmp_output,
-            serialization,
-            parameters_path,
-            working_directory=mapping_path.parent,
-        )
-        if result.returncode != 0:
-            raise RuntimeError(
-                "RMLMapper failed with exit code "
-                f"{result.returncode}: {result.stderr.strip()}"
-            )
+        materialized = False
+        if in_process:
+            from automap.converters.rml_engine import UnsupportedMapping, materialize
 
-        if not tmp_output.exists() or tmp_output.stat().st_size == 0:
-            raise RuntimeError("Mapping executed but produced no triples")
+            parameters = {name: str(path) for name, path in (("ontology", ontology), ("headers", headers)) if path}
+            try:
+                materialize(mapping_path, tmp_output, parameters)
+                materialized = True
+            except UnsupportedMapping:
+                pass
 
-        if output is None:
-            final_output = Path.cwd() / tmp_output.name
-        else:
-            final_output = Path(output).resolve()
-            final_output.parent.mkdir(parents=True, exist_ok=True)
+        if not materialized:
+            if rmlmapper is None and pool is not None:
+                mapper_path = pool.rmlmapper
+            else:
+                mapper_path = _get_rmlmapper_path(rmlmapper)
 
-        shutil.copyfile(tmp_output, final_output)
+            sharded = shards is not None and shards > 1 and _run_sharded(
+                mapper_path,
+                mapping_path,
+                tmp_output,
+                parameters_path,
+                shards,
+                Path(tmpdir),
+                max_heap=max_heap,
+                pool=pool,
+            )
+            if not sharded:
+                result = _run_mapper(
+                    mapper_path,
+                    mapping_path,
+                    tmp_output,
+                    serialization,
+                    parameters_path,
+                    working_directory=mapping_path.parent,
+                    pool=pool,
+                    java_options=_java_options(max_heap),
+                )
+                if result.returncode != 0:
+                    raise MappingError(
+                        "RMLMapper failed with exit code "
+                        f"{result.returncode}: {result.stderr.strip()}"
+                    )
 
-    return final_output
+        if not tmp_output.exists() or tmp_output.stat().st_size == 0:
+            raise MappingError("Mapping executed but produced no triples")
 
 
 def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Generate a knowledge graph from an RML mapping"
     )
-    parser.add_argument("mapping", type=Path, help="Path to the RML mapping file")
+    parser.add_argument(
+        "mapping",
+        type=Path,
+        nargs="+",
+        help="Path to the RML mapping file (several are run on a pool of warm JVMs)",
+    )
     parser.add_argument(
         "-o",
         "--output",
         type=Path,
-        help="File to write the generated graph to. Defaults to graph.ttl",
+        help="File to write the generated graph to. Defaults to graph.ttl. With "
+        "several mappings, the file name each graph is written with, next to its mapping",
     )
     parser.add_argument("--ontology", type=Path, help="Path to the ontology file")
     parser.add_argument("--headers", type=Path, help="Path to the data headers")
@@ -162,31 +481,97 @@ def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     parser.add_argument(
         "--no-print",
         action="store_true",
-        help="Do not print the generated graph to stdout",
+        help="Do not print the generated graph to stdout (implied by several mappings)",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        help="Split the largest CSV source into this many row ranges mapped "
+        "concurrently (N-Triples output, requires --serialization nquads)",
+    )
+    parser.add_argument(
+        "--max-heap",
+        help="Maximum heap of each JVM (e.g. 2g); also bounds concurrent shard runs",
+    )
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="Materialise simple CSV mappings without RMLMapper (see rml_engine, "
+        "requires --serialization nquads); others still run with RMLMapper",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of warm JVMs running several mappings (default: one per CPU, "
+        "at most one per mapping)",
     )
     return parser.parse_args(argv)
 
 
+def _map_many(args: argparse.Namespace) -> int:
+    from automap.converters.rmlmapper_pool import RMLMapperPool
+
+    name = args.output.name if args.output else "graph.ttl"
+    workers = args.workers or min(len(args.mapping), os.cpu_count() or 1)
+
+    failed = False
+    # Mappings still run (one java process each) if the pool cannot start
+    with RMLMapperPool(args.rmlmapper, workers, java_options=_java_options(args.max_heap)) as pool:
+        futures = [
+            pool.submit(
+                mapping,
+                ontology=args.ontology,
+                headers=args.headers,
+                output=Path(mapping).resolve().parent / name,
+                serialization=args.serialization,
+                rmlmapper=args.rmlmapper,
+                shards=args.shards,
+                max_heap=args.max_heap,
+                in_process=args.in_process,
+            )
+            for mapping in args.mapping
+        ]
+        for mapping, future in zip(args.mapping, futures):
+            try:
+                print(future.result(), file=sys.stderr)
+            except Exception as exc:  # pragma: no cover - thin wrapper
+                print(f"Error: {mapping}: {exc}", file=sys.stderr)
+                failed = True
+
+    return 1 if failed else 0
+
+
 def main(argv: list[str] | None = None) -> int:
     args = _parse_args(argv)
 
+    if len(args.mapping) > 1:
+        try:
+            return _map_many(args)
+        except Exception as exc:  # pragma: no cover - thin wrapper
+            print(f"Error: {exc}", file=sys.stderr)
+            return 1
+
     try:
         graph_path = map2graph(
-            mapping=args.mapping,
+            mapping=args.mapping[0],
             ontology=args.ontology,
             headers=args.headers,
             output=args.output,
             serialization=args.serialization,
             rmlmapper=args.rmlmapper,
+            shards=args.shards,
+            max_heap=args.max_heap,
+            in_process=args.in_process,
         )
     except Exception as exc:  # pragma: no cover - thin wrapper
         print(f"Error: {exc}", file=sys.stderr)
         return 1
 
     if not args.no_print:
-        with open(graph_path, "r", encoding="utf-8") as graph_file:
-            for line in graph_file:
-                print(line.rstrip())
+        sys.stdout.flush()
+        with open(graph_path, "rb") as graph_file:
+            shutil.copyfileobj(graph_file, sys.stdout.buffer)
+        sys.stdout.buffer.flush()
 
     print(graph_path, file=sys.stderr)
     return 0
@@ -0,0 +1,491 @@
+"""In-process RML engine for simple CSV mappings.
+
+Most generated mappings are plain CSV triples maps, like those ``Map2RML``
+translates from YARRRML: a subject template, ``rdf:type`` and reference,
+template or constant objects with an optional datatype or language tag. This
+module materialises that subset without a JVM, with pandas column operations:
+every term map becomes a column of N-Triples terms, built for all rows at once.
+
+Supported:
+- triples maps with a legacy RML ``rml:logicalSource`` over a local CSV file
+- subject maps (IRIs) with ``rr:template``, ``rml:reference`` or ``rr:constant``
+  and ``rr:class``
+- constant predicates, and object maps with ``rr:constant``, ``rml:reference``
+  or ``rr:template``, ``rr:termType``, ``rr:datatype`` and ``rr:language``
+
+Anything else (joins, functions, named graphs, blank nodes, other sources,
+relative IRIs, ...) raises ``UnsupportedMapping``; ``map2graph(...,
+in_process=True)`` then runs the mapping with RMLMapper. As RMLMapper does,
+empty CSV values are treated as missing, and values inserted in IRI templates
+are percent-encoded like RMLMapper does (everything but ASCII letters, digits
+and ``-._~``, as UTF-8). ``check_conformance`` compares the output of both
+engines on a mapping; the cases under ``tests/converters/rml_engine/`` pin the
+expected output of both.
+"""
+
+import argparse
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Iterator
+
+import pandas as pd
+from rdflib import Graph, Literal, RDF, URIRef
+from rdflib.util import guess_format
+
+from automap.converters.ntriples import canonicalize_line
+from automap.converters.rml2graph import QL_CSV, R2RML, RML, map2graph
+
+if TYPE_CHECKING:  # pragma: no cover - only for annotations
+    from automap.grapheval.metrics.terms import EncodedGraph, TermDictionary
+
+# Properties each kind of term map may use in the supported subset
+_TERM_MAP_PROPERTIES = {
+    "subject": {RDF.type, R2RML.template, RML.reference, R2RML.constant, R2RML.termType, R2RML["class"]},
+    "predicate": {RDF.type, R2RML.constant},
+    "object": {RDF.type, R2RML.template, RML.reference, R2RML.constant, R2RML.termType, R2RML.datatype,
+               R2RML.language},
+}
+_TRIPLES_MAP_PROPERTIES = {RDF.type, RML.logicalSource, R2RML.subjectMap, R2RML.subject, R2RML.predicateObjectMap}
+_LOGICAL_SOURCE_PROPERTIES = {RDF.type, RML.source, RML.referenceFormulation}
+_PREDICATE_OBJECT_PROPERTIES = {RDF.type, R2RML.predicateMap, R2RML.predicate, R2RML.objectMap, R2RML.object}
+
+# Characters kept as they are in template values of IRIs. RMLMapper (Utils.encodeURI) keeps only the
+# ASCII unreserved ones and percent-encodes everything else, non-ASCII characters as UTF-8 bytes
+_IRI_UNSAFE = re.compile(r"[^A-Za-z0-9\-._~]")
+_TEMPLATE_PART = re.compile(r"\\([{}\\])|\{((?:[^{}\\]|\\.)*)\}|([^{}\\]+)")
+_PARAMETER = re.compile(r"@\{([^}]*)\}")
+_SCHEME = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*:")
+
+
+class UnsupportedMapping(ValueError):
+    """The mapping uses RML features the in-process engine does not implement."""
+
+
+class _TermMap:
+    """A compiled term map: how to build the term of every row."""
+
+    def __init__(self, kind: str, value: str, term_type: URIRef, datatype: str | None = None,
+                 language: str | None = None):
+        self.kind = kind
+        self.value = value
+        self.term_type = term_type
+        self.datatype = datatype
+        self.language = language
+
+
+class _TriplesMap:
+    """A compiled triples map over one CSV file."""
+
+    def __init__(self, source: Path, subject: _TermMap, classes: list[str],
+                 predicate_objects: list[tuple[_TermMap, _TermMap]]):
+        self.source = source
+        self.subject = subject
+        self.classes = classes
+        self.predicate_objects = predicate_objects
+
+
+def _check_properties(graph: Graph, node, allowed: set, what: str) -> None:
+    unknown = set(graph.predicates(node)) - allowed
+    if unknown:
+        raise UnsupportedMapping(f"{what} uses {', '.join(sorted(str(p) for p in unknown))}")
+
+
+def _substitute(text: str, parameters: dict[str, str]) -> str:
+    """Replace RMLMapper ``@{name}`` parameter placeholders."""
+
+    def replace(match: re.Match) -> str:
+        if match.group(1) not in parameters:
+            raise UnsupportedMapping(f"Unknown parameter @{{{match.group(1)}}}")
+        return parameters[match.group(1)]
+
+    return _PARAMETER.sub(replace, text)
+
+
+def _single(graph: Graph, node, predicate, what: str):
+    values = list(graph.objects(node, predicate))
+    if len(values) > 1:
+        raise UnsupportedMapping(f"{what} has several {predicate}")
+    return values[0] if values else None
+
+
+def _compile_term_map(graph: Graph, node, role: str, parameters: dict[str, str]) -> _TermMap:
+    _check_properties(graph, node, _TERM_MAP_PROPERTIES[role], f"{role} map")
+
+    constant = _single(graph, node, R2RML.constant, f"{role} map")
+    template = _single(graph, node, R2RML.template, f"{role} map")
+    reference = _single(graph, node, RML.reference, f"{role} map")
+    datatype = _single(graph, node, R2RML.datatype, f"{role} map")
+    language = _single(graph, node, R2RML.language, f"{role} map")
+    term_type = _single(graph, node, R2RML.termType, f"{role} map")
+
+    if sum(value is not None for value in (constant, template, reference)) != 1:
+        raise UnsupportedMapping(f"{role} map needs exactly one of rr:constant, rr:template, rml:reference")
+    if constant is not None:
+        return _constant_term_map(constant)
+
+    # R2RML default term types: literals for references and typed or tagged objects, IRIs otherwise
+    if term_type is None:
+        literal = role == "object" and (reference is not None or datatype is not None or language is not None)
+        term_type = R2RML.Literal if literal else R2RML.IRI
+    if term_type not in (R2RML.IRI, R2RML.Literal) or (term_type == R2RML.Literal and role != "object"):
+        raise UnsupportedMapping(f"{role} map has term type {term_type}")
+
+    kind, value = ("template", template) if template is not None else ("reference", reference)
+    return _TermMap(
+        kind,
+        _substitute(str(value), parameters),
+        term_type,
+        str(datatype) if datatype is not None else None,
+        str(language) if language is not None else None,
+    )
+
+
+def _constant_term_map(constant) -> _TermMap:
+    if isinstance(constant, URIRef):
+        return _TermMap("constant", _iri(str(constant)), R2RML.IRI)
+    if isinstance(constant, Literal):
+        datatype = str(constant.datatype) if constant.datatype else None
+        return _TermMap("constant", _literal(str(constant), datatype, constant.language), R2RML.Literal)
+    raise UnsupportedMapping(f"Unsupported constant {constant!r}")
+
+
+def _iri(text: str) -> str:
+    return f"<{text}>"
+
+
+def _escape_literal(text):
+    """Escape a lexical form (a string, or a Series of them) for N-Triples."""
+    for char, escaped in (("\\", "\\\\"), ('"', '\\"'), ("\n", "\\n"), ("\r", "\\r")):
+        text = text.replace(char, escaped) if isinstance(text, str) else text.str.replace(char, escaped, regex=False)
+    return text
+
+
+def _literal_suffix(datatype: str | None, language: str | None) -> str:
+    if language:
+        return f"@{language}"
+    if datatype:
+        return f"^^<{datatype}>"
+    return ""
+
+
+def _literal(text: str, datatype: str | None, language: str | None) -> str:
+    return f'"{_escape_literal(text)}"{_literal_suffix(datatype, language)}'
+
+
+def _percent_encode(match: re.Match) -> str:
+    return "".join(f"%{byte:02X}" for byte in match.group().encode("utf-8"))
+
+
+def compile_mapping(mapping: Path, parameters: dict[str, str] | None = None) -> list[_TriplesMap]:
+    """
+    Compile the triples maps of an RML mapping.
+
+    Args:
+        mapping: Path to the RML mapping; relative sources are resolved against its directory
+        parameters: Values of RMLMapper ``@{name}`` placeholders (e.g. ``ontology``, ``headers``)
+
+    Returns:
+        list: Compiled triples maps
+
+    Raises:
+        UnsupportedMapping: If the mapping uses features outside the supported subset
+    """
+
+    mapping = Path(mapping).resolve()
+    parameters = parameters or {}
+    try:
+        graph = Graph().parse(mapping, format=guess_format(str(mapping)) or "turtle")
+    except Exception as exc:
+        raise UnsupportedMapping(f"Cannot parse the mapping: {exc}") from None
+
+    if next(graph.triples((None, R2RML.logicalTable, None)), None) is not None:
+        raise UnsupportedMapping("rr:logicalTable sources are not supported")
+
+    triples_maps = []
+    for triples_map, logical_source in sorted(graph.subject_objects(RML.logicalSource)):
+        _check_properties(graph, triples_map, _TRIPLES_MAP_PROPERTIES, "triples map")
+
+        _check_properties(graph, logical_source, _LOGICAL_SOURCE_PROPERTIES, "logical source")
+        source = _single(graph, logical_source, RML.source, "logical source")
+        formulation = _single(graph, logical_source, RML.referenceFormulation, "logical source")
+        if not isinstance(source, Literal):
+            raise UnsupportedMapping(f"Unsupported source {source!r}")
+        source_path = mapping.parent / _substitute(str(source), parameters)
+        if formulation != QL_CSV and not (formulation is None and source_path.suffix.lower() == ".csv"):
+            raise UnsupportedMapping(f"Unsupported reference formulation {formulation}")
+        if not source_path.is_file():
+            raise UnsupportedMapping(f"Source {source_path} is not a local file")
+
+        subject_map = _single(graph, triples_map, R2RML.subjectMap, "triples map")
+        subject_constant = _single(graph, triples_map, R2RML.subject, "triples map")
+        if (subject_map is None) == (subject_constant is None):
+            raise UnsupportedMapping("triples map needs exactly one subject map")
+        if subject_map is not None:
+            subject = _compile_term_map(graph, subject_map, "subject", parameters)
+            classes = [str(cls) for cls in graph.objects(subject_map, R2RML["class"])]
+        else:
+            subject, classes = _constant_term_map(subject_constant), []
+        if subject.term_type != R2RML.IRI:
+            raise UnsupportedMapping("Subjects must be IRIs")
+
+        predicate_objects = []
+        for predicate_object_map in graph.objects(triples_map, R2RML.predicateObjectMap):
+            _check_properties(graph, predicate_object_map, _PREDICATE_OBJECT_PROPERTIES, "predicate-object map")
+            predicates = [_constant_term_map(predicate)
+                          for predicate in graph.objects(predicate_object_map, R2RML.predicate)]
+            predicates += [_compile_term_map(graph, node, "predicate", parameters)
+                           for node in graph.objects(predicate_object_map, R2RML.predicateMap)]
+            objects = [_constant_term_map(obj) for obj in graph.objects(predicate_object_map, R2RML.object)]
+            objects += [_compile_term_map(graph, node, "object", parameters)
+                        for node in graph.objects(predicate_object_map, R2RML.objectMap)]
+            if any(predicate.term_type != R2RML.IRI for predicate in predicates):
+                raise UnsupportedMapping("Predicates must be IRIs")
+            predicate_objects += [(predicate, obj) for predicate in predicates for obj in objects]
+
+        triples_maps.append(_TriplesMap(source_path, subject, classes, predicate_objects))
+
+    if not triples_maps:
+        raise UnsupportedMapping("The mapping has no RML triples map")
+    return triples_maps
+
+
+def _column(frame: pd.DataFrame, reference: str) -> pd.Series:
+    if reference not in frame.columns:
+        raise UnsupportedMapping(f"Reference {reference!r} is not a column of the source")
+    column = frame[reference]
+    return column.mask(column == "")
+
+
+def _template_values(frame: pd.DataFrame, template: str, iri: bool) -> pd.Series:
+    values = pd.Series("", index=frame.index, dtype=object)
+    position = 0
+    for match in _TEMPLATE_PART.finditer(template):
+        if match.start() != position:
+            raise UnsupportedMapping(f"Invalid template {template!r}")
+        position = match.end()
+
+        escaped, reference, text = match.groups()
+        if reference is None:
+            values = values + (escaped or text)
+            continue
+        column = _column(frame, re.sub(r"\\(.)", r"\1", reference))
+        if iri:
+            column = column.str.replace(_IRI_UNSAFE, _percent_encode, regex=True)
+        values = values + column
+    if position != len(template):
+        raise UnsupportedMapping(f"Invalid template {template!r}")
+    return values
+
+
+def _terms(frame: pd.DataFrame, term_map: _TermMap) -> pd.Series | str:
+    """N-Triples terms of ``term_map`` for every row (NaN where a value is missing), or a constant."""
+
+    if term_map.kind == "constant":
+        return term_map.value
+
+    iri = term_map.term_type == R2RML.IRI
+    if term_map.kind == "template":
+        if iri and not _SCHEME.match(term_map.value):
+            raise UnsupportedMapping(f"Template {term_map.value!r} does not build absolute IRIs")
+        values = _template_values(frame, term_map.value, iri)
+    else:
+        values = _column(frame, term_map.value)
+        if iri and not values.dropna().str.match(_SCHEME).all():
+            raise UnsupportedMapping(f"Reference {term_map.value!r} holds relative IRIs")
+
+    if iri:
+        return "<" + values + ">"
+    return '"' + _escape_literal(values) + '"' + _literal_suffix(term_map.datatype, term_map.language)
+
+
+def _triples(triples_map: _TriplesMap, frame: pd.DataFrame) -> list[pd.Series]:
+    subjects = _terms(frame, triples_map.subject)
+    if isinstance(subjects, str):
+        subjects = pd.Series(subjects, index=frame.index, dtype=object)
+
+    lines = [subjects + f" {_iri(str(RDF.type))} {_iri(cls)} ." for cls in triples_map.classes]
+    for predicate_map, object_map in triples_map.predicate_objects:
+        lines.append(subjects + " " + _terms(frame, predicate_map) + " " + _terms(frame, object_map) + " .")
+    return [column.dropna() for column in lines]
+
+
+def _ntriples_blocks(
+    mapping: Path,
+    parameters: dict[str, str] | None = None,
+    block_lines: int = 100_000,
+) -> Iterator[str]:
+    """N-Triples of the mapping (duplicates dropped), in blocks of at most ``block_lines`` lines."""
+
+    triples_maps = compile_mapping(mapping, parameters)
+
+    frames: dict[Path, pd.DataFrame] = {}
+    columns = []
+    for triples_map in triples_maps:
+        if triples_map.source not in frames:
+            frames[triples_map.source] = pd.read_csv(
+                triples_map.source, dtype=str, keep_default_na=False, na_filter=False, encoding="utf-8-sig"
+            )
+        columns += _triples(triples_map, frames[triples_map.source])
+    if not columns:
+        return
+
+    lines = pd.concat(columns, ignore_index=True).drop_duplicates()
+    for start in range(0, len(lines), block_lines):
+        yield "".join(line + "\n" for line in lines.iloc[start:start + block_lines])
+
+
+def materialize(
+    mapping: Path,
+    output: IO[str] | Path,
+    parameters: dict[str, str] | None = None,
+) -> int:
+    """
+    Materialise an RML mapping in-process as N-Triples.
+
+    Args:
+        mapping: Path to the RML mapping
+        output: Text stream or path the N-Triples are written to (duplicates dropped)
+        parameters: Values of RMLMapper ``@{name}`` placeholders
+
+    Returns:
+        int: Number of triples written
+
+    Raises:
+        UnsupportedMapping: If the mapping uses features outside the supported subset
+    """
+
+    if isinstance(output, (str, Path)):
+        with open(output, "w", encoding="utf-8", newline="\n") as graph_file:
+            return materialize(mapping, graph_file, parameters)
+
+    written = 0
+    for block in _ntriples_blocks(mapping, parameters):
+        output.write(block)
+        written += block.count("\n")
+    return written
+
+
+def materialize_encoded(
+    mapping: Path,
+    terms: "TermDictionary",
+    parameters: dict[str, str] | None = None,
+) -> "EncodedGraph":
+    """Materialise an RML mapping in-process straight into the evaluator's term ids (see ``materialize``)."""
+
+    from automap.grapheval.metrics.loader import load_ntriples_blocks
+
+    return load_ntriples_blocks((block.encode("utf-8") for block in _ntriples_blocks(mapping, parameters)), terms)
+
+
+def check_conformance(
+    mapping: Path,
+    rmlmapper: Path | None = None,
+    parameters: dict[str, str] | None = None,
+) -> tuple[set[str], set[str]]:
+    """
+    Run a mapping with both engines and compare their (canonicalised) triples.
+
+    Args:
+        mapping: Path to the RML mapping, within the supported subset
+        rmlmapper: Path to the rmlmapper jar (default: ``RMLMAPPER_JAR``)
+        parameters: ``ontology`` and ``headers`` paths passed to both engines
+
+    Returns:
+        tuple: (triples only produced in-process, triples only produced by RMLMapper)
+
+    Raises:
+        UnsupportedMapping: If the mapping is outside the supported subset
+    """
+
+    parameters = parameters or {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        in_process = Path(tmpdir) / "in_process.nt"
+        materialize(mapping, in_process, parameters)
+        reference = map2graph(
+            mapping,
+            ontology=parameters.get("ontology"),
+            headers=parameters.get("headers"),
+            output=Path(tmpdir) / "rmlmapper.nq",
+            serialization="nquads",
+            rmlmapper=rmlmapper,
+        )
+
+        triples = []
+        for path in (in_process, reference):
+            with open(path, "r", encoding="utf-8") as graph_file:
+                triples.append({line for line in map(canonicalize_line, graph_file) if line is not None})
+    return triples[0] - triples[1], triples[1] - triples[0]
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Materialise simple CSV RML mappings in-process, or check them against RMLMapper"
+    )
+    parser.add_argument("mapping", type=Path, nargs="+", help="Path to the RML mapping file")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="File to write the N-Triples to (single mapping). Defaults to standard output",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Compare the output of both engines on every mapping instead",
+    )
+    parser.add_argument("--ontology", type=Path, help="Path to the ontology file")
+    parser.add_argument("--headers", type=Path, help="Path to the data headers")
+    parser.add_argument(
+        "--rmlmapper",
+        type=Path,
+        help="Path to the rmlmapper.jar (--check). Overrides RMLMAPPER_JAR",
+    )
+    args = parser.parse_args(argv)
+    if not args.check and len(args.mapping) > 1:
+        parser.error("several mappings are only supported with --check")
+    return args
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    parameters = {name: str(Path(path).resolve()) for name, path in
+                  (("ontology", args.ontology), ("headers", args.headers)) if path is not None}
+
+    if not args.check:
+        try:
+            materialize(args.mapping[0], args.output or sys.stdout, parameters)
+        except Exception as exc:  # pragma: no cover - thin wrapper
+            print(f"Error: {exc}", file=sys.stderr)
+            return 1
+        return 0
+
+    failed = False
+    for mapping in args.mapping:
+        try:
+            only_in_process, only_rmlmapper = check_conformance(mapping, args.rmlmapper, parameters)
+        except UnsupportedMapping as exc:
+            print(f"{mapping}: unsupported ({exc})")
+            continue
+        except Exception as exc:  # pragma: no cover - thin wrapper
+            print(f"{mapping}: error ({exc})")
+            failed = True
+            continue
+
+        if only_in_process or only_rmlmapper:
+            failed = True
+            print(f"{mapping}: differs ({len(only_in_process)} triples only in-process, "
+                  f"{len(only_rmlmapper)} only from RMLMapper)")
+            for line in sorted(only_in_process)[:10]:
+                print(f"  + {line}")
+            for line in sorted(only_rmlmapper)[:10]:
+                print(f"  - {line}")
+        else:
+            print(f"{mapping}: ok")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    sys.exit(main())
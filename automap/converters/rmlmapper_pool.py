@@ -0,0 +1,219 @@
+"""Pool of warm RMLMapper JVMs.
+
+Running ``java -jar rmlmapper.jar`` once per mapping pays the JVM startup and
+the class loading of the RMLMapper jar every time, which on small inputs often
+takes longer than the mapping itself. ``RMLMapperPool`` keeps a few JVMs alive,
+each running the bundled launcher ``resources/RMLMapperWorker.java`` (a loop
+over the RMLMapper entry point reading requests from stdin), and dispatches
+mappings to whichever is free.
+
+The pool is an optimisation only: when it cannot start (no JDK, unsupported
+RMLMapper version, ...) or a worker dies during a mapping, ``map2graph`` runs
+that mapping with a fresh ``java -jar`` process as before.
+"""
+
+import os
+import queue
+import select
+import subprocess
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from automap.converters.rml2graph import _get_rmlmapper_path, map2graph
+
+LAUNCHER = Path(__file__).resolve().parents[2] / "resources" / "RMLMapperWorker.java"
+
+_ESCAPES = {"\\": "\\\\", "\t": "\\t", "\r": "\\r", "\n": "\\n"}
+_UNESCAPES = {"t": "\t", "r": "\r", "n": "\n"}
+
+
+def _escape(text: str) -> str:
+    return "".join(_ESCAPES.get(char, char) for char in text)
+
+
+def _unescape(text: str) -> str:
+    chars = []
+    escaped = False
+    for char in text:
+        if escaped:
+            chars.append(_UNESCAPES.get(char, char))
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        else:
+            chars.append(char)
+    return "".join(chars)
+
+
+class _Worker:
+    """One JVM running the launcher, serving one request at a time."""
+
+    def __init__(self, command: list[str], timeout: float):
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        self.timeout = timeout
+
+    def wait_ready(self) -> bool:
+        """Wait for the launcher's ``READY`` line; stop the JVM if it does not come."""
+        readable, _, _ = select.select([self.process.stdout], [], [], self.timeout)
+        line = self.process.stdout.readline() if readable else b""
+        if line.rstrip(b"\n") == b"READY":
+            return True
+        self.stop()
+        return False
+
+    def run(self, arguments: list[str], base_path: Path) -> tuple[int, str] | None:
+        """Run the mapper with ``arguments``; None if the JVM died."""
+        request = "\t".join(_escape(field) for field in [*arguments, str(base_path)]) + "\n"
+        try:
+            self.process.stdin.write(request.encode("utf-8"))
+            self.process.stdin.flush()
+            line = self.process.stdout.readline().decode("utf-8")
+        except (BrokenPipeError, OSError):
+            return None
+        if not line.endswith("\n"):
+            return None
+
+        status, _, log = line[:-1].partition("\t")
+        return int(status), _unescape(log)
+
+    def stop(self) -> None:
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class RMLMapperPool:
+    """Warm RMLMapper JVMs, used through ``map2graph(..., pool=pool)`` or ``submit``.
+
+    Example:
+        >>> with RMLMapperPool("resources/rmlmapper-8.0.0-r378-all.jar", workers=4) as pool:
+        ...     futures = [pool.submit(mapping, output=mapping.with_name("graph.nt"),
+        ...                            serialization="nquads") for mapping in mappings]
+        ...     graphs = [future.result() for future in futures]
+    """
+
+    def __init__(
+        self,
+        rmlmapper: Path | str | None = None,
+        workers: int | None = None,
+        *,
+        java: str = "java",
+        java_options: list[str] | None = None,
+        launcher: Path = LAUNCHER,
+        startup_timeout: float = 120.0,
+    ):
+        """
+        Args:
+            rmlmapper: Path to the rmlmapper jar (default: ``RMLMAPPER_JAR``)
+            workers: Number of JVMs (default: one per CPU)
+            java: Java executable, a JDK 17+ (the launcher is run from source)
+            java_options: JVM options of every JVM, e.g. ``["-Xmx2g"]``; ``map2graph``
+                uses the pool only for runs with the same options (its ``max_heap``)
+            launcher: Java source of the worker loop
+            startup_timeout: Seconds to wait for a JVM to be ready
+        """
+        self.rmlmapper = _get_rmlmapper_path(Path(rmlmapper) if rmlmapper else None)
+        self.workers = workers or os.cpu_count() or 1
+        self.java = java
+        self.java_options = list(java_options or [])
+        self.launcher = Path(launcher)
+        self.startup_timeout = startup_timeout
+
+        self._idle: queue.Queue[_Worker] = queue.Queue()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+    @property
+    def available(self) -> bool:
+        """Whether any JVM is running."""
+        return self._size > 0
+
+    def _spawn(self) -> _Worker | None:
+        command = [self.java, *self.java_options, "-cp", str(self.rmlmapper), str(self.launcher)]
+        try:
+            worker = _Worker(command, self.startup_timeout)
+        except OSError:
+            return None
+        return worker if worker.wait_ready() else None
+
+    def start(self) -> bool:
+        """Start the JVMs (concurrently); return whether any of them is ready."""
+        if not self.launcher.exists():
+            return False
+
+        with ThreadPoolExecutor(self.workers) as executor:
+            workers = list(executor.map(lambda _: self._spawn(), range(self.workers)))
+        for worker in workers:
+            if worker is not None:
+                self._idle.put(worker)
+                self._size += 1
+        return self.available
+
+    def run(self, arguments: list[str], base_path: Path) -> subprocess.CompletedProcess[str] | None:
+        """
+        Run the RMLMapper command-line ``arguments`` on a free JVM.
+
+        Relative paths are resolved against ``base_path``. Returns None when the
+        pool has no JVM left, or the JVM died during the run (it is replaced);
+        the caller then runs the mapping in its own process.
+        """
+        worker = None
+        while worker is None:
+            # The last JVMs may die (and not be replaced) while waiting for one
+            if not self.available:
+                return None
+            try:
+                worker = self._idle.get(timeout=1)
+            except queue.Empty:
+                pass
+
+        result = worker.run(arguments, base_path)
+        if result is None:
+            worker.stop()
+            worker = self._spawn()
+            if worker is None:
+                with self._lock:
+                    self._size -= 1
+                return None
+        self._idle.put(worker)
+        if result is None:
+            return None
+
+        status, log = result
+        return subprocess.CompletedProcess(arguments, status, stdout="", stderr=log)
+
+    def submit(self, mapping: Path, **kwargs) -> Future:
+        """Run ``map2graph(mapping, **kwargs)`` on the pool; the future holds the graph path."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers)
+        return self._executor.submit(map2graph, mapping, pool=self, **kwargs)
+
+    def close(self) -> None:
+        """Wait for the submitted mappings and stop the JVMs."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        while self._size:
+            self._idle.get().stop()
+            self._size -= 1
+
+    def __enter__(self) -> "RMLMapperPool":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -4,12 +4,28 @@ Compute Graph Evaluation Metrics
 This script evaluates RDF graphs using the grapheval package.
 Updated to use the new grapheval package structure with YAML configuration.
 """
+import os
 import sys
-import json
+from array import array
+from pathlib import Path
+from typing import IO, List, Optional, Union
+import yaml
 from rdflib import Graph
 from argparse import ArgumentParser
 from automap.utils.config import Config
-from automap.grapheval.metrics import GraphEvaluator
+from automap.utils.results import split_details, dump_json
+from automap.grapheval.metrics import (
+    GraphEvaluator,
+    StreamingEvaluator,
+    EncodedGraph,
+    load_graph,
+    open_graph,
+    metric_names,
+)
+from automap.grapheval.metrics.parallel import parallel_map
+
+# Keys every batch manifest entry must provide (``output`` and ``details`` are optional)
+MANIFEST_KEYS = ('gold_graph', 'pred_graph', 'pred_mapping', 'config')
 
 
 def compute_metrics(
@@ -19,15 +35,19 @@ def compute_metrics(
         pred_mapping: str,
         only_common: bool = False,
         only_in_domain: bool = False,
+        workers: Optional[int] = None,
+        metrics: Optional[List[str]] = None,
 ) -> dict:
     """
     TODO: update docstring
     Compute evaluation metrics between gold and predicted RDF graphs.
 
     Args:
-        gold_graph (Graph): The reference RDF graph.
-        pred_graph (Graph): The predicted RDF graph.
+        gold_graph (Graph): The reference RDF graph (or an EncodedGraph from load_graph).
+        pred_graph (Graph): The predicted RDF graph (encoded with the same TermDictionary if encoded).
         config (Config): Configuration for the evaluation.
+        workers (int): Number of worker processes the evaluation is spread over (optional).
+        metrics (list): Names of the metrics to compute, with their dependencies (default: all of them).
 
     Returns:
         dict: A dictionary containing evaluation metrics.
@@ -40,11 +60,41 @@ def compute_metrics(
     if is_triples and map_is_correct:
         evaluator = GraphEvaluator(pred_graph, gold_graph, config)
         if only_common:
-            results = evaluator.evaluate_common()
+            metrics = metric_names('common')
         elif only_in_domain:
-            results = evaluator.evaluate_in_domain()
-        else:
-            results = evaluator.evaluate_all()
+            metrics = metric_names('in_domain')
+        results = evaluator.evaluate(metrics, workers)
+
+    results["errors"] = {"NoTriples": not is_triples,
+                         "NoValidMapping": not map_is_correct}
+
+    return results
+
+
+def compute_streaming_metrics(gold_graph, pred_graph, pred_mapping: str) -> dict:
+    """
+    Compute the streaming metrics (triples_exact, subjects_exact, predicates_exact,
+    objects_exact) between two N-Triples files sorted in byte order, without loading
+    them into memory.
+
+    Args:
+        gold_graph: Path or text stream of the sorted reference N-Triples.
+        pred_graph: Path or text stream of the sorted predicted N-Triples.
+        pred_mapping (str): The predicted mapping.
+
+    Returns:
+        dict: A dictionary containing evaluation metrics.
+    """
+    map_is_correct = pred_mapping
+    results = {}
+    is_triples = False
+
+    if map_is_correct:
+        evaluator = StreamingEvaluator(pred_graph, gold_graph)
+        results = evaluator.evaluate()
+        is_triples = evaluator.test_size > 0
+        if not is_triples:
+            results = {}
 
     results["errors"] = {"NoTriples": not is_triples,
                          "NoValidMapping": not map_is_correct}
@@ -52,6 +102,198 @@ def compute_metrics(
     return results
 
 
+def load_manifest(manifest_path: str) -> List[dict]:
+    """
+    Read a batch manifest (JSON or YAML).
+
+    The manifest is either a list of entries or a mapping with an ``entries``
+    list and ``defaults`` shared by every entry. Entries give the
+    ``gold_graph``, ``pred_graph``, ``pred_mapping`` and ``config`` paths, and
+    optionally the ``output`` path (default: ``eval_results.json`` next to the
+    predicted graph) and the ``details`` sidecar path (see write_results).
+    Relative paths are resolved against the manifest directory.
+
+    Args:
+        manifest_path (str): Path to the manifest.
+
+    Returns:
+        list: Entries, as dicts of resolved paths.
+    """
+    manifest_path = Path(manifest_path)
+    with open(manifest_path, 'r') as f:
+        manifest = yaml.safe_load(f)
+
+    defaults = {}
+    if isinstance(manifest, dict):
+        defaults = manifest.get('defaults') or {}
+        manifest = manifest.get('entries')
+    if not isinstance(manifest, list):
+        raise ValueError(f"{manifest_path}: expected a list of entries")
+
+    base = manifest_path.parent
+    entries = []
+    for number, entry in enumerate(manifest, start=1):
+        entry = {**defaults, **(entry or {})}
+        missing = [key for key in MANIFEST_KEYS if not entry.get(key)]
+        if missing:
+            raise ValueError(f"{manifest_path}: entry {number} is missing {', '.join(missing)}")
+
+        resolved = {key: str(base / entry[key]) for key in MANIFEST_KEYS}
+        output = entry.get('output')
+        resolved['output'] = str(base / output if output else Path(resolved['pred_graph']).parent / 'eval_results.json')
+        if entry.get('details'):
+            resolved['details'] = str(base / entry['details'])
+        entries.append(resolved)
+
+    return entries
+
+
+def write_results(results: dict, output: Union[str, Path, IO[str]], compact: bool = False,
+                  details: Optional[Union[str, Path]] = None) -> None:
+    """
+    Write evaluation results as indented JSON, streamed to the output.
+
+    Args:
+        results (dict): Evaluation results.
+        output: Text stream, or path of the file to replace atomically.
+        compact (bool): Leave out the detail lists (terms, alignments, detailed scores),
+            keeping only counts and scores.
+        details: Path of a sidecar file receiving the detail lists, gzip-compressed
+            if the name ends with ``.gz`` (optional).
+    """
+    if compact or details:
+        compact_results, detail_lists = split_details(results)
+        if details:
+            dump_json(detail_lists, details)
+        if compact:
+            results = compact_results
+
+    dump_json(results, output)
+
+
+class BatchEvaluation:
+    """
+    Evaluate many predicted graphs against the same gold graph and configuration.
+
+    The gold graph (through its index when up to date), the configuration and
+    the ontology (when the metrics need it) are loaded once, and what derives from them alone is built
+    up front, so that forked workers inherit it instead of rebuilding it.
+    """
+
+    def __init__(self, gold_graph: str, config: str, only_common: bool = False, only_in_domain: bool = False,
+                 load_workers: Optional[int] = None, metrics: Optional[List[str]] = None, compact: bool = False):
+        """
+        Args:
+            gold_graph (str): Path to the gold graph.
+            config (str): Path to the YAML configuration.
+            only_common (bool): Evaluate only common metrics.
+            only_in_domain (bool): Evaluate only in domain metrics.
+            load_workers (int): Number of worker processes used to load each N-Triples graph (optional).
+            metrics (list): Names of the metrics to compute (default: all of them).
+            compact (bool): Write only counts and scores (see write_results).
+        """
+        self.gold_graph = open_graph(gold_graph, load_workers)
+        self.config = Config(config)
+        self.only_common = only_common
+        self.only_in_domain = only_in_domain
+        self.load_workers = load_workers
+        self.metrics = metrics
+        self.compact = compact
+
+        # An evaluator of an empty graph loads what the metrics need of the ontology and completes the
+        # configuration (namespaces, predicates, entity IDs), both kept for every later evaluation
+        selected = metrics
+        if only_common:
+            selected = metric_names('common')
+        elif only_in_domain:
+            selected = metric_names('in_domain')
+        with self.gold_graph.terms.checkpoint() as terms:
+            evaluator = GraphEvaluator(EncodedGraph(terms, array('q'), array('q'), array('q')), self.gold_graph,
+                                       self.config)
+            evaluator.load_components(selected)
+
+        self.gold_graph.subject_id_matcher
+        self.gold_graph.predicate_partitions
+        self.gold_graph.predicate_statistics
+
+    def evaluate(self, entry: dict) -> Optional[str]:
+        """
+        Evaluate one manifest entry and write its results to ``entry['output']``.
+
+        Returns:
+            str: Error message if the entry could not be evaluated, None otherwise.
+        """
+        try:
+            with open(entry['pred_mapping'], 'r') as f:
+                pred_mapping = f.read()
+
+            # The predicted graph's terms are dropped afterwards, so every entry starts from the gold terms
+            with self.gold_graph.terms.checkpoint() as terms:
+                pred_graph = load_graph(entry['pred_graph'], terms, self.load_workers)
+                results = compute_metrics(
+                    self.gold_graph,
+                    pred_graph,
+                    self.config,
+                    pred_mapping,
+                    self.only_common,
+                    self.only_in_domain,
+                    metrics=self.metrics,
+                )
+
+            write_results(results, entry['output'], self.compact, entry.get('details'))
+        except Exception as exc:
+            return f"{entry['output']}: {type(exc).__name__}: {exc}"
+
+        return None
+
+
+def compute_batch_metrics(
+        entries: List[dict],
+        only_common: bool = False,
+        only_in_domain: bool = False,
+        workers: Optional[int] = None,
+        metrics: Optional[List[str]] = None,
+        compact: bool = False,
+) -> List[str]:
+    """
+    Evaluate every entry of a batch manifest (see load_manifest).
+
+    Entries are grouped by gold graph and configuration; each group shares one
+    BatchEvaluation and its entries are evaluated in a pool of forked workers.
+
+    Args:
+        entries (list): Manifest entries.
+        only_common (bool): Evaluate only common metrics.
+        only_in_domain (bool): Evaluate only in domain metrics.
+        workers (int): Number of entries evaluated in parallel (default: one per CPU).
+        metrics (list): Names of the metrics to compute (default: all of them).
+        compact (bool): Write only counts and scores (see write_results).
+
+    Returns:
+        list: Error messages of the entries that failed.
+    """
+    if workers is None:
+        workers = os.cpu_count()
+    # Graphs are loaded inside the workers, which must not start pools of their own
+    load_workers = 1 if workers > 1 else None
+
+    groups = {}
+    for entry in entries:
+        groups.setdefault((entry['gold_graph'], entry['config']), []).append(entry)
+
+    errors = []
+    for (gold_graph, config), group in groups.items():
+        try:
+            batch = BatchEvaluation(gold_graph, config, only_common, only_in_domain, load_workers, metrics, compact)
+        except Exception as exc:
+            errors.extend(f"{entry['output']}: {type(exc).__name__}: {exc}" for entry in group)
+            continue
+
+        errors.extend(error for error in parallel_map(batch, 'evaluate', group, workers) if error)
+
+    return errors
+
+
 def parse_args():
     """Parse command-line arguments."""
     parser = ArgumentParser(
@@ -60,19 +302,19 @@ def parse_args():
     parser.add_argument(
         '--config',
         type=str,
-        required=True,
+        required=False,
         help='Path to the YAML configuration file'
     )
     parser.add_argument(
         '--gold_graph',
         type=str,
-        required=True,
+        required=False,
         help='Path to the gold standard RDF graph file'
     )
     parser.add_argument(
         '--pred_mapping',
         type=str,
-        required=True,
+        required=False,
         help='Path to the predicted mapping file (not used in current implementation)',
     )
     parser.add_argument(
@@ -81,6 +323,33 @@ def parse_args():
         required=False,
         help='Path to the predicted RDF graph file (if not provided, read from stdin)'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        required=False,
+        help='Number of worker processes used to load N-Triples graphs (default: one per CPU for large files) '
+             'and to evaluate the metrics (default: sequential). '
+             'With --batch, number of entries evaluated in parallel (default: one per CPU)'
+    )
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Output only counts and scores, leaving out the term lists, alignments and detailed scores'
+    )
+    parser.add_argument(
+        '--details',
+        type=str,
+        required=False,
+        help='Path of a sidecar file receiving the term lists, alignments and detailed scores '
+             '(gzip-compressed if it ends with .gz), e.g. together with --compact'
+    )
+    parser.add_argument(
+        '--batch',
+        type=str,
+        required=False,
+        help='Path to a JSON/YAML manifest of (gold_graph, pred_graph, pred_mapping, config, output) entries '
+             'to evaluate in one run, writing the results of each entry to its output file'
+    )
     group = parser.add_mutually_exclusive_group()
     group.add_argument(
         "--only_common",
@@ -92,25 +361,69 @@ def parse_args():
         action="store_true",
         help='Evaluate only in domain metrics.'
     )
+    group.add_argument(
+        "--metrics",
+        type=str,
+        help='Comma-separated names of the metrics to compute (e.g. triples,classes_with_hierarchy); '
+             f"only those and the structures they depend on are computed. Available: {', '.join(metric_names())}"
+    )
+    group.add_argument(
+        "--streaming",
+        action="store_true",
+        help='Evaluate exact-term triples, subjects, predicates and objects (reported as *_exact) by '
+             'merge-joining N-Triples files sorted in byte order (LC_ALL=C sort -u), without loading '
+             'the graphs into memory.'
+    )
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.metrics is not None:
+        args.metrics = [name.strip() for name in args.metrics.split(',') if name.strip()]
+        unknown = [name for name in args.metrics if name not in metric_names()]
+        if unknown or not args.metrics:
+            parser.error(f"--metrics expects names among {', '.join(metric_names())}")
+    if args.batch:
+        if args.streaming:
+            parser.error('--batch cannot be combined with --streaming')
+        if args.details:
+            parser.error('--details is set per manifest entry with --batch')
+    else:
+        missing = [f"--{name}" for name in ('config', 'gold_graph', 'pred_mapping') if not getattr(args, name)]
+        if missing:
+            parser.error(f"the following arguments are required: {', '.join(missing)}")
+
+    return args
 
 
 def main():
     """Main CLI entry point."""
     args = parse_args()
 
-    if not args.pred_graph:
-        pred_graph_data = sys.stdin.read()
-    else:
-        with open(args.pred_graph, 'r') as f:
-            pred_graph_data = f.read()
+    if args.batch:
+        errors = compute_batch_metrics(
+            load_manifest(args.batch), args.only_common, args.only_in_domain, args.workers, args.metrics, args.compact
+        )
+        for error in errors:
+            print(f"Error: {error}", file=sys.stderr)
+        sys.exit(1 if errors else 0)
+
+    if args.streaming:
+        with open(args.pred_mapping, 'r') as f:
+            pred_mapping = f.read()
+
+        results = compute_streaming_metrics(args.gold_graph, args.pred_graph or sys.stdin, pred_mapping)
+        write_results(results, sys.stdout, args.compact, args.details)
+        return
+
+    # Redirected stdin is memory-mapped and a pipe is parsed as it is read (see load_graph)
+    pred_graph_source = args.pred_graph or sys.stdin.buffer
 
     with open(args.pred_mapping, 'r') as f:
         pred_mapping = f.read()
 
-    gold_graph = Graph().parse(args.gold_graph)
-    pred_graph = Graph().parse(data=pred_graph_data)
+    # The gold graph comes from its index when up to date (see index_graph.py). N-Triples is read
+    # straight into term ids, and the predicted graph shares the gold graph's dictionary
+    gold_graph = open_graph(args.gold_graph, args.workers)
+    pred_graph = load_graph(pred_graph_source, gold_graph.terms, args.workers)
     config = Config(args.config)
 
     results = compute_metrics(
@@ -120,8 +433,10 @@ def main():
         pred_mapping,
         args.only_common,
         args.only_in_domain,
+        args.workers,
+        args.metrics,
     )
-    print(json.dumps(results, ensure_ascii=False, indent=2))
+    write_results(results, sys.stdout, args.compact, args.details)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,53 @@
+"""
+Index Gold Graphs
+
+This script precomputes the graph index (``<graph file>.index/``) of one or
+more gold graphs, so that every later compute_metrics.py run against them
+opens the index instead of parsing the graph again.
+"""
+import sys
+from argparse import ArgumentParser
+from automap.grapheval.metrics import build_index, open_index
+from automap.grapheval.metrics.index import index_path
+
+
+def parse_args():
+    """Parse command-line arguments."""
+    parser = ArgumentParser(
+        description="Build the on-disk index of gold RDF graphs.",
+    )
+    parser.add_argument(
+        'graphs',
+        type=str,
+        nargs='+',
+        help='Paths to the gold standard RDF graph files'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        required=False,
+        help='Number of worker processes used to load N-Triples graphs (default: one per CPU for large files)'
+    )
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Rebuild the index even if it is up to date.'
+    )
+
+    return parser.parse_args()
+
+
+def main():
+    """Main CLI entry point."""
+    args = parse_args()
+
+    for graph in args.graphs:
+        if not args.force and open_index(graph) is not None:
+            print(f"{index_path(graph)} is up to date", file=sys.stderr)
+            continue
+
+        print(build_index(graph, args.workers))
+
+
+if __name__ == '__main__':
+    main()
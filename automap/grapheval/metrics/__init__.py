@@ -6,16 +6,42 @@ This package contains the core evaluation logic for RDF graph comparison.
 
 from .evaluator import GraphEvaluator
 from .hierarchy import HierarchyScorer
+from .hierarchy_index import HierarchyIndex
 from .basic_metrics import BasicMetrics
+from .common_metrics import CommonMetrics
 from .property_metrics import PropertyMetrics
 from .object_metrics import ObjectMetrics
 from .domain_metrics import DomainMetrics
+from .ontology import OntologySnapshot
+from .terms import TermDictionary, EncodedGraph
+from .loader import load_ntriples, load_ntriples_blocks, load_graph
+from .index import build_index, open_index, open_graph
+from .statistics import PredicateStatistics
+from .streaming import StreamingEvaluator
+from .registry import MetricSpec, register_metric, register_intermediate, metric_names
 
 __all__ = [
     'GraphEvaluator',
     'HierarchyScorer',
+    'HierarchyIndex',
     'BasicMetrics',
+    'CommonMetrics',
     'PropertyMetrics',
     'ObjectMetrics',
-    'DomainMetrics'
+    'DomainMetrics',
+    'OntologySnapshot',
+    'TermDictionary',
+    'EncodedGraph',
+    'load_ntriples',
+    'load_ntriples_blocks',
+    'load_graph',
+    'build_index',
+    'open_index',
+    'open_graph',
+    'PredicateStatistics',
+    'StreamingEvaluator',
+    'MetricSpec',
+    'register_metric',
+    'register_intermediate',
+    'metric_names',
 ]
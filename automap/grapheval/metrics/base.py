@@ -1,9 +1,11 @@
 from rdflib import Graph
 from automap.utils import Config
+from .terms import TermDictionary
 
 
 class Metrics:
-    def __init__(self, test_graph: Graph, reference_graph: Graph, ontology_graph: Graph = None, config: Config = None):
+    def __init__(self, test_graph: Graph, reference_graph: Graph, ontology_graph: Graph = None, config: Config = None,
+                 terms: TermDictionary = None):
         """
         Initialize basic metrics calculator.
 
@@ -12,8 +14,13 @@ class Metrics:
             reference_graph: The ground truth RDF graph
             ontology_graph: The ontology RDF graph for hierarchy-based metrics (optional)
             config: Configuration object (optional)
+            terms: Shared term dictionary (optional). A private one is created if not provided
         """
         self.test_graph = test_graph
         self.reference_graph = reference_graph
         self.config = config
         self.ontology_graph = ontology_graph
+
+        self.terms = terms if terms is not None else TermDictionary()
+        self.test_triples = self.terms.encode_graph(test_graph)
+        self.reference_triples = self.terms.encode_graph(reference_graph)
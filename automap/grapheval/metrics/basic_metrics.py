@@ -7,8 +7,9 @@ This module provides fundamental metrics for comparing RDF graphs:
 - Class comparison
 """
 
+from array import array
 from rdflib import URIRef
-from automap.utils import overlapping_lists, calculate_metrics
+from automap.utils import multiset_overlap, calculate_metrics
 from .base import Metrics
 
 
@@ -20,9 +21,9 @@ class BasicMetrics(Metrics):
         Returns:
             dict: Metrics including tp, fp, fn, tn, precision, recall, f1
         """
-        # Keep Python iteration for full graph scan (optimal for unfiltered)
-        test_triples = set([str(s) + str(p) + str(o) for s, p, o in self.test_graph])
-        reference_triples = set([str(s) + str(p) + str(o) for s, p, o in self.reference_graph])
+        lexical = self.terms.lexical
+        test_triples = set([(lexical[s], lexical[p], lexical[o]) for s, p, o in self.test_triples])
+        reference_triples = set([(lexical[s], lexical[p], lexical[o]) for s, p, o in self.reference_triples])
 
         tp = len(test_triples.intersection(reference_triples))
         fp = len(test_triples) - tp
@@ -38,9 +39,8 @@ class BasicMetrics(Metrics):
         Returns:
             dict: Metrics including tp, fp, fn, tn, precision, recall, f1
         """
-        # Optimized: Use RDFLib's subjects() method
-        test_subjects = set(self.test_graph.subjects())
-        reference_subjects = set(self.reference_graph.subjects())
+        test_subjects = set(self.test_triples.subjects)
+        reference_subjects = set(self.reference_triples.subjects)
 
         tp = len(test_subjects.intersection(reference_subjects))
         fp = len(test_subjects) - tp
@@ -58,22 +58,22 @@ class BasicMetrics(Metrics):
         Returns:
             dict: Metrics including tp, fp, fn, tn, precision, recall, f1
         """
-        # Optimized: Use RDFLib's subjects() method
-        test_subjects = set(self.test_graph.subjects())
-        reference_subjects = set(self.reference_graph.subjects())
-        reference_ids = [str(s).split("/")[-1] for s in reference_subjects]
-
-        tp = 0
-        for s in test_subjects:
-            if any(ref_id in str(s) for ref_id in reference_ids):
-                tp += 1
+        test_subjects = set(self.test_triples.subjects)
+        reference_subjects = set(self.reference_triples.subjects)
 
+        tp = self._count_fuzzy_subject_matches(test_subjects)
         fp = len(test_subjects) - tp
         fn = len(reference_subjects) - tp
         tn = 0
 
         return calculate_metrics(tp, fp, fn, tn)
 
+    def _count_fuzzy_subject_matches(self, test_subjects: set) -> int:
+        """Count test subjects whose IRI contains the ID (last path segment) of any reference subject."""
+        matcher = self.reference_triples.subject_id_matcher
+        text = self.terms.text
+        return sum(1 for s in test_subjects if matcher.contains_any(text(s)))
+
     def evaluate_classes_unique(self) -> dict:
         """
         Evaluate unique classes (rdf:type objects) used in the graphs.
@@ -81,10 +81,8 @@ class BasicMetrics(Metrics):
         Returns:
             dict: Metrics and lists of test/reference classes
         """
-        # Optimized: Use RDFLib's objects() method with predicate filter (10x faster!)
-        rdf_type = URIRef(self.config.rdf_type_uri)
-        test_classes = set(self.test_graph.objects(predicate=rdf_type))
-        reference_classes = set(self.reference_graph.objects(predicate=rdf_type))
+        test_classes = set(self._class_ids(self.test_triples))
+        reference_classes = set(self._class_ids(self.reference_triples))
 
         tp = len(test_classes.intersection(reference_classes))
         fp = len(test_classes) - tp
@@ -92,8 +90,8 @@ class BasicMetrics(Metrics):
         tn = 0
 
         return {
-            'test_classes': list(test_classes),
-            'reference_classes': list(reference_classes),
+            'test_classes': self.terms.decode_terms(test_classes),
+            'reference_classes': self.terms.decode_terms(reference_classes),
             **calculate_metrics(tp, fp, fn, tn),
         }
 
@@ -106,18 +104,21 @@ class BasicMetrics(Metrics):
         Returns:
             dict: Metrics including tp, fp, fn, tn, precision, recall, f1, and class lists
         """
-        # Optimized: Use RDFLib's objects() method with predicate filter
-        rdf_type = URIRef(self.config.rdf_type_uri)
-        test_classes = list(self.test_graph.objects(predicate=rdf_type))
-        reference_classes = list(self.reference_graph.objects(predicate=rdf_type))
+        test_classes = self._class_ids(self.test_triples)
+        reference_classes = self._class_ids(self.reference_triples)
 
-        tp = len(overlapping_lists(test_classes, reference_classes))
+        tp = multiset_overlap(test_classes, reference_classes)
         fp = len(test_classes) - tp
         fn = len(reference_classes) - tp
         tn = 0
 
         return {
-            'test_classes': test_classes,
-            'reference_classes': reference_classes,
+            'test_classes': self.terms.decode_terms(test_classes),
+            'reference_classes': self.terms.decode_terms(reference_classes),
             **calculate_metrics(tp, fp, fn, tn)
         }
+
+    def _class_ids(self, triples) -> array:
+        """Return the term ids of every rdf:type object of an encoded graph."""
+        rdf_type = self.terms.find(URIRef(self.config.rdf_type_uri))
+        return array('q', [o for s, p, o in triples if p == rdf_type])
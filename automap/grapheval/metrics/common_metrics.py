@@ -0,0 +1,159 @@
+"""
+Single-Pass Common Metrics
+
+This module provides an engine that computes every common (ontology-free)
+metric from a single traversal of each graph:
+- Triples, subjects and fuzzy subjects
+- Classes and unique classes
+- Properties, property-object pairs and property-datatype pairs
+- Objects, object URIs and object literals
+"""
+
+from array import array
+from functools import cached_property
+from types import SimpleNamespace
+from typing import Iterable, Optional
+from rdflib import URIRef
+from automap.utils import multiset_overlap, calculate_metrics
+from .basic_metrics import BasicMetrics
+from .terms import EncodedGraph, LITERAL, URI
+
+
+class CommonMetrics(BasicMetrics):
+    """
+    Compute the common metrics visiting each graph only once.
+
+    Produces the same result dict as running the individual methods of
+    BasicMetrics, PropertyMetrics and ObjectMetrics one after another.
+    """
+
+    def _scan(self, triples: EncodedGraph) -> SimpleNamespace:
+        """Traverse an encoded graph once, filling every accumulator used by the common metrics."""
+        lexical, kinds, datatypes = self.terms.lexical, self.terms.kinds, self.terms.datatypes
+        rdf_type = self.terms.find(URIRef(self.config.rdf_type_uri))
+
+        # Integer accumulators are arrays so large inputs take the NumPy path of multiset_overlap
+        acc = SimpleNamespace(
+            triples=set(), subjects=set(), classes=array('q'), predicates=triples.predicates, po=set(),
+            p_datatype=[], objects=array('q'), uris=array('q'), literals=array('q'),
+        )
+        for s, p, o in triples:
+            lex_p, lex_o = lexical[p], lexical[o]
+            acc.triples.add((lexical[s], lex_p, lex_o))
+            acc.subjects.add(s)
+            acc.po.add((lex_p, lex_o))
+            acc.objects.append(lex_o)
+
+            kind = kinds[o]
+            if kind == URI:
+                acc.uris.append(lex_o)
+            elif kind == LITERAL:
+                acc.literals.append(lex_o)
+                acc.p_datatype.append((lex_p, datatypes[o]))
+
+            if p == rdf_type:
+                acc.classes.append(o)
+
+        return acc
+
+    @cached_property
+    def test_scan(self) -> SimpleNamespace:
+        """Accumulators of the test graph, from a single traversal."""
+        return self._scan(self.test_triples)
+
+    @cached_property
+    def reference_scan(self) -> SimpleNamespace:
+        """Accumulators of the reference graph, from a single traversal."""
+        return self._scan(self.reference_triples)
+
+    @staticmethod
+    def _set_metrics(test: set, reference: set) -> dict:
+        tp = len(test.intersection(reference))
+        return calculate_metrics(tp, len(test) - tp, len(reference) - tp, 0)
+
+    @staticmethod
+    def _list_metrics(test: list, reference: list) -> dict:
+        tp = multiset_overlap(test, reference)
+        return calculate_metrics(tp, len(test) - tp, len(reference) - tp, 0)
+
+    def evaluate(self, metrics: Optional[Iterable[str]] = None) -> dict:
+        """
+        Run the common metrics from one traversal per graph.
+
+        Args:
+            metrics: Names of the metrics to compute (default: all of them)
+
+        Returns:
+            dict: Results keyed as in GraphEvaluator.evaluate_common
+        """
+        test = self.test_scan
+        reference = self.reference_scan
+        terms = self.terms
+
+        def subjects_fuzzy() -> dict:
+            fuzzy_tp = self._count_fuzzy_subject_matches(test.subjects)
+            return calculate_metrics(fuzzy_tp, len(test.subjects) - fuzzy_tp, len(reference.subjects) - fuzzy_tp, 0)
+
+        def classes_unique() -> dict:
+            test_classes_unique = set(test.classes)
+            reference_classes_unique = set(reference.classes)
+            return {
+                'test_classes': terms.decode_terms(test_classes_unique),
+                'reference_classes': terms.decode_terms(reference_classes_unique),
+                **self._set_metrics(test_classes_unique, reference_classes_unique),
+            }
+
+        def predicate_datatype_range_unique() -> dict:
+            test_p_datatype_unique = set(test.p_datatype)
+            reference_p_datatype_unique = set(reference.p_datatype)
+            return {
+                'test_p_datatype': terms.decode_pairs(test_p_datatype_unique),
+                'reference_p_datatype': terms.decode_pairs(reference_p_datatype_unique),
+                **self._set_metrics(test_p_datatype_unique, reference_p_datatype_unique),
+            }
+
+        builders = {
+            # Basic metrics
+            'triples': lambda: self._set_metrics(test.triples, reference.triples),
+            'subjects': lambda: self._set_metrics(test.subjects, reference.subjects),
+            'subjects_fuzzy': subjects_fuzzy,
+            'classes': lambda: {
+                'test_classes': terms.decode_terms(test.classes),
+                'reference_classes': terms.decode_terms(reference.classes),
+                **self._list_metrics(test.classes, reference.classes),
+            },
+            'classes_unique': classes_unique,
+
+            # Property metrics
+            'predicates': lambda: self._list_metrics(test.predicates, reference.predicates),
+            'predicates_unique': lambda: {
+                'test_po': terms.decode_pairs(test.po),
+                'reference_po': terms.decode_pairs(reference.po),
+                **self._set_metrics(test.po, reference.po),
+            },
+            'predicate_datatype_range': lambda: {
+                'test_p_datatype': terms.decode_pairs(test.p_datatype),
+                'reference_p_datatype': terms.decode_pairs(reference.p_datatype),
+                **self._list_metrics(test.p_datatype, reference.p_datatype),
+            },
+            'predicate_datatype_range_unique': predicate_datatype_range_unique,
+
+            # Object metrics
+            'objects': lambda: {
+                'test_objects': terms.decode(test.objects),
+                'reference_objects': terms.decode(reference.objects),
+                **self._list_metrics(test.objects, reference.objects),
+            },
+            'objects_uris': lambda: {
+                'test_uris': terms.decode(test.uris),
+                'reference_uris': terms.decode(reference.uris),
+                **self._list_metrics(test.uris, reference.uris),
+            },
+            'objects_literals': lambda: {
+                'test_literals': terms.decode(test.literals),
+                'reference_literals': terms.decode(reference.literals),
+                **self._list_metrics(test.literals, reference.literals),
+            },
+        }
+
+        return {name: builders[name]() for name in (builders if metrics is None else metrics)}
@@ -5,9 +5,12 @@ This module provides domain-specific evaluation metrics tailored to
 particular use cases (e.g., entity identification, specific property validation).
 """
 
-from rdflib import Literal, URIRef
+from functools import cached_property
+from rdflib import URIRef
+from automap.utils.matching import SubstringMatcher
 from .hierarchy import HierarchyScorer
 from .base import Metrics
+from .statistics import PredicateStatistics
 
 
 class DomainMetrics(Metrics):
@@ -22,10 +25,8 @@ class DomainMetrics(Metrics):
             int: Count of entities with matching IDs
         """
         entity_ids = set(self.config.ids_by_type.get(entity_type, []))
-        # Optimized: Use RDFLib's subjects() method
-        subjects = set([str(s) for s in self.test_graph.subjects() if str(s).startswith(self.config.base_iri)])
 
-        return sum(1 for subject in subjects if any(entity_id in subject for entity_id in entity_ids))
+        return sum(1 for ids in self._subject_entity_ids.values() if not entity_ids.isdisjoint(ids))
 
     def check_all_entity_ids_present(self, entity_type: str) -> int:
         """
@@ -38,11 +39,8 @@ class DomainMetrics(Metrics):
             int: 1 if all present, 0 otherwise
         """
         entity_ids = set(self.config.ids_by_type.get(entity_type, []))
-        # Optimized: Use RDFLib's subjects() method
-        subjects = set([str(s) for s in self.test_graph.subjects() if str(s).startswith(self.config.base_iri)])
 
-        matched_ids = sum(1 for entity_id in entity_ids if any(entity_id in subject for subject in subjects))
-        return 1 if matched_ids == len(entity_ids) else 0
+        return 1 if entity_ids <= self._found_entity_ids else 0
 
     def count_entity_ids_with_type(self, entity_type: str) -> int:
         """
@@ -55,13 +53,14 @@ class DomainMetrics(Metrics):
             int: Count of correctly typed entities
         """
         entity_ids = set(self.config.ids_by_type.get(entity_type, []))
-        # Optimized: Use RDFLib's subjects() method with predicate and object filters
-        rdf_type = URIRef(self.config.rdf_type_uri)
-        entity_type_uri = URIRef(entity_type)
-        subjects_with_type = set([str(s) for s in self.test_graph.subjects(predicate=rdf_type, object=entity_type_uri)
-                                  if str(s).startswith(self.config.base_iri)])
+        rdf_type = self.terms.find(URIRef(self.config.rdf_type_uri))
+        entity_type_id = self.terms.find(URIRef(entity_type))
+        text = self.terms.text
+        base_iri = self.config.base_iri
+        subjects_with_type = set([text(s) for s, p, o in self.test_triples
+                                  if p == rdf_type and o == entity_type_id and text(s).startswith(base_iri)])
 
-        return sum(1 for subject in subjects_with_type if any(entity_id in subject for entity_id in entity_ids))
+        return sum(1 for subject in subjects_with_type if not entity_ids.isdisjoint(self._subject_entity_ids[subject]))
 
     def evaluate_predicate_details(self, predicate: str, hierarchy_scorer: HierarchyScorer = None) -> dict:
         """
@@ -76,20 +75,21 @@ class DomainMetrics(Metrics):
         """
         if not hierarchy_scorer and self.ontology_graph:
             hierarchy_scorer = HierarchyScorer(
-                self.ontology_graph,
+                self.test_graph,
                 self.reference_graph,
-                self.test_graph
+                ontology_graph=self.ontology_graph,
+                config=self.config,
+                terms=self.terms
             )
 
-        predicate_count = len([s for s, p, o in self.test_graph if str(p) == predicate])
+        stats = self.test_triples.statistics(predicate) or PredicateStatistics()
+        predicate_count = stats.count
 
         result = {
             'predicate_used': 1 if predicate_count > 0 else 0,
             'usage_count': predicate_count,
-            'used_with_uris': len([s for s, p, o in self.test_graph
-                                   if str(p) == predicate and not isinstance(o, Literal)]),
-            'used_with_literals': len([s for s, p, o in self.test_graph
-                                       if str(p) == predicate and isinstance(o, Literal)])
+            'used_with_uris': stats.uri_count,
+            'used_with_literals': stats.literal_count
         }
 
         if hierarchy_scorer:
@@ -121,7 +121,7 @@ class DomainMetrics(Metrics):
             dict: Detailed metrics for each predicate
         """
         # Include predicates from reference graph plus common extras
-        predicates = set([str(p) for s, p, o in self.reference_graph])
+        predicates = self.terms.decode(self.reference_triples.predicate_statistics)
 
         results = {}
         for predicate in predicates:
@@ -129,6 +129,41 @@ class DomainMetrics(Metrics):
 
         return results
 
+    def _base_subjects(self) -> set:
+        """Return the test subjects (as strings) that live under the configured base IRI."""
+        subjects = set([self.terms.text(s) for s in self.test_triples.subjects])
+        return set([s for s in subjects if s.startswith(self.config.base_iri)])
+
+    @cached_property
+    def _entity_id_matcher(self) -> SubstringMatcher:
+        """Matcher over every expected entity ID, across all types."""
+        entity_ids = set()
+        for ids in self.config.ids_by_type.values():
+            entity_ids.update(ids)
+        return SubstringMatcher(sorted(entity_ids))
+
+    @cached_property
+    def _subject_entity_ids(self) -> dict:
+        """Map each test subject under the base IRI to the expected entity IDs it contains."""
+        matcher = self._entity_id_matcher
+        patterns = matcher.patterns
+        return {
+            subject: set([patterns[index] for index in matcher.find_all(subject)])
+            for subject in self._base_subjects()
+        }
+
+    @cached_property
+    def _found_entity_ids(self) -> set:
+        """Expected entity IDs contained in at least one test subject."""
+        found = set()
+        for ids in self._subject_entity_ids.values():
+            found.update(ids)
+        return found
+
+    def build_entity_index(self) -> set:
+        """Build (once) the expected entity IDs found in the test subjects, read by the coverage metrics."""
+        return self._found_entity_ids
+
     def summarize_entity_coverage(self) -> dict:
         """
         Summarize coverage of expected entities across all types.
@@ -6,14 +6,21 @@ all evaluation metrics for RDF graph comparison.
 """
 
 from rdflib import Graph
+from functools import cached_property
 from pathlib import Path
-from typing import Union, Optional
+from typing import Iterable, Union, Optional
 from automap.utils import Config
 from .basic_metrics import BasicMetrics
+from .common_metrics import CommonMetrics
 from .property_metrics import PropertyMetrics
 from .object_metrics import ObjectMetrics
 from .domain_metrics import DomainMetrics
 from .hierarchy import HierarchyScorer
+from .index import open_graph
+from .ontology import OntologySnapshot
+from .parallel import parallel_map
+from .registry import COMMON, IN_DOMAIN, METRICS, INTERMEDIATES, metric_names, resolve_metrics, required_intermediates
+from .terms import TermDictionary, EncodedGraph
 
 
 class GraphEvaluator:
@@ -31,21 +38,25 @@ class GraphEvaluator:
 
     def __init__(
             self,
-            test_graph: Graph,
-            reference_graph: Graph,
+            test_graph: Union[Graph, EncodedGraph],
+            reference_graph: Union[Graph, EncodedGraph, str, Path],
             config: Optional[Union[Config, str, Path]] = None
     ):
         """
         Initialize the graph evaluator.
 
         Args:
-            test_graph: The RDF graph to evaluate
-            reference_graph: The ground truth RDF graph
+            test_graph: The RDF graph to evaluate (rdflib Graph, or EncodedGraph from load_ntriples)
+            reference_graph: The ground truth RDF graph (encoded with the same TermDictionary if encoded),
+                   or the path to it, opened through its graph index when one is up to date
             ontology_graph: The ontology RDF graph for hierarchy-based metrics (optional)
             config: Configuration object or path to YAML config file (optional)
                    If string/Path provided, will load Config from that path
                    If None, will use default global configuration for backward compatibility
         """
+        if isinstance(reference_graph, (str, Path)):
+            reference_graph = open_graph(reference_graph)
+
         self.test_graph = test_graph
         self.reference_graph = reference_graph
 
@@ -56,33 +67,88 @@ class GraphEvaluator:
         else:
             raise TypeError(f"config must be Config, str, Path, or None, got {type(config)}")
 
-        with open(self.config.ontology_file, 'r') as f:
-            ontology_data = f.read()
+        # Intern every term of both graphs once; all metric classes share the integer encoding.
+        # Graphs loaded with load_ntriples already are, and bring their dictionary along
+        encoded = [graph for graph in (reference_graph, test_graph) if isinstance(graph, EncodedGraph)]
+        self.terms = encoded[0].terms if encoded else TermDictionary()
+        self.test_triples = self.terms.encode_graph(test_graph)
+        self.reference_triples = self.terms.encode_graph(reference_graph)
+
+        # Intermediates built so far (see build_intermediates)
+        self._built_intermediates = set()
+
+        # The ontology and the components below are built on first access, so that metrics
+        # that do not need them (e.g. the common ones) never load the ontology
 
+    @cached_property
+    def ontology(self) -> OntologySnapshot:
+        """The ontology snapshot, loaded on first access (see OntologySnapshot)."""
         # Auto-detect RDF format from file extension
         ontology_format = self._detect_rdf_format(self.config.ontology_file)
-        self.ontology_graph = Graph().parse(data=ontology_data, format=ontology_format)
+
+        # Parsed triples, declarations and hierarchy indexes come from the content-addressed snapshot cache
+        ontology = OntologySnapshot.load(self.config.ontology_file, self.config, ontology_format)
 
         # Auto-extract namespaces and predicates from ontology if not provided in config
         # Pass ontology_path for caching
-        self.config.extract_from_ontology(self.ontology_graph, ontology_path=self.config.ontology_file)
+        self.config.extract_from_declarations(ontology.namespaces, ontology.properties,
+                                              ontology_path=self.config.ontology_file)
+        return ontology
+
+    @property
+    def ontology_graph(self) -> Graph:
+        """The ontology as an rdflib Graph (rebuilt from the snapshot on first access)."""
+        return self.ontology.graph
+
+    @cached_property
+    def common_metrics(self) -> CommonMetrics:
+        return CommonMetrics(self.test_graph, self.reference_graph, config=self.config, terms=self.terms)
+
+    @cached_property
+    def basic_metrics(self) -> BasicMetrics:
+        return BasicMetrics(self.test_graph, self.reference_graph, config=self.config, terms=self.terms)
+
+    @cached_property
+    def property_metrics(self) -> PropertyMetrics:
+        return PropertyMetrics(self.test_graph, self.reference_graph, terms=self.terms)
+
+    @cached_property
+    def object_metrics(self) -> ObjectMetrics:
+        return ObjectMetrics(self.test_graph, self.reference_graph, terms=self.terms)
 
+    @cached_property
+    def domain_metrics(self) -> DomainMetrics:
         # Auto-extract entity IDs from reference graph if not provided in config
-        self.config.extract_ids_from_graph(reference_graph)
-
-        self.basic_metrics = BasicMetrics(test_graph, reference_graph, config=self.config)
-        self.property_metrics = PropertyMetrics(test_graph, reference_graph)
-        self.object_metrics = ObjectMetrics(test_graph, reference_graph)
-        self.domain_metrics = DomainMetrics(test_graph, reference_graph, ontology_graph=self.ontology_graph, config=self.config)
-
-        self.hierarchy_scorer = None
-        if self.ontology_graph:
-            self.hierarchy_scorer = HierarchyScorer(
-                test_graph,
-                reference_graph,
-                ontology_graph=self.ontology_graph,
-                config=self.config
-            )
+        self.config.extract_ids_from_graph(self.reference_triples.iter_texts())
+        return DomainMetrics(self.test_graph, self.reference_graph, config=self.config, terms=self.terms)
+
+    @cached_property
+    def hierarchy_scorer(self) -> Optional[HierarchyScorer]:
+        """Scorer over the ontology hierarchies, or None if the ontology is empty."""
+        if not len(self.ontology):
+            return None
+
+        return HierarchyScorer(
+            self.test_graph,
+            self.reference_graph,
+            config=self.config,
+            terms=self.terms,
+            class_hierarchy=self.ontology.class_hierarchy,
+            property_hierarchy=self.ontology.property_hierarchy
+        )
+
+    def load_components(self, metrics: Optional[Iterable[str]] = None) -> None:
+        """
+        Load the components the metrics need (see evaluate), without computing anything.
+
+        The in-domain metrics need the ontology, the configuration completed from
+        it and the entity IDs of the reference graph; the common metrics need none of them.
+        """
+        specs = resolve_metrics(metrics)
+        if any(spec.group == IN_DOMAIN for spec in specs):
+            self.domain_metrics
+        if any(spec.needs_ontology for spec in specs):
+            self.hierarchy_scorer
 
     def _detect_rdf_format(self, filepath: Union[str, Path]) -> str:
         extension = Path(filepath).suffix.lower()
@@ -167,17 +233,17 @@ class GraphEvaluator:
             return {'error': 'Ontology not loaded, hierarchy scoring unavailable'}
         return self.hierarchy_scorer.evaluate_property_hierarchies()
 
-    def evaluate_properties_direct(self) -> dict:
-        """Evaluate all configured properties with direct matching."""
+    def evaluate_properties_direct(self, workers: int = None) -> dict:
+        """Evaluate all configured properties with direct matching (optionally over a worker pool)."""
         if not self.hierarchy_scorer:
             return {'error': 'Ontology not loaded, hierarchy scoring unavailable'}
-        return self.hierarchy_scorer.evaluate_all_properties_direct()
+        return self.hierarchy_scorer.evaluate_all_properties_direct(workers)
 
-    def evaluate_properties_inverse(self) -> dict:
-        """Evaluate all configured properties for inverse usage."""
+    def evaluate_properties_inverse(self, workers: int = None) -> dict:
+        """Evaluate all configured properties for inverse usage (optionally over a worker pool)."""
         if not self.hierarchy_scorer:
             return {'error': 'Ontology not loaded, hierarchy scoring unavailable'}
-        return self.hierarchy_scorer.evaluate_all_properties_inverse()
+        return self.hierarchy_scorer.evaluate_all_properties_inverse(workers)
 
     def evaluate_properties_with_hierarchy(self) -> dict:
         """Evaluate configured properties considering hierarchy."""
@@ -197,64 +263,97 @@ class GraphEvaluator:
 
     # ========== Comprehensive Evaluation ==========
 
-    def evaluate_all(self) -> dict:
+    def evaluate_all(self, workers: int = None) -> dict:
         """
         Run all available evaluation metrics.
 
+        Args:
+            workers: Number of worker processes (optional). With more than one,
+                the metrics and their per-predicate evaluations run
+                concurrently in forked workers; the results are the same as
+                (and serialize identically to) the sequential ones.
+
         Returns:
             dict: Comprehensive evaluation results with all metrics
         """
-        results = {
-            # Basic, property and object
-            **self.evaluate_common(),
-
-            # Domain-specific metrics
-            **self.evaluate_in_domain(),
-        }
-
-        return results
+        return self.evaluate(workers=workers)
 
     def evaluate_common(self) -> dict:
         """
         Run only basic evaluation metrics (fast, no ontology needed).
 
+        All common metrics are filled from a single traversal of each graph
+        (see CommonMetrics); the individual evaluate_* methods remain available.
+
         Returns:
             dict: Basic evaluation results
         """
-        return {
-            # Basic metrics
-            'triples': self.evaluate_triples(),
-            'subjects': self.evaluate_subjects_unique(),
-            'subjects_fuzzy': self.evaluate_subjects_fuzzy(),
-            'classes': self.evaluate_classes(),
-            'classes_unique': self.evaluate_classes_unique(),
-
-            # Property metrics
-            'predicates': self.evaluate_properties(),
-            'predicates_unique': self.evaluate_properties_unique(),
-            'predicate_datatype_range': self.evaluate_predicate_datatypes(),
-            'predicate_datatype_range_unique': self.evaluate_predicate_datatypes_unique(),
-
-            # Object metrics
-            'objects': self.evaluate_objects(),
-            'objects_uris': self.evaluate_object_uris(),
-            'objects_literals': self.evaluate_object_literals(),
-        }
+        return self.evaluate(metric_names(COMMON))
 
     def evaluate_in_domain(self) -> dict:
-        # Domain-specific metrics
-        metrics = {
-            'entity_coverage': self.evaluate_entity_coverage(),
-        }
+        """
+        Run only the domain-specific metrics (the hierarchy-based ones need the ontology).
+
+        Returns:
+            dict: Domain-specific evaluation results
+        """
+        return self.evaluate(metric_names(IN_DOMAIN))
+
+    def evaluate(self, metrics: Optional[Iterable[str]] = None, workers: int = None) -> dict:
+        """
+        Run a selection of the registered metrics (see registry.py).
+
+        Only the requested metrics and the intermediate structures they depend
+        on are computed, each intermediate once. Metrics that need the ontology
+        are left out when it is not loaded.
+
+        Args:
+            metrics: Metric names (default: every registered metric)
+            workers: Number of worker processes to spread the metrics, and their
+                per-predicate evaluations, over (optional)
+
+        Returns:
+            dict: Results keyed by metric name, in registry order
+
+        Raises:
+            ValueError: If a metric name is not registered
+        """
+        specs = [spec for spec in resolve_metrics(metrics) if not spec.needs_ontology or self.hierarchy_scorer]
+        items = {spec.name: spec.items(self) for spec in specs if spec.items is not None}
+
+        tasks = []
+        for spec in specs:
+            if spec.items is None:
+                tasks.append((spec.name,))
+            else:
+                tasks.extend((spec.name, item) for item in items[spec.name])
+
+        if workers and workers > 1:
+            # Load the components and build the shared structures first, so that every worker inherits them
+            self.load_components([spec.name for spec in specs])
+            self.build_intermediates(required_intermediates(specs))
+        outputs = iter(parallel_map(self, '_run_task', tasks, workers))
+
+        results = {}
+        for spec in specs:
+            if spec.items is None:
+                results[spec.name] = next(outputs)
+            else:
+                value = {}
+                for item in items[spec.name]:
+                    value[item] = next(outputs)
+                results[spec.name] = value
+
+        return results
 
-        if self.hierarchy_scorer:
-            metrics.update({
-                'classes_with_hierarchy': self.evaluate_class_hierarchies(),
-                'predicates_with_hierarchy': self.evaluate_property_hierarchies(),
-                'single_property_hierarchy_scores': self.evaluate_properties_with_hierarchy(),
-                'predicates_direct': self.evaluate_properties_direct(),
-                'predicates_inverse': self.evaluate_properties_inverse(),
-                'predicate_details': self.evaluate_predicate_details(),
-            })
-
-        return metrics
+    def build_intermediates(self, names: Iterable[str]) -> None:
+        """Build the named intermediates (see registry.py) that are not built yet, in the given order."""
+        for name in names:
+            if name not in self._built_intermediates:
+                INTERMEDIATES[name].build(self)
+                self._built_intermediates.add(name)
+
+    def _run_task(self, task: tuple):
+        """Compute one metric, (name,), or one item of a per-item metric, (name, item)."""
+        name, *args = task
+        return METRICS[name].compute(self, *args)
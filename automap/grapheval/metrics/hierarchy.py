@@ -5,19 +5,34 @@ This module provides functionality for calculating similarity scores based on
 ontology hierarchies (class and property hierarchies).
 """
 
-from rdflib import Graph
-from rdflib.term import Literal
-from collections import defaultdict
+import re
+from rdflib import Graph, RDF
+from collections import Counter, defaultdict
+from functools import cached_property
 from .base import Metrics
+from .hierarchy_index import HierarchyIndex
+from .parallel import parallel_map
+from .terms import TermDictionary, EncodedGraph, LITERAL
 from automap.utils import (
     Config,
-    overlapping_lists,
+    multiset_overlap,
     average,
     precision_score,
     recall_score,
     f1_score
 )
 
+# Key extractors available to index subjects for alignment (config: subject_alignment_keys)
+SUBJECT_KEY_EXTRACTORS = {
+    'last_segment': lambda iri: iri.split("/")[-1],
+    'fragment': lambda iri: iri.split("#")[-1],
+    'query_value': lambda iri: iri.split("=")[-1],
+}
+
+_SELECT_PATTERN = re.compile(r'\bSELECT\s+(?:(?:DISTINCT|REDUCED)\s+)?', re.IGNORECASE)
+_PROJECTION_END = re.compile(r'\bWHERE\b|\{', re.IGNORECASE)
+_SUBJECT_VARIABLE = re.compile(r'[?$]s\b')
+
 
 class HierarchyScorer(Metrics):
     """
@@ -28,7 +43,9 @@ class HierarchyScorer(Metrics):
     parent classes/properties in the hierarchy.
     """
 
-    def __init__(self, test_graph: Graph, reference_graph: Graph, ontology_graph: Graph = None, config: Config = None):
+    def __init__(self, test_graph: Graph, reference_graph: Graph, ontology_graph: Graph = None, config: Config = None,
+                 terms: TermDictionary = None, class_hierarchy: HierarchyIndex = None,
+                 property_hierarchy: HierarchyIndex = None):
         """
         Initialize the hierarchy scorer.
 
@@ -37,164 +54,295 @@ class HierarchyScorer(Metrics):
             reference_graph: Ground truth RDF graph
             test_graph: Test/predicted RDF graph to evaluate
             config: Optional configuration object
+            terms: Shared term dictionary (optional)
+            class_hierarchy: Prebuilt class hierarchy index (optional, e.g. from an OntologySnapshot)
+            property_hierarchy: Prebuilt property hierarchy index (optional)
         """
-        super().__init__(test_graph, reference_graph, ontology_graph, config)
+        super().__init__(test_graph, reference_graph, ontology_graph, config, terms)
 
-        self.class_paths = self._build_transitive_closure(self._extract_class_relations(ontology_graph))
-        self.property_paths = self._build_transitive_closure(self._extract_property_relations(ontology_graph))
-        self.subject_alignment = self._align_subjects(test_graph, reference_graph, self.config.base_iri)
+        if class_hierarchy is None:
+            class_hierarchy = self._build_hierarchy_index(self._extract_class_relations(ontology_graph))
+        if property_hierarchy is None:
+            property_hierarchy = self._build_hierarchy_index(self._extract_property_relations(ontology_graph))
+        self.class_hierarchy = class_hierarchy
+        self.property_hierarchy = property_hierarchy
 
-    def _extract_class_relations(self, ontology_graph: Graph) -> dict:
-        """Extract class-subclass relationships from ontology."""
-        class_relations = {}
-        query_results = ontology_graph.query(self.config.subclass_query)
-
-        for result in query_results:
-            super_class = str(result[0])
-            sub_class = str(result[1])
-            class_relations[sub_class] = super_class
+    @staticmethod
+    def _extract_relations(ontology_graph: Graph, query: str) -> list:
+        """Extract (child, parent) relationships returned as (parent, child) rows by a query."""
+        return [(str(result[1]), str(result[0])) for result in ontology_graph.query(query)]
 
-        return class_relations
+    def _extract_class_relations(self, ontology_graph: Graph) -> list:
+        """Extract class-subclass relationships from ontology."""
+        return self._extract_relations(ontology_graph, self.config.subclass_query)
 
-    def _extract_property_relations(self, ontology_graph: Graph) -> dict:
+    def _extract_property_relations(self, ontology_graph: Graph) -> list:
         """Extract property-subproperty relationships from ontology."""
-        property_relations = {}
-        query_results = ontology_graph.query(self.config.subproperty_query)
-
-        for result in query_results:
-            super_property = str(result[0])
-            sub_property = str(result[1])
-            property_relations[sub_property] = super_property
-
-        return property_relations
+        return self._extract_relations(ontology_graph, self.config.subproperty_query)
 
     @staticmethod
-    def _build_transitive_closure(hierarchy_dict: dict) -> dict:
+    def _build_hierarchy_index(relations: list) -> HierarchyIndex:
         """
-        Build transitive closure of hierarchy relationships.
+        Build the hierarchy index of (child, parent) relationships.
 
-        For each element, creates a list containing itself and all its ancestors
-        in order from most specific to most general.
+        Every parent of a node is kept, and the shortest distance from each node
+        to all of its ancestors is precomputed.
         """
-        all_elements = set(hierarchy_dict.keys()) | set(hierarchy_dict.values())
-        closure = defaultdict(list)
-
-        for element in all_elements:
-            current = element
-            closure[element].append(current)
-
-            while hierarchy_dict.get(current):
-                current = hierarchy_dict[current]
-                closure[element].append(current)
-
-        return closure
+        return HierarchyIndex(relations).precompute()
 
     @staticmethod
     def _calculate_hierarchy_similarity(reference_resource: str, test_resource: str,
-                                        hierarchy_paths: dict) -> float:
+                                        hierarchy: HierarchyIndex, descendant_decay: float = 0.0) -> float:
         """
         Calculate similarity score based on hierarchy distance.
 
-        Returns 1.0 for exact match, 0.5^n for n steps up in hierarchy, 0.0 otherwise.
+        Returns 1.0 for exact match, 0.5^n when the test resource is n steps above
+        the reference resource, descendant_decay^n when it is n steps below it
+        (more specific than the reference), and 0.0 otherwise.
         """
         if reference_resource == test_resource:
             return 1.0
-        elif test_resource in hierarchy_paths.get(reference_resource, []):
-            path = hierarchy_paths[reference_resource]
-            distance = path.index(test_resource)
+
+        distance = hierarchy.ancestor_distance(reference_resource, test_resource)
+        if distance is not None:
             return 0.5 ** distance
-        elif reference_resource in hierarchy_paths.get(test_resource, []):
-            # TODO: Handle case where test is more specific than reference
-            return 0.0
-        else:
-            return 0.0
+
+        distance = hierarchy.descendant_distance(reference_resource, test_resource)
+        if distance is not None:
+            return descendant_decay ** distance
+
+        return 0.0
 
     @staticmethod
-    def _align_subjects(test_graph: Graph, reference_graph: Graph, prefix: str) -> list:
+    def _align_subjects(test_triples: EncodedGraph, reference_triples: EncodedGraph, prefix: str,
+                        key_extractors: list = ('last_segment',)) -> list:
         """
         Align subjects between test and reference graphs based on IRI structure.
 
-        Returns list of tuples: (reference_subject_iri, test_subject_iri)
+        Reference subjects are indexed by every configured key extractor, and each
+        test subject under ``prefix`` is resolved by hash lookups of its own keys
+        (extractors tried in order). Subjects without a key hit fall back to the
+        substring matcher over reference IDs, where the longest ID wins and ties
+        go to the lexicographically smallest one.
+
+        Returns list of tuples sorted by test subject: (reference_subject_iri, test_subject_iri)
         """
-        test_subjects = set([s for s, p, o in test_graph])
-        reference_subjects = set([s for s, p, o in reference_graph])
-        reference_ids = [str(s).split("/")[-1] for s in reference_subjects]
+        unknown = [name for name in key_extractors if name not in SUBJECT_KEY_EXTRACTORS]
+        if unknown:
+            raise ValueError(f"Unknown subject alignment keys {unknown}, "
+                             f"expected any of {list(SUBJECT_KEY_EXTRACTORS)}")
+        extractors = [SUBJECT_KEY_EXTRACTORS[name] for name in key_extractors]
+
+        terms = test_triples.terms
+        test_subjects = sorted(set([terms.text(s) for s in set(test_triples.subjects)]))
+        reference_subjects = sorted(set([terms.text(s) for s in set(reference_triples.subjects)]))
+
+        indexes = []
+        for extractor in extractors:
+            index = {}
+            for ref_subject in reference_subjects:
+                index.setdefault(extractor(ref_subject), ref_subject.split("/")[-1])
+            indexes.append(index)
+
+        matcher = reference_triples.subject_id_matcher
+        reference_ids = matcher.patterns
 
         alignments = []
-        for test_subject in test_subjects:
-            test_subject_str = str(test_subject)
-            if test_subject_str.startswith(prefix):
-                for ref_id in reference_ids:
-                    if ref_id in test_subject_str:
-                        alignments.append((prefix + ref_id, test_subject_str))
-                        break
+        for test_subject_str in test_subjects:
+            if not test_subject_str.startswith(prefix):
+                continue
+
+            ref_id = None
+            for extractor, index in zip(extractors, indexes):
+                ref_id = index.get(extractor(test_subject_str))
+                if ref_id is not None:
+                    break
+
+            if ref_id is None:
+                # Patterns are sorted, so the smallest index breaks ties between equally long IDs
+                candidates = set([index for _, index in matcher.iter_matches(test_subject_str)])
+                if candidates:
+                    ref_id = reference_ids[min(candidates, key=lambda i: (-len(reference_ids[i]), i))]
+
+            if ref_id is not None:
+                alignments.append((prefix + ref_id, test_subject_str))
 
         return alignments
 
+    @cached_property
+    def subject_alignment(self) -> list:
+        """Alignment of the test subjects with the reference subjects (see _align_subjects), built on first access."""
+        return self._align_subjects(
+            self.test_triples,
+            self.reference_triples,
+            self.config.base_iri,
+            self.config.subject_alignment_keys
+        )
+
+    def _subject_map(self, subject_alignments: list) -> dict:
+        """Map lexical ids of aligned test subjects to the lexical ids of their reference subjects."""
+        return {
+            self.terms.lexical_id(test): self.terms.lexical_id(ref)
+            for ref, test in subject_alignments
+        }
+
+    @cached_property
+    def subject_map(self) -> dict:
+        """Lexical id map from aligned test subjects to reference subjects, for the evaluator's alignment."""
+        return self._subject_map(self.subject_alignment)
+
+    def _property_join(self, subject_alignments: list) -> dict:
+        """
+        Hash join reference and test triples on their aligned (subject, object) key.
+
+        Both graphs are grouped by key, and every pair of triples sharing a key
+        contributes one (reference property, test property) match.
+
+        Returns:
+            dict: Reference property lexical id -> Counter of test property lexical ids
+        """
+        subject_map = self._subject_map(subject_alignments)
+        lexical = self.terms.lexical
+
+        reference_groups = defaultdict(Counter)
+        for s, p, o in self.reference_triples:
+            reference_groups[(lexical[s], lexical[o])][lexical[p]] += 1
+
+        test_groups = defaultdict(Counter)
+        for s, p, o in self.test_triples:
+            key = (subject_map.get(lexical[s], lexical[s]), subject_map.get(lexical[o], lexical[o]))
+            if key in reference_groups:
+                test_groups[key][lexical[p]] += 1
+
+        join = defaultdict(Counter)
+        for key, test_counts in test_groups.items():
+            for ref_p, ref_count in reference_groups[key].items():
+                for test_p, test_count in test_counts.items():
+                    join[ref_p][test_p] += ref_count * test_count
+
+        return join
+
+    @cached_property
+    def property_join(self) -> dict:
+        """Property join over the evaluator's subject alignment, computed once and shared by all property metrics."""
+        return self._property_join(self.subject_alignment)
+
+    def _get_property_join(self, subject_alignments: list) -> dict:
+        if subject_alignments is self.subject_alignment:
+            return self.property_join
+        return self._property_join(subject_alignments)
+
     def _align_properties(self, subject_alignments: list) -> list:
         """
         Align properties between graphs based on subject-object pairs.
 
         Returns list of tuples: (reference_property, test_property)
         """
-        subject_map = {test: ref for ref, test in subject_alignments}
-
-        reference_so_p = [
-            (str(s) + str(o), str(p))
-            for s, p, o in self.reference_graph
+        lexicals = self.terms.lexicals
+        return [
+            (lexicals[ref_p], lexicals[test_p])
+            for ref_p, test_counts in self._get_property_join(subject_alignments).items()
+            for test_p in test_counts
         ]
-        test_so_p = [
-            (subject_map.get(str(s), str(s)) + subject_map.get(str(o), str(o)), str(p))
-            for s, p, o in self.test_graph
-        ]
-
-        property_pairs = set()
-        for ref_so, ref_p in reference_so_p:
-            for test_so, test_p in test_so_p:
-                if ref_so == test_so:
-                    property_pairs.add((ref_p, test_p))
-
-        return list(property_pairs)
 
     def _align_subject_properties(self, subject_alignments: list) -> list:
         """Similar to _align_properties but returns all matches, not unique pairs."""
-        subject_map = {test: ref for ref, test in subject_alignments}
-
-        reference_so_p = [
-            (str(s) + str(o), str(p))
-            for s, p, o in self.reference_graph
-        ]
-        test_so_p = [
-            (subject_map.get(str(s), str(s)) + subject_map.get(str(o), str(o)), str(p))
-            for s, p, o in self.test_graph
+        lexicals = self.terms.lexicals
+        return [
+            (lexicals[ref_p], lexicals[test_p])
+            for ref_p, test_counts in self._get_property_join(subject_alignments).items()
+            for test_p, count in test_counts.items()
+            for _ in range(count)
         ]
 
-        property_pairs = []
-        for ref_so, ref_p in reference_so_p:
-            for test_so, test_p in test_so_p:
-                if ref_so == test_so:
-                    property_pairs.append((ref_p, test_p))
+    @staticmethod
+    def _bulk_subject_class_query(query: str) -> str:
+        """Project ?s in the subject-class query so it can run once with ?s unbound."""
+        projection = _SELECT_PATTERN.search(query)
+        if projection is None or query[projection.end():].lstrip().startswith('*'):
+            return query
+        end = _PROJECTION_END.search(query, projection.end())
+        if _SUBJECT_VARIABLE.search(query, projection.end(), end.start() if end else len(query)):
+            return query
+        return query[:projection.end()] + '?s ' + query[projection.end():]
+
+    def _build_subject_classes(self, graph: Graph, triples: EncodedGraph) -> dict:
+        """
+        Map every subject of a graph to its classes in a single pass.
 
-        return property_pairs
+        The default subject-class query (``?s a ?class``) is answered from the
+        encoded triples; a custom ``sparql_queries.subject_class`` query is run
+        once on the graph with ``?s`` unbound and its rows grouped by subject.
+        Classes are ordered most specific first (deepest in the class hierarchy),
+        then alphabetically, so subjects with several types resolve deterministically.
+
+        Returns:
+            dict: Subject IRI -> list of class IRIs
+        """
+        classes = defaultdict(set)
+
+        default_query = ' '.join(Config._default_subject_class_query().split())
+        if ' '.join(self.config.subject_class_query.split()) == default_query:
+            text = self.terms.text
+            type_triples = triples.partition(str(RDF.type))
+            for s, o in zip(type_triples.subjects, type_triples.objects):
+                classes[text(s)].add(text(o))
+        else:
+            if isinstance(graph, EncodedGraph):
+                graph = graph.graph
+            result_set = graph.query(self._bulk_subject_class_query(self.config.subject_class_query))
+            variables = [str(var) for var in result_set.vars]
+            subject_index = variables.index('s')
+            if 'class' in variables:
+                class_index = variables.index('class')
+            else:
+                class_index = next(i for i, var in enumerate(variables) if var != 's')
+            for result in result_set:
+                if result[subject_index] is not None and result[class_index] is not None:
+                    classes[str(result[subject_index])].add(str(result[class_index]))
+
+        def specificity(class_iri: str) -> tuple:
+            return -self.class_hierarchy.depth(class_iri), class_iri
+
+        return {subject: sorted(subject_classes, key=specificity) for subject, subject_classes in classes.items()}
+
+    @cached_property
+    def reference_subject_classes(self) -> dict:
+        """Subject -> classes map of the reference graph."""
+        return self._build_subject_classes(self.reference_graph, self.reference_triples)
+
+    @cached_property
+    def test_subject_classes(self) -> dict:
+        """Subject -> classes map of the test graph."""
+        return self._build_subject_classes(self.test_graph, self.test_triples)
 
     def _get_subject_class(self, subject: str, graph: Graph) -> str:
-        """Get the class of a subject from the graph."""
-        query = self.config.subject_class_query.replace("?s", f"<{subject}>")
-        result_set = graph.query(query)
-        for result in result_set:
-            return str(result[0])
-        return None
+        """Get the (most specific) class of a subject from the graph."""
+        if graph is self.reference_graph:
+            subject_classes = self.reference_subject_classes
+        elif graph is self.test_graph:
+            subject_classes = self.test_subject_classes
+        else:
+            subject_classes = self._build_subject_classes(graph, self.terms.encode_graph(graph))
+
+        classes = subject_classes.get(subject)
+        return classes[0] if classes else None
+
+    def _distinct_texts(self, term_ids) -> list:
+        """Return the distinct string forms of a column of term ids."""
+        lexicals, lexical = self.terms.lexicals, self.terms.lexical
+        return [lexicals[lexical_id] for lexical_id in set([lexical[t] for t in term_ids])]
 
     def calculate_class_similarity(self, reference_resource: str, test_resource: str) -> float:
         """Calculate similarity score for classes based on hierarchy."""
         return self._calculate_hierarchy_similarity(
-            reference_resource, test_resource, self.class_paths
+            reference_resource, test_resource, self.class_hierarchy, self.config.descendant_similarity_decay
         )
 
     def calculate_property_similarity(self, reference_resource: str, test_resource: str) -> float:
         """Calculate similarity score for properties based on hierarchy."""
         return self._calculate_hierarchy_similarity(
-            reference_resource, test_resource, self.property_paths
+            reference_resource, test_resource, self.property_hierarchy, self.config.descendant_similarity_decay
         )
 
     def evaluate_class_hierarchies(self) -> dict:
@@ -205,8 +353,8 @@ class HierarchyScorer(Metrics):
         """
         scores = []
 
-        s_ref = list(set([str(s) for s, p, o in self.reference_graph]))
-        s_test = list(set([str(s) for s, p, o in self.test_graph]))
+        s_ref = self._distinct_texts(self.reference_triples.subjects)
+        s_test = self._distinct_texts(self.test_triples.subjects)
 
         for ref_subj, test_subj in self.subject_alignment:
             ref_class = self._get_subject_class(ref_subj, self.reference_graph)
@@ -239,8 +387,8 @@ class HierarchyScorer(Metrics):
         s_alignments = self.subject_alignment
         p_alignments = self._align_properties(s_alignments)
 
-        p_ref = list(set([str(p) for s, p, o in self.reference_graph]))
-        p_test = list(set([str(p) for s, p, o in self.test_graph]))
+        p_ref = self._distinct_texts(self.reference_triples.predicates)
+        p_test = self._distinct_texts(self.test_triples.predicates)
 
         for ref_prop, test_prop in p_alignments:
             similarity = self.calculate_property_similarity(ref_prop, test_prop)
@@ -271,20 +419,19 @@ class HierarchyScorer(Metrics):
         Returns:
             dict: Metrics including tp, fp, fn, precision, recall, f1
         """
-        subject_map = {test: ref for ref, test in self.subject_alignment}
+        subject_map = self.subject_map
+        lexical = self.terms.lexical
 
         ref_spo = [
-            str(s) + str(p) + str(o)
-            for s, p, o in self.reference_graph
-            if str(p) == target_property
+            (lexical[s], lexical[p], lexical[o])
+            for s, p, o in self.reference_triples.partition(target_property)
         ]
         test_spo = [
-            subject_map.get(str(s), str(s)) + str(p) + subject_map.get(str(o), str(o))
-            for s, p, o in self.test_graph
-            if str(p) == target_property
+            (subject_map.get(lexical[s], lexical[s]), lexical[p], subject_map.get(lexical[o], lexical[o]))
+            for s, p, o in self.test_triples.partition(target_property)
         ]
 
-        tp = len(overlapping_lists(test_spo, ref_spo))
+        tp = multiset_overlap(test_spo, ref_spo)
         fp = len(test_spo) - tp
         fn = len(ref_spo) - tp
         tn = 0
@@ -308,20 +455,21 @@ class HierarchyScorer(Metrics):
         Returns:
             dict: Metrics including tp, fp, fn, precision, recall, f1
         """
-        subject_map = {test: ref for ref, test in self.subject_alignment}
+        subject_map = self.subject_map
+        lexical, kinds, datatypes = self.terms.lexical, self.terms.kinds, self.terms.datatypes
 
         ref_spo = [
-            str(s) + str(p) + str(o) + str(o.datatype)
-            for s, p, o in self.reference_graph
-            if str(p) == target_property and isinstance(o, Literal)
+            (lexical[s], lexical[p], lexical[o], datatypes[o])
+            for s, p, o in self.reference_triples.partition(target_property)
+            if kinds[o] == LITERAL
         ]
         test_spo = [
-            subject_map.get(str(s), str(s)) + str(p) + str(o) + str(o.datatype)
-            for s, p, o in self.test_graph
-            if str(p) == target_property and isinstance(o, Literal)
+            (subject_map.get(lexical[s], lexical[s]), lexical[p], lexical[o], datatypes[o])
+            for s, p, o in self.test_triples.partition(target_property)
+            if kinds[o] == LITERAL
         ]
 
-        tp = len(overlapping_lists(test_spo, ref_spo))
+        tp = multiset_overlap(test_spo, ref_spo)
         fp = len(test_spo) - tp
         fn = len(ref_spo) - tp
         tn = 0
@@ -345,21 +493,20 @@ class HierarchyScorer(Metrics):
         Returns:
             dict: Metrics including precision, recall, f1
         """
-        subject_map = {test: ref for ref, test in self.subject_alignment}
+        subject_map = self.subject_map
+        lexical = self.terms.lexical
 
         ref_spo = [
-            str(s) + str(p) + str(o)
-            for s, p, o in self.reference_graph
-            if str(p) == target_property
+            (lexical[s], lexical[p], lexical[o])
+            for s, p, o in self.reference_triples.partition(target_property)
         ]
         # Note: swapping s and o for inverse
         test_ops = [
-            subject_map.get(str(o), str(o)) + str(p) + subject_map.get(str(s), str(s))
-            for s, p, o in self.test_graph
-            if str(p) == target_property
+            (subject_map.get(lexical[o], lexical[o]), lexical[p], subject_map.get(lexical[s], lexical[s]))
+            for s, p, o in self.test_triples.partition(target_property)
         ]
 
-        tp = len(overlapping_lists(test_ops, ref_spo))
+        tp = multiset_overlap(test_ops, ref_spo)
         fp = len(test_ops) - tp
         fn = len(ref_spo) - tp
 
@@ -369,19 +516,33 @@ class HierarchyScorer(Metrics):
             'f1': f1_score(tp, fp, fn)
         }
 
-    def evaluate_all_properties_direct(self) -> dict:
-        """Evaluate all configured properties with direct matching."""
-        results = {}
-        for property_uri in self.config.predicates_to_evaluate:
-            results[property_uri] = self.evaluate_property_direct(property_uri)
-        return results
+    def _prepare_property_partitions(self) -> None:
+        """Build the shared state read by the per-property metrics (so forked workers inherit it)."""
+        self.subject_map
+        self.reference_triples.predicate_partitions
+        self.test_triples.predicate_partitions
 
-    def evaluate_all_properties_inverse(self) -> dict:
-        """Evaluate all configured properties for inverse usage."""
-        results = {}
-        for property_uri in self.config.predicates_to_evaluate:
-            results[property_uri] = self.evaluate_property_inverse(property_uri)
-        return results
+    def evaluate_all_properties_direct(self, workers: int = None) -> dict:
+        """
+        Evaluate all configured properties with direct matching.
+
+        Args:
+            workers: Number of worker processes to spread the properties over (optional)
+        """
+        self._prepare_property_partitions()
+        properties = self.config.predicates_to_evaluate
+        return dict(zip(properties, parallel_map(self, 'evaluate_property_direct', properties, workers)))
+
+    def evaluate_all_properties_inverse(self, workers: int = None) -> dict:
+        """
+        Evaluate all configured properties for inverse usage.
+
+        Args:
+            workers: Number of worker processes to spread the properties over (optional)
+        """
+        self._prepare_property_partitions()
+        properties = self.config.predicates_to_evaluate
+        return dict(zip(properties, parallel_map(self, 'evaluate_property_inverse', properties, workers)))
 
     def evaluate_single_property_hierarchy(self, target_property: str) -> dict:
         """
@@ -393,23 +554,21 @@ class HierarchyScorer(Metrics):
         Returns:
             dict: Metrics including precision, recall, f1
         """
-        scores = []
-        s_alignments = self.subject_alignment
-        p_alignments = self._align_subject_properties(s_alignments)
-        p_alignments = [p for p in p_alignments if p[0] == target_property]
-
-        p_ref = [
-            str(p)
-            for s, p, o in self.reference_graph
-            if str(p) == target_property
-        ]
-
-        for ref_prop, test_prop in p_alignments:
-            similarity = self.calculate_property_similarity(ref_prop, test_prop)
-            scores.append((ref_prop, test_prop, similarity))
-
-        precision = average([score[2] for score in scores])
-        recall = len([s for s in scores if s[2] > 0]) / len(p_ref) if p_ref else 0
+        target = self.terms.find_lexical(target_property)
+        lexicals = self.terms.lexicals
+        p_ref = self.reference_triples.partition(target_property).predicates
+
+        # Aligned pairs are weighted by their multiplicity in the shared property join
+        total, matched, similarity_sum = 0, 0, 0.0
+        for test_p, count in self.property_join.get(target, {}).items():
+            similarity = self.calculate_property_similarity(target_property, lexicals[test_p])
+            total += count
+            similarity_sum += similarity * count
+            if similarity > 0:
+                matched += count
+
+        precision = similarity_sum / total if total > 0 else 0.0
+        recall = matched / len(p_ref) if p_ref else 0
         f1 = (2 * precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
 
         return {
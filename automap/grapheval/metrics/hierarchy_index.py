@@ -0,0 +1,104 @@
+"""
+Hierarchy Index
+
+This module provides an index over an ontology hierarchy (class or property)
+that keeps every parent of every node, i.e. the full multi-parent DAG, and
+answers ancestor/descendant distance queries from memoised BFS maps.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class HierarchyIndex:
+    """
+    Multi-parent hierarchy with shortest ancestor and descendant distances.
+
+    The distance map of a node is computed once, breadth-first, on first use;
+    afterwards every distance lookup is a dictionary access. Cycles in the
+    hierarchy are tolerated (each node is visited once per BFS).
+    """
+
+    def __init__(self, relations: Iterable[Tuple[str, str]] = ()):
+        """
+        Args:
+            relations: (child, parent) pairs, in the order the ontology declares them
+        """
+        self.parents: Dict[str, List[str]] = {}
+        self.children: Dict[str, List[str]] = {}
+        self._ancestors: Dict[str, Dict[str, int]] = {}
+        self._descendants: Dict[str, Dict[str, int]] = {}
+        for child, parent in relations:
+            self.add(child, parent)
+
+    def add(self, child: str, parent: str) -> None:
+        """Add a child -> parent edge (duplicates are ignored)."""
+        parents = self.parents.setdefault(child, [])
+        if parent in parents:
+            return
+        parents.append(parent)
+        self.children.setdefault(parent, []).append(child)
+        self.children.setdefault(child, [])
+        self.parents.setdefault(parent, [])
+        # Distances may change with any new edge
+        self._ancestors.clear()
+        self._descendants.clear()
+
+    def __contains__(self, node: str) -> bool:
+        return node in self.parents
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def __iter__(self):
+        return iter(self.parents)
+
+    @staticmethod
+    def _bfs(node: str, edges: Dict[str, List[str]]) -> Dict[str, int]:
+        distances = {node: 0}
+        queue = deque([node])
+        while queue:
+            current = queue.popleft()
+            distance = distances[current] + 1
+            for neighbour in edges.get(current, ()):
+                if neighbour not in distances:
+                    distances[neighbour] = distance
+                    queue.append(neighbour)
+        return distances
+
+    def ancestors(self, node: str) -> Dict[str, int]:
+        """
+        Shortest distance from a node to each of its ancestors (the node itself at 0).
+
+        Unknown nodes are their own only ancestor.
+        """
+        distances = self._ancestors.get(node)
+        if distances is None:
+            distances = self._ancestors[node] = self._bfs(node, self.parents)
+        return distances
+
+    def descendants(self, node: str) -> Dict[str, int]:
+        """Shortest distance from a node to each of its descendants (the node itself at 0)."""
+        distances = self._descendants.get(node)
+        if distances is None:
+            distances = self._descendants[node] = self._bfs(node, self.children)
+        return distances
+
+    def ancestor_distance(self, node: str, ancestor: str) -> Optional[int]:
+        """Steps up from ``node`` to ``ancestor``, or None if it is not an ancestor."""
+        return self.ancestors(node).get(ancestor)
+
+    def descendant_distance(self, node: str, descendant: str) -> Optional[int]:
+        """Steps down from ``node`` to ``descendant``, or None if it is not a descendant."""
+        # Looked up in the descendant's ancestor map, which is usually far smaller than the descendant map
+        return self.ancestors(descendant).get(node)
+
+    def depth(self, node: str) -> int:
+        """Number of ancestors of a node, itself included (a measure of how specific it is)."""
+        return len(self.ancestors(node))
+
+    def precompute(self) -> 'HierarchyIndex':
+        """Fill the ancestor map of every node (e.g. before caching or forking)."""
+        for node in self.parents:
+            self.ancestors(node)
+        return self
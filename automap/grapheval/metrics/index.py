@@ -0,0 +1,204 @@
+"""
+Graph Index
+
+This module precomputes an on-disk index of a (gold) graph, stored next to it
+as ``<graph file>.index/``, so that evaluating many predicted graphs against
+the same gold graph does not parse it again every time. The index holds:
+- the term dictionary, with term ids assigned in sorted term order
+- the int-encoded triple columns as ``.npy`` files
+- the triples grouped by predicate (the rdf:type group doubles as the
+  subject -> class map)
+- the fuzzy subject-ID matcher
+
+Triple columns are opened zero-copy with ``numpy`` memory mapping. The index
+records the SHA-256 of the graph file and is ignored (and rebuilt on demand)
+as soon as the file content changes.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Optional, Union
+import numpy as np
+from .loader import load_graph
+from .terms import TermDictionary, EncodedGraph
+
+INDEX_VERSION = 1
+
+_COLUMNS = ('subjects', 'predicates', 'objects')
+
+
+def index_path(graph_path: Union[str, Path]) -> Path:
+    """Return the index directory of a graph file."""
+    graph_path = Path(graph_path)
+    return graph_path.with_name(graph_path.name + '.index')
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _sort_key(key: tuple) -> tuple:
+    kind, text, datatype, language = key
+    return kind, text, datatype or '', language or ''
+
+
+def _column(values: np.ndarray):
+    """Expose an int64 array as a memoryview of Python ints (zero-copy)."""
+    if not len(values):
+        return array('q')
+    return memoryview(values).cast('B').cast('q')
+
+
+def build_index(graph_path: Union[str, Path], workers: Optional[int] = None) -> Path:
+    """
+    Build (or rebuild) the index of a graph file.
+
+    Args:
+        graph_path: Path to the graph (N-Triples, or any format rdflib can parse)
+        workers: Number of worker processes used to load N-Triples (optional)
+
+    Returns:
+        Path: Index directory
+    """
+    graph_path = Path(graph_path)
+    digest = _file_sha256(graph_path)
+
+    loaded_terms = TermDictionary()
+    graph = load_graph(graph_path, loaded_terms, workers)
+
+    # Re-intern the terms in sorted order, and remap the triple columns accordingly
+    order = sorted(range(len(loaded_terms)), key=lambda term_id: _sort_key(loaded_terms.keys[term_id]))
+    terms = TermDictionary()
+    for term_id in order:
+        terms.key_id(loaded_terms.keys[term_id])
+    remap = np.empty(len(order), dtype=np.int64)
+    remap[np.asarray(order, dtype=np.int64)] = np.arange(len(order), dtype=np.int64)
+    columns = [remap[np.frombuffer(getattr(graph, name), dtype=np.int64)] for name in _COLUMNS]
+
+    # Triples grouped by predicate (stable, so each group keeps the triple order), groups in first-use order
+    predicate_lexicals = np.frombuffer(terms.lexical, dtype=np.int64)[columns[1]]
+    grouped = np.argsort(predicate_lexicals, kind='stable')
+    grouped_lexicals = predicate_lexicals[grouped]
+    predicates, starts = np.unique(grouped_lexicals, return_index=True)
+    ends = np.append(starts[1:], len(grouped_lexicals))
+    first_use = [int(grouped[start]) for start in starts]
+    partitions = sorted(zip(first_use, predicates.tolist(), starts.tolist(), ends.tolist()))
+
+    encoded = EncodedGraph(terms, *(array('q', column.tobytes()) for column in columns))
+
+    destination = index_path(graph_path)
+    tmp_dir = Path(tempfile.mkdtemp(dir=destination.parent, prefix=f".{destination.name}."))
+    try:
+        for name, column in zip(_COLUMNS, columns):
+            np.save(tmp_dir / f"{name}.npy", column)
+            np.save(tmp_dir / f"partition_{name}.npy", column[grouped])
+        np.save(tmp_dir / 'kinds.npy', np.frombuffer(terms.kinds, dtype=np.int8))
+        np.save(tmp_dir / 'lexical.npy', np.frombuffer(terms.lexical, dtype=np.int64))
+        np.save(tmp_dir / 'datatypes.npy', np.frombuffer(terms.datatypes, dtype=np.int64))
+        with open(tmp_dir / 'terms.pickle', 'wb') as f:
+            pickle.dump({'keys': terms.keys, 'lexicals': terms.lexicals, 'bnode_scopes': loaded_terms.bnode_scopes},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(tmp_dir / 'subject_id_matcher.pickle', 'wb') as f:
+            pickle.dump(encoded.subject_id_matcher, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        manifest = {
+            'version': INDEX_VERSION,
+            'source': graph_path.name,
+            'source_size': graph_path.stat().st_size,
+            'source_sha256': digest,
+            'triples': len(encoded),
+            'terms': len(terms),
+            'partitions': [[predicate, start, end] for _, predicate, start, end in partitions],
+        }
+        with open(tmp_dir / 'manifest.json', 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        # Swap the new index in; a stale one is moved aside first since directories cannot be replaced
+        if destination.exists():
+            stale = Path(tempfile.mkdtemp(dir=destination.parent, prefix=f".{destination.name}.stale."))
+            os.replace(destination, stale / destination.name)
+            shutil.rmtree(stale, ignore_errors=True)
+        os.replace(tmp_dir, destination)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    return destination
+
+
+def open_index(graph_path: Union[str, Path]) -> Optional[EncodedGraph]:
+    """
+    Open the index of a graph file.
+
+    Args:
+        graph_path: Path to the indexed graph file
+
+    Returns:
+        EncodedGraph: Graph with its own TermDictionary, precomputed partitions and
+        subject-ID matcher; None if there is no index or it does not match the file
+    """
+    graph_path = Path(graph_path)
+    directory = index_path(graph_path)
+    try:
+        with open(directory / 'manifest.json', 'r') as f:
+            manifest = json.load(f)
+        if (manifest.get('version') != INDEX_VERSION
+                or manifest['source_size'] != graph_path.stat().st_size
+                or manifest['source_sha256'] != _file_sha256(graph_path)):
+            return None
+
+        with open(directory / 'terms.pickle', 'rb') as f:
+            saved_terms = pickle.load(f)
+        terms = TermDictionary.restore(
+            saved_terms['keys'],
+            array('b', np.load(directory / 'kinds.npy').tobytes()),
+            array('q', np.load(directory / 'lexical.npy').tobytes()),
+            array('q', np.load(directory / 'datatypes.npy').tobytes()),
+            saved_terms['lexicals'],
+            saved_terms['bnode_scopes'],
+        )
+
+        mapped = manifest['triples'] > 0
+        columns = [_column(np.load(directory / f"{name}.npy", mmap_mode='r' if mapped else None))
+                   for name in _COLUMNS]
+        grouped = [_column(np.load(directory / f"partition_{name}.npy", mmap_mode='r' if mapped else None))
+                   for name in _COLUMNS]
+
+        graph = EncodedGraph(terms, *columns)
+        graph.predicate_partitions = {
+            predicate: EncodedGraph(terms, *(column[start:end] for column in grouped))
+            for predicate, start, end in manifest['partitions']
+        }
+        with open(directory / 'subject_id_matcher.pickle', 'rb') as f:
+            graph.subject_id_matcher = pickle.load(f)
+    except (OSError, ValueError, KeyError, TypeError, EOFError, pickle.UnpicklingError):
+        return None
+
+    return graph
+
+
+def open_graph(graph_path: Union[str, Path], workers: Optional[int] = None) -> EncodedGraph:
+    """
+    Open a graph through its index when it is up to date, loading the file otherwise.
+
+    Args:
+        graph_path: Path to the graph file
+        workers: Number of worker processes used to load N-Triples (optional)
+
+    Returns:
+        EncodedGraph: Graph with its own TermDictionary
+    """
+    graph = open_index(graph_path)
+    if graph is None:
+        graph = load_graph(graph_path, TermDictionary(), workers)
+    return graph
@@ -0,0 +1,354 @@
+"""
+N-Triples Loader
+
+This module reads N-Triples files straight into the term ids and triple
+columns of a TermDictionary, without going through the rdflib parser and
+its in-memory store. Large inputs are split into line-aligned byte ranges
+of a memory-mapped file and tokenised by a pool of worker processes; the
+per-chunk terms are then interned in chunk order, so term ids do not depend
+on the number of workers. Pipes are read block by block, so the document is
+never held in memory as a whole.
+"""
+
+import mmap
+import os
+import re
+import shutil
+import stat
+import tempfile
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
+import numpy as np
+from rdflib import Graph, Literal, URIRef
+from rdflib.term import XSDToPython
+from .parallel import parallel_map
+from .terms import TermDictionary, EncodedGraph, URI, BNODE, LITERAL
+
+# Inputs smaller than this are tokenised in the calling process
+PARALLEL_THRESHOLD = 8 * 1024 * 1024
+
+# Datatypes whose lexical forms rdflib normalises when it parses a literal
+_NORMALIZED_DATATYPES = frozenset(str(datatype) for datatype, converter in XSDToPython.items() if converter)
+
+# Start of a Turtle document (directives only, N-Triples lines are Turtle too)
+_TURTLE_DIRECTIVE = re.compile(rb'(?:\s*#[^\n]*\n)*\s*(?:@prefix|@base|prefix\s|base\s)', re.IGNORECASE)
+
+_ESCAPE = re.compile(r'\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|[tbnrf"\'\\])')
+_ECHARS = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+
+
+def _unescape(text: str) -> str:
+    if '\\' not in text:
+        return text
+    return _ESCAPE.sub(lambda match: (chr(int(match.group(1)[1:], 16)) if len(match.group(1)) > 1
+                                      else _ECHARS[match.group(1)]), text)
+
+
+class _ChunkParser:
+    """Tokenise byte ranges of N-Triples data into term keys and local term ids."""
+
+    def __init__(self, data, scope: str):
+        self.data = data
+        self.scope = scope
+
+    def parse(self, span: Tuple[int, int]) -> Tuple[List[tuple], array]:
+        """
+        Tokenise the lines of ``data[start:end]``.
+
+        Returns:
+            tuple: (term keys in order of first occurrence, flat s/p/o indexes into those keys)
+        """
+        start, end = span
+        local_ids = {}
+        keys = []
+        triples = array('q')
+        normalized = {}
+
+        def term(key: tuple) -> int:
+            term_id = local_ids.get(key)
+            if term_id is None:
+                term_id = local_ids[key] = len(keys)
+                keys.append(key)
+            return term_id
+
+        def node(token: str, line: str) -> tuple:
+            if token.startswith('<') and token.endswith('>'):
+                return URI, _unescape(token[1:-1]), None, None
+            if token.startswith('_:'):
+                return BNODE, f"{self.scope}_{token[2:]}", None, None
+            raise ValueError(f"Invalid N-Triples line: {line!r}")
+
+        for line in self.data[start:end].decode('utf-8').split('\n'):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if not line.endswith('.'):
+                raise ValueError(f"Invalid N-Triples line: {line!r}")
+
+            parts = line[:-1].split(None, 2)
+            if len(parts) != 3:
+                raise ValueError(f"Invalid N-Triples line: {line!r}")
+            subject, predicate, obj = parts
+            obj = obj.rstrip()
+
+            if obj.startswith('"'):
+                quote = obj.rfind('"')
+                if quote == 0:
+                    raise ValueError(f"Invalid N-Triples line: {line!r}")
+                lexical = _unescape(obj[1:quote])
+                suffix = obj[quote + 1:]
+                language = datatype = None
+                if suffix.startswith('@'):
+                    language = suffix[1:]
+                elif suffix.startswith('^^<') and suffix.endswith('>'):
+                    datatype = _unescape(suffix[3:-1])
+                    if datatype in _NORMALIZED_DATATYPES:
+                        # Same lexical form rdflib would report (e.g. "01"^^xsd:integer -> "1")
+                        normal = normalized.get((lexical, datatype))
+                        if normal is None:
+                            normal = normalized[(lexical, datatype)] = str(Literal(lexical, datatype=URIRef(datatype)))
+                        lexical = normal
+                elif suffix:
+                    raise ValueError(f"Invalid N-Triples line: {line!r}")
+                object_key = (LITERAL, lexical, datatype, language)
+            else:
+                object_key = node(obj, line)
+
+            triples.append(term(node(subject, line)))
+            triples.append(term(node(predicate, line)))
+            triples.append(term(object_key))
+
+        return keys, triples
+
+
+class _BlockParser:
+    """Tokenise blocks of whole N-Triples lines (see _ChunkParser)."""
+
+    def __init__(self, scope: str):
+        self.scope = scope
+
+    def parse(self, block: bytes) -> Tuple[List[tuple], array]:
+        return _ChunkParser(block, self.scope).parse((0, len(block)))
+
+
+def _read_blocks(stream: BinaryIO, head: bytes = b'', size: int = PARALLEL_THRESHOLD) -> Iterator[bytes]:
+    """Read ``stream`` (after the already read ``head``) in blocks of about ``size`` bytes ending at line ends."""
+    rest = head
+    while True:
+        block = stream.read(size)
+        if not block:
+            break
+        block = rest + block
+        end = block.rfind(b'\n') + 1
+        rest = block[end:]
+        if end:
+            yield block[:end]
+    if rest:
+        yield rest
+
+
+def _is_mappable(stream) -> bool:
+    """Whether a binary stream is a non-empty regular file read from its start (e.g. redirected stdin)."""
+    try:
+        info = os.fstat(stream.fileno())
+        return stat.S_ISREG(info.st_mode) and info.st_size > 0 and stream.tell() == 0
+    except (AttributeError, OSError, ValueError):
+        return False
+
+
+def _intern_chunks(chunks: Iterable[Tuple[List[tuple], array]], terms: TermDictionary, columns: list) -> None:
+    """Intern chunk terms in chunk order, appending the chunk triples (global ids) to ``columns``."""
+    for keys, triples in chunks:
+        if not triples:
+            continue
+        global_ids = np.fromiter((terms.key_id(key) for key in keys), dtype=np.int64, count=len(keys))
+        columns.append(global_ids[np.frombuffer(triples, dtype=np.int64)].reshape(-1, 3))
+
+
+def _encoded_graph(terms: TermDictionary, columns: list) -> EncodedGraph:
+    """Build the graph of the interned triple columns, without duplicates (first occurrences kept)."""
+    if not columns:
+        return EncodedGraph(terms, array('q'), array('q'), array('q'))
+
+    triples = np.concatenate(columns)
+    _, first = np.unique(triples, axis=0, return_index=True)
+    if len(first) < len(triples):
+        first.sort()
+        triples = triples[first]
+
+    subjects, predicates, objects = (array('q', np.ascontiguousarray(column, dtype=np.int64).tobytes())
+                                     for column in triples.T)
+    return EncodedGraph(terms, subjects, predicates, objects)
+
+
+def _load_blocks(blocks: Iterable[bytes], terms: TermDictionary, scope: str,
+                 workers: Optional[int] = None) -> EncodedGraph:
+    parser = _BlockParser(scope)
+    workers = max(1, workers or 1)
+    columns = []
+    batch = []
+    for block in blocks:
+        batch.append(block)
+        if len(batch) >= workers:
+            _intern_chunks(parallel_map(parser, 'parse', batch, workers), terms, columns)
+            batch = []
+    _intern_chunks(parallel_map(parser, 'parse', batch, workers), terms, columns)
+    return _encoded_graph(terms, columns)
+
+
+def load_ntriples_blocks(blocks: Iterable[bytes], terms: TermDictionary,
+                         workers: Optional[int] = None) -> EncodedGraph:
+    """
+    Load an N-Triples document arriving as blocks of whole lines (e.g. from a
+    pipe, or produced in memory), without joining the blocks.
+
+    Args:
+        blocks: Consecutive parts of the document, each ending at a line end
+        terms: Term dictionary the graph is encoded with
+        workers: Number of blocks tokenised at once by worker processes (default: sequential)
+
+    Returns:
+        EncodedGraph: Encoded triples (see load_ntriples)
+    """
+    return _load_blocks(blocks, terms, terms.new_bnode_scope(), workers)
+
+
+def _split_ranges(data, parts: int) -> List[Tuple[int, int]]:
+    """Split ``data`` into at most ``parts`` byte ranges ending at line boundaries."""
+    size = len(data)
+    bounds = [0]
+    for i in range(1, parts):
+        newline = data.find(b'\n', max(bounds[-1], size * i // parts))
+        if newline < 0:
+            break
+        if newline + 1 > bounds[-1]:
+            bounds.append(newline + 1)
+    if bounds[-1] < size:
+        bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def load_ntriples(source: Union[str, Path, BinaryIO, bytes], terms: TermDictionary,
+                  workers: Optional[int] = None) -> EncodedGraph:
+    """
+    Load an N-Triples document directly into term ids.
+
+    Terms get the same keys the rdflib parser would produce (including its
+    normalised lexical forms of typed literals), and duplicate triples are
+    dropped, keeping the first occurrence order.
+
+    Args:
+        source: Path, binary stream or bytes of the N-Triples document. Streams of regular
+            files are memory-mapped, others (pipes) are read block by block
+        terms: Term dictionary the graph is encoded with
+        workers: Number of worker processes (default: one per CPU for large inputs, sequential for pipes)
+
+    Returns:
+        EncodedGraph: Encoded triples
+
+    Raises:
+        ValueError: If a line is not a valid N-Triples statement
+    """
+    # Blank node labels are scoped to the document, as the rdflib parser does
+    scope = terms.new_bnode_scope()
+
+    data = source
+    mapped = None
+    if isinstance(source, (str, Path)):
+        with open(source, 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                data = mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                data = b''
+    elif _is_mappable(source):
+        data = mapped = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+    elif not isinstance(source, (bytes, bytearray, memoryview)):
+        return _load_blocks(_read_blocks(source), terms, scope, workers)
+
+    try:
+        if workers is None:
+            workers = os.cpu_count() if len(data) >= PARALLEL_THRESHOLD else 1
+        spans = _split_ranges(data, max(1, workers))
+        chunks = parallel_map(_ChunkParser(data, scope), 'parse', spans, workers)
+    finally:
+        if mapped is not None:
+            mapped.close()
+
+    # Intern chunk terms in chunk order: ids come out as if the file had been read sequentially
+    columns = []
+    _intern_chunks(chunks, terms, columns)
+    return _encoded_graph(terms, columns)
+
+
+class _TeeReader:
+    """Binary stream reader that also writes everything it reads to ``copy``."""
+
+    def __init__(self, stream: BinaryIO, copy: BinaryIO):
+        self.stream = stream
+        self.copy = copy
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.copy.write(data)
+        return data
+
+
+def _load_pipe(stream: BinaryIO, terms: TermDictionary, workers: Optional[int] = None) -> EncodedGraph:
+    """Load a graph from a pipe (see load_graph)."""
+    with tempfile.NamedTemporaryFile(prefix='automap-graph-', suffix='.ttl') as spool:
+        # Everything read from the pipe is spooled as read, including a line not yet split into a block
+        reader = _TeeReader(stream, spool)
+        head = reader.read(PARALLEL_THRESHOLD)
+        if not _TURTLE_DIRECTIVE.match(head):
+            try:
+                # Terms interned from the blocks before the failing one are dropped with it
+                with terms.rollback_on_error():
+                    return _load_blocks(_read_blocks(reader, head, PARALLEL_THRESHOLD), terms,
+                                        terms.new_bnode_scope(), workers)
+            except ValueError:
+                # Not N-Triples (e.g. Turtle without directives): parse what was read and the rest with rdflib
+                pass
+
+        shutil.copyfileobj(stream, spool)
+        spool.seek(0)
+        return terms.encode_graph(Graph().parse(file=spool, format='turtle'))
+
+
+def load_graph(source: Union[str, Path, bytes, BinaryIO], terms: TermDictionary,
+               workers: Optional[int] = None) -> EncodedGraph:
+    """
+    Load a graph file, stream, or the bytes of a serialized graph, into term ids.
+
+    N-Triples goes through ``load_ntriples``. Other files (by extension), and
+    data the N-Triples loader rejects (e.g. Turtle), are parsed with rdflib.
+    Pipes cannot be read twice: they are parsed with rdflib if they start
+    with a Turtle directive, and streamed through the N-Triples loader
+    otherwise, while spooled to a temporary file that rdflib parses if the
+    N-Triples loader rejects them.
+
+    Args:
+        source: Path, binary stream or bytes of the graph
+        terms: Term dictionary the graph is encoded with
+        workers: Number of worker processes for the N-Triples loader (optional)
+
+    Returns:
+        EncodedGraph: Encoded triples
+    """
+    is_path = isinstance(source, (str, Path))
+    is_stream = not is_path and not isinstance(source, (bytes, bytearray, memoryview))
+    if is_stream and not _is_mappable(source):
+        return _load_pipe(source, terms, workers)
+
+    if not is_path or Path(source).suffix.lower() in ('.nt', '.ntriples'):
+        try:
+            return load_ntriples(source, terms, workers)
+        except ValueError:
+            pass
+
+    if is_stream:
+        source.seek(0)
+        graph = Graph().parse(file=source, format='turtle')
+    else:
+        graph = Graph().parse(source) if is_path else Graph().parse(data=source)
+    return terms.encode_graph(graph)
@@ -4,9 +4,10 @@ Object Evaluation Metrics
 This module provides metrics for evaluating RDF objects (values).
 """
 
-from rdflib import Literal, URIRef
+from array import array
 from .base import Metrics
-from automap.utils import overlapping_lists, calculate_metrics
+from .terms import LITERAL, URI
+from automap.utils import multiset_overlap, calculate_metrics
 
 
 class ObjectMetrics(Metrics):
@@ -17,18 +18,17 @@ class ObjectMetrics(Metrics):
         Returns:
             dict: Metrics including tp, fp, fn, tn, precision, recall, f1, and object lists
         """
-        # Optimized: Use RDFLib's objects() method
-        test_objects = list([str(o) for o in self.test_graph.objects()])
-        reference_objects = list([str(o) for o in self.reference_graph.objects()])
+        test_objects = self._object_lexicals(self.test_triples)
+        reference_objects = self._object_lexicals(self.reference_triples)
 
-        tp = len(overlapping_lists(test_objects, reference_objects))
+        tp = multiset_overlap(test_objects, reference_objects)
         fp = len(test_objects) - tp
         fn = len(reference_objects) - tp
         tn = 0
 
         return {
-            'test_objects': test_objects,
-            'reference_objects': reference_objects,
+            'test_objects': self.terms.decode(test_objects),
+            'reference_objects': self.terms.decode(reference_objects),
             **calculate_metrics(tp, fp, fn, tn)
         }
 
@@ -39,18 +39,17 @@ class ObjectMetrics(Metrics):
         Returns:
             dict: Metrics including tp, fp, fn, tn, precision, recall, f1, and URI lists
         """
-        # Optimized: Use RDFLib's objects() method
-        test_uris = list([str(o) for o in self.test_graph.objects() if isinstance(o, URIRef)])
-        reference_uris = list([str(o) for o in self.reference_graph.objects() if isinstance(o, URIRef)])
+        test_uris = self._object_lexicals(self.test_triples, kind=URI)
+        reference_uris = self._object_lexicals(self.reference_triples, kind=URI)
 
-        tp = len(overlapping_lists(test_uris, reference_uris))
+        tp = multiset_overlap(test_uris, reference_uris)
         fp = len(test_uris) - tp
         fn = len(reference_uris) - tp
         tn = 0
 
         return {
-            'test_uris': test_uris,
-            'reference_uris': reference_uris,
+            'test_uris': self.terms.decode(test_uris),
+            'reference_uris': self.terms.decode(reference_uris),
             **calculate_metrics(tp, fp, fn, tn)
         }
 
@@ -63,17 +62,23 @@ class ObjectMetrics(Metrics):
         Returns:
             dict: Metrics including tp, fp, fn, tn, precision, recall, f1, and literal lists
         """
-        # Optimized: Use RDFLib's objects() method
-        test_literals = list([str(o) for o in self.test_graph.objects() if isinstance(o, Literal)])
-        reference_literals = list([str(o) for o in self.reference_graph.objects() if isinstance(o, Literal)])
+        test_literals = self._object_lexicals(self.test_triples, kind=LITERAL)
+        reference_literals = self._object_lexicals(self.reference_triples, kind=LITERAL)
 
-        tp = len(overlapping_lists(test_literals, reference_literals))
+        tp = multiset_overlap(test_literals, reference_literals)
         fp = len(test_literals) - tp
         fn = len(reference_literals) - tp
         tn = 0
 
         return {
-            'test_literals': test_literals,
-            'reference_literals': reference_literals,
+            'test_literals': self.terms.decode(test_literals),
+            'reference_literals': self.terms.decode(reference_literals),
             **calculate_metrics(tp, fp, fn, tn)
         }
+
+    def _object_lexicals(self, triples, kind: int = None) -> list:
+        """Return the lexical ids of the objects of an encoded graph, optionally filtered by term kind."""
+        lexical, kinds = self.terms.lexical, self.terms.kinds
+        if kind is None:
+            return array('q', [lexical[o] for o in triples.objects])
+        return array('q', [lexical[o] for o in triples.objects if kinds[o] == kind])
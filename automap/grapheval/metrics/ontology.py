@@ -0,0 +1,195 @@
+"""
+Ontology Snapshots
+
+This module provides a binary, content-addressed cache of parsed ontologies.
+A snapshot holds the ontology triples in compact encoded form together with
+everything the evaluation derives from them (prefix bindings, declared
+properties and the class/property hierarchy indexes), so that evaluations
+against an unchanged ontology skip parsing and hierarchy extraction.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from array import array
+from functools import cached_property
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+from rdflib import Graph, OWL, RDF
+from automap.utils import Config
+from .hierarchy import HierarchyScorer
+from .hierarchy_index import HierarchyIndex
+from .terms import TermDictionary
+
+
+def _default_cache_dir() -> Path:
+    return Path.home() / '.cache' / 'automap' / 'ontology_cache'
+
+
+class OntologySnapshot:
+    """Parsed ontology plus the hierarchy data derived from it."""
+
+    # Bump whenever the pickled layout or the derived data changes
+    VERSION = 2
+
+    # Snapshots already loaded by this process, by cache path
+    _loaded = {}
+
+    def __init__(self, term_keys: List[tuple], triples: array, namespaces: List[Tuple[str, str]],
+                 properties: List[str], class_hierarchy: HierarchyIndex, property_hierarchy: HierarchyIndex):
+        """
+        Args:
+            term_keys: Distinct ontology terms, as TermDictionary.term_key tuples
+            triples: Flat (subject, predicate, object) indexes into ``term_keys``
+            namespaces: (prefix, namespace IRI) bindings of the ontology
+            properties: IRIs of the declared DatatypeProperty and ObjectProperty, in graph order
+            class_hierarchy: Class hierarchy index, with ancestor distances precomputed
+            property_hierarchy: Property hierarchy index, with ancestor distances precomputed
+        """
+        self.version = self.VERSION
+        self.term_keys = term_keys
+        self.triples = triples
+        self.namespaces = namespaces
+        self.properties = properties
+        self.class_hierarchy = class_hierarchy
+        self.property_hierarchy = property_hierarchy
+
+    def __len__(self) -> int:
+        return len(self.triples) // 3
+
+    def __getstate__(self) -> dict:
+        # The rebuilt graph is a cache of the encoded triples, never pickle it
+        state = self.__dict__.copy()
+        state.pop('graph', None)
+        return state
+
+    @cached_property
+    def graph(self) -> Graph:
+        """The ontology as an rdflib Graph, rebuilt from the encoded triples on first access."""
+        graph = Graph()
+        for prefix, namespace in self.namespaces:
+            graph.bind(prefix, namespace, override=True, replace=True)
+
+        terms = [TermDictionary.key_term(key) for key in self.term_keys]
+        triples = self.triples
+        graph.addN((terms[triples[i]], terms[triples[i + 1]], terms[triples[i + 2]], graph)
+                   for i in range(0, len(triples), 3))
+        return graph
+
+    @classmethod
+    def from_graph(cls, graph: Graph, config: Config) -> 'OntologySnapshot':
+        """
+        Build a snapshot from a parsed ontology.
+
+        Args:
+            graph: Ontology graph
+            config: Configuration providing the hierarchy queries
+
+        Returns:
+            OntologySnapshot: Snapshot whose ``graph`` is the given graph
+        """
+        term_ids = {}
+        term_keys = []
+        triples = array('q')
+        for triple in graph:
+            for term in triple:
+                key = TermDictionary.term_key(term)
+                term_id = term_ids.get(key)
+                if term_id is None:
+                    term_id = term_ids[key] = len(term_keys)
+                    term_keys.append(key)
+                triples.append(term_id)
+
+        namespaces = [(prefix, str(namespace)) for prefix, namespace in graph.namespaces()]
+        properties = [str(prop) for prop_type in (OWL.DatatypeProperty, OWL.ObjectProperty)
+                      for prop in graph.subjects(RDF.type, prop_type)]
+
+        snapshot = cls(
+            term_keys,
+            triples,
+            namespaces,
+            properties,
+            HierarchyScorer._build_hierarchy_index(HierarchyScorer._extract_relations(graph, config.subclass_query)),
+            HierarchyScorer._build_hierarchy_index(HierarchyScorer._extract_relations(graph, config.subproperty_query)),
+        )
+        snapshot.graph = graph
+        return snapshot
+
+    @staticmethod
+    def cache_key(data: bytes, config: Config) -> str:
+        """
+        Content hash identifying a snapshot.
+
+        Covers the ontology bytes, the hierarchy queries used to derive the
+        hierarchy indexes and the snapshot layout version; file paths and timestamps
+        play no part.
+        """
+        digest = hashlib.sha256(data)
+        for query in (config.subclass_query, config.subproperty_query):
+            digest.update(b'\0')
+            digest.update(query.encode('utf-8'))
+        digest.update(f"\0v{OntologySnapshot.VERSION}".encode())
+        return digest.hexdigest()
+
+    @classmethod
+    def load(cls, ontology_path: Union[str, Path], config: Config, rdf_format: str = 'turtle',
+             cache_dir: Optional[Union[str, Path]] = None) -> 'OntologySnapshot':
+        """
+        Load the snapshot of an ontology file, parsing and caching it on a miss.
+
+        Loaded snapshots are also kept in memory, so evaluating many graphs in
+        one process (or in workers forked from it) reads each snapshot once.
+
+        Args:
+            ontology_path: Path to the ontology file
+            config: Configuration providing the hierarchy queries
+            rdf_format: rdflib format of the ontology file
+            cache_dir: Snapshot directory (defaults to ~/.cache/automap/ontology_cache)
+
+        Returns:
+            OntologySnapshot: Snapshot of the ontology
+        """
+        data = Path(ontology_path).read_bytes()
+        cache_dir = Path(cache_dir) if cache_dir else _default_cache_dir()
+        cache_path = cache_dir / f"{cls.cache_key(data, config)}.pickle"
+
+        snapshot = cls._loaded.get(cache_path)
+        if snapshot is not None:
+            return snapshot
+
+        snapshot = cls._read(cache_path)
+        if snapshot is None:
+            snapshot = cls.from_graph(Graph().parse(data=data, format=rdf_format), config)
+            snapshot._write(cache_path)
+
+        cls._loaded[cache_path] = snapshot
+        return snapshot
+
+    @classmethod
+    def _read(cls, cache_path: Path) -> Optional['OntologySnapshot']:
+        try:
+            with open(cache_path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError, ValueError):
+            return None
+
+        if not isinstance(snapshot, cls) or getattr(snapshot, 'version', None) != cls.VERSION:
+            return None
+        return snapshot
+
+    def _write(self, cache_path: Path) -> None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file and rename it, so concurrent readers never see a partial snapshot
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, cache_path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            # If caching fails, just continue without cache
+            pass
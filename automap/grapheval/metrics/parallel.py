@@ -0,0 +1,58 @@
+"""
+Parallel Evaluation Helpers
+
+This module fans per-item evaluations (e.g. one call per predicate) out to a
+pool of worker processes. Workers are forked, so they inherit the read-only
+evaluation state of the parent instead of receiving a pickled copy of it.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, List, Optional
+
+# Object whose methods are called in forked workers (set only while a pool is running)
+_shared = None
+
+
+def _call(method_name: str, item: Any) -> Any:
+    return getattr(_shared, method_name)(item)
+
+
+def can_fork() -> bool:
+    return 'fork' in multiprocessing.get_all_start_methods()
+
+
+def parallel_map(obj: Any, method_name: str, items: Iterable, workers: Optional[int] = None) -> List:
+    """
+    Call ``obj.<method_name>(item)`` for every item, optionally in worker processes.
+
+    Falls back to a sequential loop when ``workers`` is not greater than 1, there
+    is at most one item, or the platform cannot fork. Results keep the order of
+    ``items`` either way. Any lazily built state the method needs should be built
+    before calling, so that workers inherit it instead of rebuilding it.
+
+    Args:
+        obj: Object holding the evaluation state
+        method_name: Name of the method to call on ``obj``
+        items: Arguments, one call per item
+        workers: Number of worker processes (optional)
+
+    Returns:
+        list: Results in the order of ``items``
+    """
+    global _shared
+
+    items = list(items)
+    if not workers or workers <= 1 or len(items) < 2 or not can_fork():
+        method = getattr(obj, method_name)
+        return [method(item) for item in items]
+
+    workers = min(workers, len(items))
+    chunksize = max(1, len(items) // (workers * 4))
+
+    _shared = obj
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork')) as pool:
+            return list(pool.map(_call, [method_name] * len(items), items, chunksize=chunksize))
+    finally:
+        _shared = None
@@ -4,9 +4,9 @@ Property Evaluation Metrics
 This module provides metrics for evaluating RDF properties (predicates).
 """
 
-from rdflib import Literal
 from .base import Metrics
-from automap.utils import overlapping_lists, calculate_metrics
+from .terms import LITERAL
+from automap.utils import multiset_overlap, calculate_metrics
 
 
 class PropertyMetrics(Metrics):
@@ -18,11 +18,10 @@ class PropertyMetrics(Metrics):
         Returns:
             dict: Metrics including tp, fp, fn, tn, precision, recall, f1
         """
-        # Optimized: Use RDFLib's predicates() method
-        test_properties = list(self.test_graph.predicates())
-        reference_properties = list(self.reference_graph.predicates())
+        test_properties = self.test_triples.predicates
+        reference_properties = self.reference_triples.predicates
 
-        tp = len(overlapping_lists(test_properties, reference_properties))
+        tp = multiset_overlap(test_properties, reference_properties)
         fp = len(test_properties) - tp
         fn = len(reference_properties) - tp
         tn = 0
@@ -36,8 +35,9 @@ class PropertyMetrics(Metrics):
         Returns:
             dict: Metrics and lists of property-object combinations
         """
-        test_po = set([str(p) + str(o) for s, p, o in self.test_graph])
-        reference_po = set([str(p) + str(o) for s, p, o in self.reference_graph])
+        lexical = self.terms.lexical
+        test_po = set([(lexical[p], lexical[o]) for s, p, o in self.test_triples])
+        reference_po = set([(lexical[p], lexical[o]) for s, p, o in self.reference_triples])
 
         tp = len(test_po.intersection(reference_po))
         fp = len(test_po) - tp
@@ -45,8 +45,8 @@ class PropertyMetrics(Metrics):
         tn = 0
 
         return {
-            'test_po': list(test_po),
-            'reference_po': list(reference_po),
+            'test_po': self.terms.decode_pairs(test_po),
+            'reference_po': self.terms.decode_pairs(reference_po),
             **calculate_metrics(tp, fp, fn, tn)
         }
 
@@ -57,17 +57,17 @@ class PropertyMetrics(Metrics):
         Returns:
             dict: Metrics and lists of predicate-datatype pairs
         """
-        test_p_datatype = list([str(p) + str(o.datatype) for s, p, o in self.test_graph if isinstance(o, Literal)])
-        reference_p_datatype = list([str(p) + str(o.datatype) for s, p, o in self.reference_graph if isinstance(o, Literal)])
+        test_p_datatype = self._predicate_datatypes(self.test_triples)
+        reference_p_datatype = self._predicate_datatypes(self.reference_triples)
 
-        tp = len(overlapping_lists(test_p_datatype, reference_p_datatype))
+        tp = multiset_overlap(test_p_datatype, reference_p_datatype)
         fp = len(test_p_datatype) - tp
         fn = len(reference_p_datatype) - tp
         tn = 0
 
         return {
-            'test_p_datatype': test_p_datatype,
-            'reference_p_datatype': reference_p_datatype,
+            'test_p_datatype': self.terms.decode_pairs(test_p_datatype),
+            'reference_p_datatype': self.terms.decode_pairs(reference_p_datatype),
             **calculate_metrics(tp, fp, fn, tn)
         }
 
@@ -78,8 +78,8 @@ class PropertyMetrics(Metrics):
         Returns:
             dict: Metrics and lists of unique predicate-datatype pairs
         """
-        test_p_datatype = set([str(p) + str(o.datatype) for s, p, o in self.test_graph if isinstance(o, Literal)])
-        reference_p_datatype = set([str(p) + str(o.datatype) for s, p, o in self.reference_graph if isinstance(o, Literal)])
+        test_p_datatype = set(self._predicate_datatypes(self.test_triples))
+        reference_p_datatype = set(self._predicate_datatypes(self.reference_triples))
 
         tp = len(test_p_datatype.intersection(reference_p_datatype))
         fp = len(test_p_datatype) - tp
@@ -87,37 +87,43 @@ class PropertyMetrics(Metrics):
         tn = 0
 
         return {
-            'test_p_datatype': list(test_p_datatype),
-            'reference_p_datatype': list(reference_p_datatype),
+            'test_p_datatype': self.terms.decode_pairs(test_p_datatype),
+            'reference_p_datatype': self.terms.decode_pairs(reference_p_datatype),
             **calculate_metrics(tp, fp, fn, tn)
         }
 
+    def _predicate_datatypes(self, triples) -> list:
+        """Return (predicate, datatype) lexical id pairs for every literal object."""
+        lexical, kinds, datatypes = self.terms.lexical, self.terms.kinds, self.terms.datatypes
+        return [(lexical[p], datatypes[o]) for s, p, o in triples if kinds[o] == LITERAL]
+
     def count_predicate_usage(self, predicate: str) -> int:
         # [CG]: Not used
-        return len([s for s, p, o in self.test_graph if str(p) == predicate])
+        stats = self.test_triples.statistics(predicate)
+        return stats.count if stats else 0
 
     def count_predicate_with_literals(self, predicate: str) -> int:
         # [CG]: Not used
-        return len([s for s, p, o in self.test_graph if str(p) == predicate and isinstance(o, Literal)])
+        stats = self.test_triples.statistics(predicate)
+        return stats.literal_count if stats else 0
 
     def count_predicate_with_objects(self, predicate: str) -> int:
         # [CG]: Not used
-        return len([s for s, p, o in self.test_graph if str(p) == predicate and not isinstance(o, Literal)])
+        stats = self.test_triples.statistics(predicate)
+        return stats.uri_count if stats else 0
 
     def check_all_reference_predicates_present(self) -> bool:
         # [CG]: Not used
-        # Optimized: Use RDFLib's predicates() method
-        test_predicates = set(self.test_graph.predicates())
-        reference_predicates = set(self.reference_graph.predicates())
+        test_predicates = set(self.test_triples.predicates)
+        reference_predicates = set(self.reference_triples.predicates)
 
         overlap = test_predicates.intersection(reference_predicates)
         return 1 if len(overlap) == len(reference_predicates) else 0
 
     def check_only_reference_predicates_present(self) -> bool:
         # [CG]: Not used
-        # Optimized: Use RDFLib's predicates() method
-        test_predicates = set(self.test_graph.predicates())
-        reference_predicates = set(self.reference_graph.predicates())
+        test_predicates = set(self.test_triples.predicates)
+        reference_predicates = set(self.reference_triples.predicates)
 
         overlap = test_predicates.intersection(reference_predicates)
         return 1 if len(overlap) == len(test_predicates) else 0
@@ -0,0 +1,255 @@
+"""
+Metric Registry
+
+This module declares every metric reported by GraphEvaluator, in output
+order, together with:
+- its group ('common' metrics need no ontology, 'in_domain' ones do or use the configuration)
+- the intermediate structures it reads (graph scans, subject alignment,
+  predicate partitions, ...), each built at most once per evaluator
+- for per-predicate metrics, the predicates it is computed for
+
+Evaluating a selection of metrics only computes those metrics and the
+intermediates they depend on. New metrics are added with ``register_metric``
+(and ``register_intermediate`` for new shared structures), without editing
+GraphEvaluator.
+"""
+
+from typing import Callable, Iterable, List, Optional
+
+COMMON = 'common'
+IN_DOMAIN = 'in_domain'
+
+
+class MetricSpec:
+    """Declaration of a metric: how to compute it and what it depends on."""
+
+    def __init__(self, name: str, group: str, compute: Callable, requires: Iterable[str] = (),
+                 items: Optional[Callable] = None, needs_ontology: bool = False):
+        """
+        Args:
+            name: Result key of the metric
+            group: COMMON or IN_DOMAIN
+            compute: ``compute(evaluator)``, or ``compute(evaluator, item)`` for per-item metrics
+            requires: Names of the intermediates the metric reads
+            items: ``items(evaluator)`` returning the items (predicates) of a per-item metric,
+                whose result is then a dict item -> ``compute(evaluator, item)``
+            needs_ontology: Skip the metric when the evaluator has no ontology
+        """
+        self.name = name
+        self.group = group
+        self.compute = compute
+        self.requires = tuple(requires)
+        self.items = items
+        self.needs_ontology = needs_ontology
+
+    def __repr__(self) -> str:
+        return f"MetricSpec({self.name!r}, {self.group!r})"
+
+
+class IntermediateSpec:
+    """Declaration of a structure shared by several metrics."""
+
+    def __init__(self, name: str, build: Callable, requires: Iterable[str] = ()):
+        """
+        Args:
+            name: Name metrics refer to in their ``requires``
+            build: ``build(evaluator)``, building (and caching) the structure on the evaluator
+            requires: Names of the intermediates the structure is built from
+        """
+        self.name = name
+        self.build = build
+        self.requires = tuple(requires)
+
+
+# Registered metrics and intermediates, by name (metrics in output order)
+METRICS = {}
+INTERMEDIATES = {}
+
+
+def register_metric(name: str, group: str, compute: Callable, requires: Iterable[str] = (),
+                    items: Optional[Callable] = None, needs_ontology: bool = False) -> MetricSpec:
+    """Register a metric (see MetricSpec); it is reported after the metrics registered before it."""
+    unknown = [requirement for requirement in requires if requirement not in INTERMEDIATES]
+    if unknown:
+        raise ValueError(f"Metric {name!r} requires unknown intermediates {unknown}")
+
+    spec = MetricSpec(name, group, compute, requires, items, needs_ontology)
+    METRICS[name] = spec
+    return spec
+
+
+def register_intermediate(name: str, build: Callable, requires: Iterable[str] = ()) -> IntermediateSpec:
+    """Register an intermediate structure (see IntermediateSpec)."""
+    unknown = [requirement for requirement in requires if requirement not in INTERMEDIATES]
+    if unknown:
+        raise ValueError(f"Intermediate {name!r} requires unknown intermediates {unknown}")
+
+    spec = IntermediateSpec(name, build, requires)
+    INTERMEDIATES[name] = spec
+    return spec
+
+
+def metric_names(group: Optional[str] = None) -> List[str]:
+    """Names of the registered metrics (of one group if given), in output order."""
+    return [name for name, spec in METRICS.items() if group is None or spec.group == group]
+
+
+def resolve_metrics(names: Optional[Iterable[str]] = None) -> List[MetricSpec]:
+    """
+    Look up metrics by name.
+
+    Args:
+        names: Metric names (default: every registered metric)
+
+    Returns:
+        list: MetricSpec of the distinct requested metrics, in output order
+
+    Raises:
+        ValueError: If a name is not a registered metric
+    """
+    if names is None:
+        return list(METRICS.values())
+
+    names = set(names)
+    unknown = sorted(names.difference(METRICS))
+    if unknown:
+        raise ValueError(f"Unknown metrics {unknown}, expected any of {metric_names()}")
+    return [spec for name, spec in METRICS.items() if name in names]
+
+
+def required_intermediates(specs: Iterable[MetricSpec]) -> List[str]:
+    """Names of the intermediates the metrics depend on (transitively), dependencies first."""
+    ordered = []
+
+    def visit(name: str) -> None:
+        if name in ordered:
+            return
+        for requirement in INTERMEDIATES[name].requires:
+            visit(requirement)
+        ordered.append(name)
+
+    for spec in specs:
+        for requirement in spec.requires:
+            visit(requirement)
+    return ordered
+
+
+# ========== Intermediates ==========
+
+def _build_common_scans(evaluator) -> None:
+    evaluator.common_metrics.test_scan
+    evaluator.common_metrics.reference_scan
+
+
+def _build_subject_ids(evaluator) -> None:
+    evaluator.reference_triples.subject_id_matcher
+
+
+def _build_predicate_partitions(evaluator) -> None:
+    evaluator.test_triples.predicate_partitions
+    evaluator.reference_triples.predicate_partitions
+
+
+def _build_predicate_statistics(evaluator) -> None:
+    evaluator.test_triples.predicate_statistics
+    evaluator.reference_triples.predicate_statistics
+
+
+def _build_entity_ids(evaluator) -> None:
+    evaluator.domain_metrics.build_entity_index()
+
+
+def _build_subject_alignment(evaluator) -> None:
+    evaluator.hierarchy_scorer.subject_alignment
+
+
+def _build_subject_map(evaluator) -> None:
+    evaluator.hierarchy_scorer.subject_map
+
+
+def _build_property_join(evaluator) -> None:
+    evaluator.hierarchy_scorer.property_join
+
+
+def _build_subject_classes(evaluator) -> None:
+    evaluator.hierarchy_scorer.reference_subject_classes
+    evaluator.hierarchy_scorer.test_subject_classes
+
+
+register_intermediate('common_scans', _build_common_scans)
+register_intermediate('subject_ids', _build_subject_ids)
+register_intermediate('predicate_partitions', _build_predicate_partitions)
+register_intermediate('predicate_statistics', _build_predicate_statistics)
+register_intermediate('entity_ids', _build_entity_ids)
+register_intermediate('subject_alignment', _build_subject_alignment, requires=('subject_ids',))
+register_intermediate('subject_map', _build_subject_map, requires=('subject_alignment',))
+register_intermediate('property_join', _build_property_join, requires=('subject_alignment',))
+register_intermediate('subject_classes', _build_subject_classes, requires=('predicate_partitions',))
+
+
+# ========== Common Metrics ==========
+
+def _common_metric(name: str) -> Callable:
+    def compute(evaluator) -> dict:
+        return evaluator.common_metrics.evaluate([name])[name]
+    return compute
+
+
+for _name in ('triples', 'subjects', 'subjects_fuzzy', 'classes', 'classes_unique',
+              'predicates', 'predicates_unique', 'predicate_datatype_range', 'predicate_datatype_range_unique',
+              'objects', 'objects_uris', 'objects_literals'):
+    register_metric(
+        _name, COMMON, _common_metric(_name),
+        requires=('common_scans', 'subject_ids') if _name == 'subjects_fuzzy' else ('common_scans',),
+    )
+del _name
+
+
+# ========== In-Domain Metrics ==========
+
+def _configured_predicates(evaluator) -> list:
+    return evaluator.config.predicates_to_evaluate
+
+
+def _reference_predicates(evaluator) -> list:
+    return evaluator.terms.decode(evaluator.reference_triples.predicate_statistics)
+
+
+register_metric(
+    'entity_coverage', IN_DOMAIN,
+    lambda evaluator: evaluator.domain_metrics.summarize_entity_coverage(),
+    requires=('entity_ids',),
+)
+register_metric(
+    'classes_with_hierarchy', IN_DOMAIN,
+    lambda evaluator: evaluator.hierarchy_scorer.evaluate_class_hierarchies(),
+    requires=('subject_alignment', 'subject_classes'), needs_ontology=True,
+)
+register_metric(
+    'predicates_with_hierarchy', IN_DOMAIN,
+    lambda evaluator: evaluator.hierarchy_scorer.evaluate_property_hierarchies(),
+    requires=('property_join',), needs_ontology=True,
+)
+register_metric(
+    'single_property_hierarchy_scores', IN_DOMAIN,
+    lambda evaluator, predicate: evaluator.hierarchy_scorer.evaluate_single_property_hierarchy(predicate),
+    requires=('property_join', 'predicate_partitions'), items=_configured_predicates, needs_ontology=True,
+)
+register_metric(
+    'predicates_direct', IN_DOMAIN,
+    lambda evaluator, predicate: evaluator.hierarchy_scorer.evaluate_property_direct(predicate),
+    requires=('subject_map', 'predicate_partitions'), items=_configured_predicates, needs_ontology=True,
+)
+register_metric(
+    'predicates_inverse', IN_DOMAIN,
+    lambda evaluator, predicate: evaluator.hierarchy_scorer.evaluate_property_inverse(predicate),
+    requires=('subject_map', 'predicate_partitions'), items=_configured_predicates, needs_ontology=True,
+)
+register_metric(
+    'predicate_details', IN_DOMAIN,
+    lambda evaluator, predicate: evaluator.domain_metrics.evaluate_predicate_details(
+        predicate, evaluator.hierarchy_scorer
+    ),
+    requires=('predicate_statistics', 'subject_map', 'predicate_partitions'), items=_reference_predicates,
+    needs_ontology=True,
+)
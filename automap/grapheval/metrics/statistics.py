@@ -0,0 +1,69 @@
+"""
+Predicate Usage Statistics
+
+This module provides a per-predicate statistics table computed in a single
+traversal of an encoded graph: usage count, URI-object and literal-object
+counts, datatype histogram and number of distinct subjects.
+"""
+
+from collections import Counter
+from .terms import EncodedGraph, LITERAL
+
+
+class PredicateStatistics:
+    """Usage statistics of a single predicate in a graph."""
+
+    __slots__ = ('count', 'uri_count', 'literal_count', 'datatypes', 'distinct_subjects')
+
+    def __init__(self):
+        self.count = 0
+        # Non-literal objects (URIs and blank nodes)
+        self.uri_count = 0
+        self.literal_count = 0
+        # Datatype IRI (or 'None' for plain literals) -> number of literal objects
+        self.datatypes = Counter()
+        self.distinct_subjects = 0
+
+    def __repr__(self) -> str:
+        return (f"PredicateStatistics(count={self.count}, uri_count={self.uri_count}, "
+                f"literal_count={self.literal_count}, distinct_subjects={self.distinct_subjects})")
+
+
+def build_predicate_statistics(triples: EncodedGraph) -> dict:
+    """
+    Compute the statistics of every predicate of a graph in one traversal.
+
+    Args:
+        triples: Encoded graph
+
+    Returns:
+        dict: Predicate lexical id -> PredicateStatistics
+    """
+    terms = triples.terms
+    lexical, kinds, datatypes = terms.lexical, terms.kinds, terms.datatypes
+
+    statistics = {}
+    subjects = {}
+    datatype_ids = {}
+    for s, p, o in triples:
+        predicate = lexical[p]
+        stats = statistics.get(predicate)
+        if stats is None:
+            stats = statistics[predicate] = PredicateStatistics()
+            subjects[predicate] = set()
+            datatype_ids[predicate] = Counter()
+
+        stats.count += 1
+        subjects[predicate].add(s)
+        if kinds[o] == LITERAL:
+            stats.literal_count += 1
+            datatype_ids[predicate][datatypes[o]] += 1
+        else:
+            stats.uri_count += 1
+
+    for predicate, stats in statistics.items():
+        stats.distinct_subjects = len(subjects[predicate])
+        stats.datatypes = Counter({terms.lexicals[datatype]: count
+                                   for datatype, count in datatype_ids[predicate].items()})
+
+    return statistics
@@ -0,0 +1,212 @@
+"""
+Streaming Evaluation
+
+This module evaluates two sorted N-Triples files with a single merge-join pass,
+without loading either graph into memory:
+- Triples and subjects are matched while merging the two line streams
+- Predicates are counted per predicate (bounded by the vocabulary)
+- Objects are hash-partitioned into spilled runs and counted one partition at a time
+
+Both inputs must be sorted line by line in byte order, with one triple per
+line in the usual ``<s> <p> <o> .`` single-space layout. The output of
+``automap/converters/ntriples.py`` (canonical, sorted and de-duplicated)
+always qualifies; ``LC_ALL=C sort -u`` does for already canonical files.
+Terms are compared in their N-Triples form, so literals with different
+datatypes or language tags never match, and blank nodes match by label across
+the two files (the default evaluation scopes labels to each document). The
+results are therefore reported under their own ``*_exact`` keys.
+"""
+
+import heapq
+import tempfile
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+from typing import IO, Iterator, Tuple, Union
+from automap.utils import calculate_metrics
+
+TEST = 0
+REFERENCE = 1
+
+# Number of spilled runs objects are partitioned into (memory holds one run per side at a time)
+OBJECT_PARTITIONS = 64
+
+
+def split_ntriples_line(line: str) -> Tuple[str, str, str]:
+    """
+    Split an N-Triples line into its subject, predicate and object terms.
+
+    Args:
+        line: Line without surrounding whitespace, ending with ``.``
+
+    Returns:
+        tuple: (subject, predicate, object) in N-Triples syntax
+
+    Raises:
+        ValueError: If the line is not a triple
+    """
+    if not line.endswith('.'):
+        raise ValueError(f"Not an N-Triples statement: {line!r}")
+
+    parts = line[:-1].split(None, 2)
+    if len(parts) != 3:
+        raise ValueError(f"Not an N-Triples statement: {line!r}")
+
+    subject, predicate, obj = parts
+    return subject, predicate, obj.rstrip()
+
+
+def iter_sorted_triples(source: IO[str], name: str = 'input') -> Iterator[Tuple[str, str, str, str]]:
+    """
+    Read the distinct triples of a sorted N-Triples stream.
+
+    Blank lines and comments are skipped and consecutive duplicates are dropped.
+
+    Args:
+        source: Text stream of N-Triples lines
+        name: Name of the stream used in error messages
+
+    Yields:
+        Tuples (line, subject, predicate, object) where ``line`` is the canonical
+        ``<s> <p> <o> .`` form the order is checked against
+
+    Raises:
+        ValueError: If the stream is not sorted
+    """
+    previous = None
+    for number, raw_line in enumerate(source, start=1):
+        raw_line = raw_line.strip()
+        if not raw_line or raw_line.startswith('#'):
+            continue
+
+        subject, predicate, obj = split_ntriples_line(raw_line)
+        line = f"{subject} {predicate} {obj} ."
+        if previous is not None and line <= previous:
+            if line == previous:
+                continue
+            raise ValueError(
+                f"{name} is not sorted (line {number}). Streaming evaluation needs N-Triples sorted in byte order: "
+                f"run it through `python automap/converters/ntriples.py` or `LC_ALL=C sort -u`."
+            )
+        previous = line
+        yield line, subject, predicate, obj
+
+
+class StreamingEvaluator:
+    """
+    Merge-join evaluation of two sorted N-Triples files.
+
+    Memory holds the current line of each file plus the per-predicate counters;
+    object counts go through temporary files, one partition at a time.
+    """
+
+    def __init__(self, test_source: Union[str, Path, IO[str]], reference_source: Union[str, Path, IO[str]],
+                 object_partitions: int = OBJECT_PARTITIONS):
+        """
+        Initialize the streaming evaluator.
+
+        Args:
+            test_source: Path or text stream of the sorted N-Triples to evaluate
+            reference_source: Path or text stream of the sorted ground truth N-Triples
+            object_partitions: Number of spilled runs used to count objects
+        """
+        self.test_source = test_source
+        self.reference_source = reference_source
+        self.object_partitions = object_partitions
+        self.test_size = None
+        self.reference_size = None
+
+    @staticmethod
+    def _open(source, stack: ExitStack) -> IO[str]:
+        if isinstance(source, (str, Path)):
+            return stack.enter_context(open(source, 'r', encoding='utf-8'))
+        return source
+
+    @staticmethod
+    def _tagged(triples: Iterator[tuple], side: int) -> Iterator[tuple]:
+        for line, subject, predicate, obj in triples:
+            yield line, side, subject, predicate, obj
+
+    def evaluate(self) -> dict:
+        """
+        Run the streaming metrics.
+
+        Returns:
+            dict: 'triples_exact', 'subjects_exact', 'predicates_exact' and 'objects_exact'
+            metrics (tp/fp/fn/p/r/f1).
+            The numbers of distinct triples read are left in ``test_size`` and ``reference_size``
+        """
+        with tempfile.TemporaryDirectory(prefix='automap-objects-') as spill_dir, ExitStack() as stack:
+            test = iter_sorted_triples(self._open(self.test_source, stack), 'Test graph')
+            reference = iter_sorted_triples(self._open(self.reference_source, stack), 'Reference graph')
+
+            runs = [[stack.enter_context(open(Path(spill_dir) / f"{side}-{i}", 'w', encoding='utf-8'))
+                     for i in range(self.object_partitions)] for side in (TEST, REFERENCE)]
+
+            triples = [0, 0, 0]
+            subjects = [0, 0, 0]
+            predicates = (Counter(), Counter())
+
+            # Equal lines, and all lines of a subject, are adjacent in the merged order
+            current_line, line_sides = None, 0
+            current_subject, subject_sides = None, 0
+            merged = heapq.merge(self._tagged(test, TEST), self._tagged(reference, REFERENCE))
+            for line, side, subject, predicate, obj in merged:
+                if line != current_line:
+                    self._close_group(triples, line_sides)
+                    current_line, line_sides = line, 0
+                line_sides |= 1 << side
+
+                if subject != current_subject:
+                    self._close_group(subjects, subject_sides)
+                    current_subject, subject_sides = subject, 0
+                subject_sides |= 1 << side
+
+                predicates[side][predicate] += 1
+                runs[side][hash(obj) % self.object_partitions].write(obj + '\n')
+
+            self._close_group(triples, line_sides)
+            self._close_group(subjects, subject_sides)
+
+            for side_runs in runs:
+                for run in side_runs:
+                    run.close()
+            objects = self._count_objects(Path(spill_dir))
+
+        self.test_size, self.reference_size = predicate_counts = [sum(counter.values()) for counter in predicates]
+        predicate_tp = sum((predicates[TEST] & predicates[REFERENCE]).values())
+
+        return {
+            'triples_exact': calculate_metrics(*triples),
+            'subjects_exact': calculate_metrics(*subjects),
+            'predicates_exact': calculate_metrics(
+                predicate_tp, predicate_counts[TEST] - predicate_tp, predicate_counts[REFERENCE] - predicate_tp, 0
+            ),
+            'objects_exact': calculate_metrics(*objects),
+        }
+
+    @staticmethod
+    def _close_group(counts: list, sides: int) -> None:
+        """Add a finished key group to the [tp, fp, fn] counts according to the sides it was seen in."""
+        if sides == 3:
+            counts[0] += 1
+        elif sides == 1 << TEST:
+            counts[1] += 1
+        elif sides == 1 << REFERENCE:
+            counts[2] += 1
+
+    def _count_objects(self, spill_dir: Path) -> list:
+        """Multiset overlap of the spilled objects, as [tp, fp, fn]."""
+        tp = test_total = reference_total = 0
+        for i in range(self.object_partitions):
+            with open(spill_dir / f"{TEST}-{i}", 'r', encoding='utf-8') as f:
+                test_objects = Counter(f)
+            with open(spill_dir / f"{REFERENCE}-{i}", 'r', encoding='utf-8') as f:
+                reference_objects = Counter(f)
+
+            tp += sum((test_objects & reference_objects).values())
+            test_total += sum(test_objects.values())
+            reference_total += sum(reference_objects.values())
+
+        return [tp, test_total - tp, reference_total - tp]
+
@@ -0,0 +1,339 @@
+"""
+Term Dictionary
+
+This module provides a shared dictionary that interns RDF terms into
+integer identifiers, so metrics can compare compact integer triples
+instead of re-stringifying rdflib terms and concatenating keys.
+
+Two identifier spaces are kept:
+- term ids: one per distinct RDF term (kind, lexical form, datatype, language)
+- lexical ids: one per distinct string form (``str(term)``), used by the
+  metrics that historically compared terms through ``str()``
+"""
+
+from array import array
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import cached_property
+from typing import Iterator, Optional, Tuple
+from rdflib import BNode, Graph, Literal, URIRef
+from automap.utils.matching import SubstringMatcher
+
+URI = 0
+BNODE = 1
+LITERAL = 2
+
+NO_DATATYPE = -1
+
+
+class EncodedGraph:
+    """
+    Integer-encoded view of an RDF graph.
+
+    Triples are stored as three parallel columns of term ids that index
+    into the owning TermDictionary. Columns are ``array('q')`` or, for
+    memory-mapped graph indexes, integer memoryviews.
+    """
+
+    def __init__(self, terms: 'TermDictionary', subjects: array, predicates: array, objects: array):
+        self.terms = terms
+        self.subjects = subjects
+        self.predicates = predicates
+        self.objects = objects
+
+    def __len__(self) -> int:
+        return len(self.subjects)
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int]]:
+        return zip(self.subjects, self.predicates, self.objects)
+
+    @cached_property
+    def subject_id_matcher(self) -> SubstringMatcher:
+        """
+        Matcher over the IDs (last path segment) of the distinct subjects.
+
+        Built once per graph and used to test whether an IRI contains the ID of
+        any of these subjects.
+        """
+        text = self.terms.text
+        return SubstringMatcher(sorted(set([text(s).split("/")[-1] for s in set(self.subjects)])))
+
+    @cached_property
+    def predicate_partitions(self) -> dict:
+        """
+        Triples grouped by predicate, built once per graph.
+
+        Returns:
+            dict: Predicate lexical id -> EncodedGraph holding only that predicate's triples
+        """
+        lexical = self.terms.lexical
+        columns = defaultdict(lambda: (array('q'), array('q'), array('q')))
+        for s, p, o in self:
+            subjects, predicates, objects = columns[lexical[p]]
+            subjects.append(s)
+            predicates.append(p)
+            objects.append(o)
+
+        return {
+            predicate: EncodedGraph(self.terms, subjects, predicates, objects)
+            for predicate, (subjects, predicates, objects) in columns.items()
+        }
+
+    @cached_property
+    def predicate_statistics(self) -> dict:
+        """
+        Per-predicate usage statistics, computed in one traversal (see statistics.py).
+
+        Returns:
+            dict: Predicate lexical id -> PredicateStatistics
+        """
+        # Deferred import: statistics.py depends on this module
+        from .statistics import build_predicate_statistics
+        return build_predicate_statistics(self)
+
+    def statistics(self, predicate: str):
+        """Return the PredicateStatistics of a predicate IRI, or None if it is not used."""
+        return self.predicate_statistics.get(self.terms.find_lexical(predicate))
+
+    def iter_texts(self) -> Iterator[Tuple[str, str, str]]:
+        """Iterate over the triples as (subject, predicate, object) string forms."""
+        text = self.terms.text
+        for s, p, o in self:
+            yield text(s), text(p), text(o)
+
+    @cached_property
+    def graph(self) -> Graph:
+        """
+        The triples as an rdflib Graph, built on first access.
+
+        Only needed by code paths that run SPARQL (e.g. custom queries) over
+        graphs that were loaded directly into term ids.
+        """
+        graph = Graph()
+        rdf_term = self.terms.rdf_term
+        graph.addN((rdf_term(s), rdf_term(p), rdf_term(o), graph) for s, p, o in self)
+        return graph
+
+    def partition(self, predicate: str) -> 'EncodedGraph':
+        """Return the triples whose predicate IRI is ``predicate`` (an empty graph if there are none)."""
+        partition = self.predicate_partitions.get(self.terms.find_lexical(predicate))
+        if partition is None:
+            return EncodedGraph(self.terms, array('q'), array('q'), array('q'))
+        return partition
+
+
+class TermDictionary:
+    """
+    Shared dictionary interning RDF terms and their string forms into integers.
+
+    A single instance is meant to be shared by every metric of an evaluation,
+    so that identical terms of the test and reference graphs receive the same id.
+    """
+
+    def __init__(self):
+        self.term_ids = {}
+        self.keys = []
+        self.kinds = array('b')
+        self.lexical = array('q')
+        self.datatypes = array('q')
+
+        self.lexical_ids = {}
+        self.lexicals = []
+
+        # Number of documents whose blank node labels were scoped by new_bnode_scope
+        self.bnode_scopes = 0
+
+        self._encoded = {}
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    @classmethod
+    def restore(cls, keys: list, kinds: array, lexical: array, datatypes: array, lexicals: list,
+                bnode_scopes: int = 0) -> 'TermDictionary':
+        """
+        Rebuild a dictionary from its saved columns (e.g. a graph index).
+
+        Args:
+            keys: Term keys, indexed by term id
+            kinds: Term kinds, indexed by term id
+            lexical: Lexical ids, indexed by term id
+            datatypes: Datatype lexical ids (NO_DATATYPE for non-literals), indexed by term id
+            lexicals: Strings, indexed by lexical id
+            bnode_scopes: Number of blank node scopes already used
+        """
+        terms = cls()
+        terms.bnode_scopes = bnode_scopes
+        terms.keys = keys
+        terms.term_ids = dict(zip(keys, range(len(keys))))
+        terms.kinds = kinds
+        terms.lexical = lexical
+        terms.datatypes = datatypes
+        terms.lexicals = lexicals
+        terms.lexical_ids = dict(zip(lexicals, range(len(lexicals))))
+        return terms
+
+    @staticmethod
+    def term_key(term) -> tuple:
+        """Build the hashable key identifying an rdflib term."""
+        if isinstance(term, Literal):
+            datatype = str(term.datatype) if term.datatype is not None else None
+            return LITERAL, str(term), datatype, term.language
+        if isinstance(term, URIRef):
+            return URI, str(term), None, None
+        return BNODE, str(term), None, None
+
+    @staticmethod
+    def key_term(key: tuple):
+        """Rebuild the rdflib term identified by a key from ``term_key``."""
+        kind, text, datatype, language = key
+        if kind == LITERAL:
+            return Literal(text, lang=language, datatype=URIRef(datatype) if datatype is not None else None)
+        if kind == URI:
+            return URIRef(text)
+        return BNode(text)
+
+    def new_bnode_scope(self) -> str:
+        """
+        Return a fresh prefix for the blank node labels of a document.
+
+        Blank node labels are local to their document, so each loaded document
+        gets its own scope and equal labels of different documents never match.
+        """
+        scope = f"b{self.bnode_scopes}"
+        self.bnode_scopes += 1
+        return scope
+
+    @contextmanager
+    def checkpoint(self) -> Iterator['TermDictionary']:
+        """
+        Forget every term and string interned inside the ``with`` block on exit.
+
+        Lets several graphs be evaluated in turn against the same (gold) graph:
+        each one starts from the same term ids, and the terms of the previous
+        ones do not pile up in the dictionary.
+        """
+        state = self._state()
+        try:
+            yield self
+        finally:
+            self._restore(state)
+
+    @contextmanager
+    def rollback_on_error(self) -> Iterator['TermDictionary']:
+        """
+        Forget every term and string interned inside the ``with`` block if it raises.
+
+        Lets a loader give up on a document half way through (e.g. to parse it
+        again with rdflib) without leaving the terms it had read behind.
+        """
+        state = self._state()
+        try:
+            yield self
+        except BaseException:
+            self._restore(state)
+            raise
+
+    def _state(self) -> tuple:
+        return len(self.keys), len(self.lexicals), self.bnode_scopes, set(self._encoded)
+
+    def _restore(self, state: tuple) -> None:
+        size, lexical_size, bnode_scopes, encoded = state
+        for key in self.keys[size:]:
+            del self.term_ids[key]
+        for text in self.lexicals[lexical_size:]:
+            del self.lexical_ids[text]
+        del self.keys[size:]
+        del self.kinds[size:]
+        del self.lexical[size:]
+        del self.datatypes[size:]
+        del self.lexicals[lexical_size:]
+        self.bnode_scopes = bnode_scopes
+        self._encoded = {key: value for key, value in self._encoded.items() if key in encoded}
+
+    def lexical_id(self, text: str) -> int:
+        """Intern a string and return its lexical id."""
+        lexical_id = self.lexical_ids.get(text)
+        if lexical_id is None:
+            lexical_id = len(self.lexicals)
+            self.lexical_ids[text] = lexical_id
+            self.lexicals.append(text)
+        return lexical_id
+
+    def find_lexical(self, text: str) -> Optional[int]:
+        """Return the lexical id of a string without interning it."""
+        return self.lexical_ids.get(text)
+
+    def key_id(self, key: tuple) -> int:
+        """Intern a term key (see ``term_key``) and return its term id."""
+        term_id = self.term_ids.get(key)
+        if term_id is None:
+            kind, text, datatype, _ = key
+            term_id = len(self.kinds)
+            self.term_ids[key] = term_id
+            self.keys.append(key)
+            self.kinds.append(kind)
+            self.lexical.append(self.lexical_id(text))
+            if kind == LITERAL:
+                self.datatypes.append(self.lexical_id(str(datatype)))
+            else:
+                self.datatypes.append(NO_DATATYPE)
+        return term_id
+
+    def term_id(self, term) -> int:
+        """Intern an rdflib term and return its term id."""
+        return self.key_id(self.term_key(term))
+
+    def find(self, term) -> Optional[int]:
+        """Return the term id of an rdflib term without interning it."""
+        return self.term_ids.get(self.term_key(term))
+
+    def rdf_term(self, term_id: int):
+        """Rebuild the rdflib term of a term id."""
+        return self.key_term(self.keys[term_id])
+
+    def text(self, term_id: int) -> str:
+        """Return the string form (``str(term)``) of a term id."""
+        return self.lexicals[self.lexical[term_id]]
+
+    def decode(self, lexical_ids) -> list:
+        """Decode lexical ids into their strings."""
+        lexicals = self.lexicals
+        return [lexicals[lexical_id] for lexical_id in lexical_ids]
+
+    def decode_terms(self, term_ids) -> list:
+        """Decode term ids into their string forms."""
+        return [self.text(term_id) for term_id in term_ids]
+
+    def decode_pairs(self, pairs) -> list:
+        """Decode lexical id pairs into the concatenated strings reported in results."""
+        lexicals = self.lexicals
+        return [lexicals[first] + lexicals[second] for first, second in pairs]
+
+    def encode_graph(self, graph: Graph) -> EncodedGraph:
+        """
+        Encode every triple of a graph into term ids.
+
+        Encodings are cached per graph object, so sharing the dictionary between
+        metric classes does not traverse the same graph twice. Graphs are
+        assumed not to change once encoded. Graphs already encoded with this
+        dictionary (e.g. by ``load_ntriples``) are returned as they are.
+        """
+        if isinstance(graph, EncodedGraph):
+            if graph.terms is not self:
+                raise ValueError("Encoded graph belongs to a different TermDictionary")
+            return graph
+
+        cached = self._encoded.get(id(graph))
+        if cached is not None and cached[0] is graph:
+            return cached[1]
+
+        subjects, predicates, objects = array('q'), array('q'), array('q')
+        for s, p, o in graph:
+            subjects.append(self.term_id(s))
+            predicates.append(self.term_id(p))
+            objects.append(self.term_id(o))
+
+        encoded = EncodedGraph(self, subjects, predicates, objects)
+        self._encoded[id(graph)] = (graph, encoded)
+        return encoded
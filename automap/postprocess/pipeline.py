@@ -0,0 +1,221 @@
+"""In-process mapping pipeline.
+
+Chains the steps the experiment scripts run as separate processes, without
+passing the generated graph around as text:
+
+1. ``Map2RML`` translates a YARRRML mapping to RML (RML mappings are used as is)
+2. the mapping is materialised, in-process when ``rml_engine`` supports it
+   (straight into term ids), with RMLMapper otherwise
+3. ``GraphEvaluator`` compares the graph with the gold graph
+
+Graph files are memory-mapped by the N-Triples loader, and every file the
+pipeline keeps (mapping, graph, results) is written next to its destination
+and renamed into place.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+
+from automap.converters.map2rml import YARRRML_SUFFIXES, Map2RML, TranslationError, _write_text
+from automap.converters.rml2graph import MappingError, map2graph
+from automap.converters.rml_engine import UnsupportedMapping, materialize_encoded
+from automap.grapheval.compute_metrics import compute_metrics, write_results
+from automap.grapheval.metrics import EncodedGraph, load_graph, open_graph
+from automap.utils.config import Config
+
+
+def run_pipeline(
+    mapping: Path,
+    gold_graph: Path,
+    config: Config | Path,
+    *,
+    exp_dir: Path | None = None,
+    ontology: Path | None = None,
+    headers: Path | None = None,
+    rmlmapper: Path | None = None,
+    in_process: bool = True,
+    only_common: bool = False,
+    only_in_domain: bool = False,
+    metrics: list[str] | None = None,
+    workers: int | None = None,
+    compact: bool = False,
+) -> dict:
+    """
+    Translate, materialise and evaluate a mapping.
+
+    Args:
+        mapping: YARRRML (``.yml``/``.yaml``) or RML mapping; relative sources are
+            resolved against its directory
+        gold_graph: Gold graph, opened through its index when up to date
+        config: Evaluation configuration, or the path to it
+        exp_dir: Directory receiving ``mapping.rml.ttl``, ``graph.nt`` and
+            ``eval_results.json`` (default: nothing is kept)
+        ontology: Ontology path passed to the mapping (``@{ontology}``)
+        headers: Headers path passed to the mapping (``@{headers}``)
+        rmlmapper: Path to the rmlmapper jar (default: ``RMLMAPPER_JAR``)
+        in_process: Materialise simple CSV mappings without RMLMapper (see rml_engine)
+        only_common: Evaluate only common metrics
+        only_in_domain: Evaluate only in domain metrics
+        metrics: Names of the metrics to compute (default: all of them)
+        workers: Number of worker processes for loading and evaluation (optional)
+        compact: Write only counts and scores to ``eval_results.json``
+
+    Returns:
+        dict: Evaluation results, as computed by ``compute_metrics``
+    """
+
+    mapping = Path(mapping).resolve()
+    gold = open_graph(gold_graph, workers)
+    config = config if isinstance(config, Config) else Config(config)
+
+    with tempfile.TemporaryDirectory(prefix="automap-pipeline-") as tmpdir:
+        rml_path = mapping
+        temporary_rml = None
+        is_yarrrml = mapping.suffix.lower() in YARRRML_SUFFIXES
+        if not is_yarrrml:
+            rml_mapping = mapping.read_text(encoding="utf-8")
+        else:
+            try:
+                rml_mapping = Map2RML()(mapping.read_text(encoding="utf-8")) or ""
+            except TranslationError:
+                # The YARRRML mapping is invalid: reported as NoTriples
+                rml_mapping = ""
+
+        if exp_dir is not None and rml_mapping:
+            kept_rml = Path(exp_dir) / "mapping.rml.ttl"
+            if kept_rml.resolve() != mapping:
+                _write_text(kept_rml, rml_mapping)
+
+        if is_yarrrml:
+            if exp_dir is not None and Path(exp_dir).resolve() == mapping.parent:
+                rml_path = Path(exp_dir) / "mapping.rml.ttl"
+            else:
+                # Run next to the YARRRML mapping, so that relative sources resolve against its directory
+                fd, name = tempfile.mkstemp(dir=mapping.parent, prefix=f".{mapping.stem}.", suffix=".rml.ttl")
+                os.close(fd)
+                rml_path = temporary_rml = Path(name)
+                if rml_mapping:
+                    _write_text(rml_path, rml_mapping)
+
+        try:
+            results = _evaluate(
+                rml_path, rml_mapping, gold, config, Path(exp_dir or tmpdir) / "graph.nt",
+                direct=exp_dir is None, ontology=ontology, headers=headers, rmlmapper=rmlmapper,
+                in_process=in_process, only_common=only_common, only_in_domain=only_in_domain,
+                metrics=metrics, workers=workers,
+            )
+        finally:
+            if temporary_rml is not None:
+                temporary_rml.unlink(missing_ok=True)
+
+    if exp_dir is not None:
+        write_results(results, Path(exp_dir) / "eval_results.json", compact)
+    return results
+
+
+def _evaluate(
+    rml_path: Path,
+    rml_mapping: str,
+    gold: EncodedGraph,
+    config: Config,
+    graph_path: Path,
+    *,
+    direct: bool,
+    ontology: Path | None,
+    headers: Path | None,
+    rmlmapper: Path | None,
+    in_process: bool,
+    only_common: bool,
+    only_in_domain: bool,
+    metrics: list[str] | None,
+    workers: int | None,
+) -> dict:
+    """Materialise the RML mapping (into ``graph_path`` unless ``direct``) and evaluate it."""
+
+    pred = None
+    if rml_mapping:
+        parameters = {name: str(Path(path).resolve())
+                      for name, path in (("ontology", ontology), ("headers", headers)) if path}
+        if in_process and direct:
+            try:
+                pred = materialize_encoded(rml_path, gold.terms, parameters)
+            except UnsupportedMapping:
+                pass
+
+        if pred is None:
+            try:
+                map2graph(
+                    rml_path,
+                    ontology=ontology,
+                    headers=headers,
+                    output=graph_path,
+                    serialization="nquads",
+                    rmlmapper=rmlmapper,
+                    in_process=in_process,
+                )
+                pred = load_graph(graph_path, gold.terms, workers)
+            except MappingError:
+                # The mapping failed or produced no triples: reported as NoTriples
+                pass
+
+    if pred is None:
+        pred = EncodedGraph(gold.terms, array("q"), array("q"), array("q"))
+
+    return compute_metrics(gold, pred, config, rml_mapping, only_common, only_in_domain, workers, metrics)
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Translate, materialise and evaluate a mapping in one process"
+    )
+    parser.add_argument("mapping", type=Path, help="Path to the YARRRML or RML mapping")
+    parser.add_argument("--gold_graph", type=Path, required=True, help="Path to the gold graph")
+    parser.add_argument("--config", type=Path, required=True, help="Path to the evaluation configuration")
+    parser.add_argument(
+        "--exp_dir",
+        type=Path,
+        help="Directory to keep mapping.rml.ttl, graph.nt and eval_results.json in",
+    )
+    parser.add_argument("--ontology", type=Path, help="Path to the ontology file (mapping parameter)")
+    parser.add_argument("--headers", type=Path, help="Path to the data headers (mapping parameter)")
+    parser.add_argument("--rmlmapper", type=Path, help="Path to the rmlmapper.jar. Overrides RMLMAPPER_JAR")
+    parser.add_argument(
+        "--no-in-process",
+        action="store_true",
+        help="Always materialise with RMLMapper",
+    )
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--only_common", action="store_true", help="Evaluate only common metrics")
+    group.add_argument("--only_in_domain", action="store_true", help="Evaluate only in domain metrics")
+    parser.add_argument("--workers", type=int, help="Number of worker processes")
+    parser.add_argument("--compact", action="store_true", help="Leave the detail lists out of the results")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+
+    results = run_pipeline(
+        args.mapping,
+        args.gold_graph,
+        args.config,
+        exp_dir=args.exp_dir,
+        ontology=args.ontology,
+        headers=args.headers,
+        rmlmapper=args.rmlmapper,
+        in_process=not args.no_in_process,
+        only_common=args.only_common,
+        only_in_domain=args.only_in_domain,
+        workers=args.workers,
+        compact=args.compact,
+    )
+    write_results(results, sys.stdout, args.compact)
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry point
+    sys.exit(main())
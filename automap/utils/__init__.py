@@ -1,8 +1,11 @@
 from .config import Config
 from .eval_extractor import get_common, get_in_domain
+from .matching import SubstringMatcher
+from .results import split_details, merge_details, dump_json, load_json
 from .scores import (
     calculate_metrics,
     overlapping_lists,
+    multiset_overlap,
     average,
     precision_score,
     recall_score,
@@ -13,10 +16,16 @@ __all__ = [
     'Config',
     'calculate_metrics',
     'overlapping_lists',
+    'multiset_overlap',
     'average',
     'precision_score',
     'recall_score',
     'f1_score',
     'get_common',
     'get_in_domain',
+    'SubstringMatcher',
+    'split_details',
+    'merge_details',
+    'dump_json',
+    'load_json',
 ]
@@ -9,7 +9,7 @@ import yaml
 import json
 import hashlib
 from pathlib import Path
-from typing import Dict, List, Union, Optional
+from typing import Dict, List, Tuple, Union, Optional
 
 
 class Config:
@@ -44,6 +44,12 @@ class Config:
         self.ids_by_type: Dict[str, List[str]] = config_data.get('ids_by_type', {})
         self.property_suffixes: List[str] = config_data.get('property_suffixes', [])
 
+        # Key extractors used to align test subjects with reference subjects (see HierarchyScorer)
+        self.subject_alignment_keys: List[str] = config_data.get('subject_alignment_keys', ['last_segment'])
+
+        # Score base for test classes/properties more specific than the reference (base^distance, 0.0 disables)
+        self.descendant_similarity_decay: float = config_data.get('descendant_similarity_decay', 0.0)
+
         # Namespaces and predicates can be auto-extracted from ontology if not provided
         self.namespaces: Dict[str, str] = config_data.get('namespaces', {})
         self.predicates_to_evaluate_config: Dict[str, List[str]] = config_data.get('predicates_to_evaluate', {})
@@ -80,7 +86,7 @@ class Config:
         3. Grouping IDs by their entity type
 
         Args:
-            reference_graph: rdflib.Graph containing the reference/gold graph
+            reference_graph: rdflib.Graph containing the reference/gold graph (or any iterable of triples)
         """
         if self.ids_by_type:
             # Already populated from config, don't override
@@ -219,9 +225,33 @@ class Config:
             ontology_graph: rdflib.Graph containing the ontology
             ontology_path: Path to the ontology file (for caching)
         """
-        from rdflib import OWL, RDF, RDFS
-        from rdflib.namespace import NamespaceManager
+        from rdflib import OWL, RDF
+
+        if self.namespaces and self.predicates_to_evaluate_config:
+            return
 
+        namespaces = [(prefix, str(namespace)) for prefix, namespace in ontology_graph.namespaces()]
+
+        # Query for all DatatypeProperty and ObjectProperty
+        property_types = [OWL.DatatypeProperty, OWL.ObjectProperty]
+        properties = [str(prop) for prop_type in property_types
+                      for prop in ontology_graph.subjects(RDF.type, prop_type)]
+
+        self.extract_from_declarations(namespaces, properties, ontology_path=ontology_path)
+
+    def extract_from_declarations(self, namespaces: List[Tuple[str, str]], properties: List[str],
+                                  ontology_path: Optional[str] = None) -> None:
+        """
+        Extract namespaces and predicates from already collected ontology declarations.
+
+        Same as ``extract_from_ontology`` but without needing the ontology graph
+        (e.g. when the declarations come from a cached ontology snapshot).
+
+        Args:
+            namespaces: (prefix, namespace IRI) bindings declared by the ontology
+            properties: IRIs of the ontology's DatatypeProperty and ObjectProperty, in declaration order
+            ontology_path: Path to the ontology file (for caching)
+        """
         # If already provided in config, don't extract (but we might still need to parse for other reasons)
         needs_extraction = not (self.namespaces and self.predicates_to_evaluate_config)
 
@@ -252,7 +282,7 @@ class Config:
         # Extract namespaces from ontology if not provided in config
         if not self.namespaces:
             self.namespaces = {}
-            for prefix, namespace in ontology_graph.namespaces():
+            for prefix, namespace in namespaces:
                 if prefix and prefix not in ['', 'xml', 'rdf', 'rdfs', 'xsd', 'owl']:
                     self.namespaces[prefix] = str(namespace)
 
@@ -260,25 +290,19 @@ class Config:
         if not self.predicates_to_evaluate_config:
             predicates_by_namespace = {}
 
-            # Query for all DatatypeProperty and ObjectProperty
-            property_types = [OWL.DatatypeProperty, OWL.ObjectProperty]
-
-            for prop_type in property_types:
-                for prop in ontology_graph.subjects(RDF.type, prop_type):
-                    prop_uri = str(prop)
-
-                    # Find which namespace this property belongs to
-                    for prefix, namespace in self.namespaces.items():
-                        if prop_uri.startswith(namespace):
-                            # Extract the local name (suffix)
-                            local_name = prop_uri[len(namespace):]
+            for prop_uri in properties:
+                # Find which namespace this property belongs to
+                for prefix, namespace in self.namespaces.items():
+                    if prop_uri.startswith(namespace):
+                        # Extract the local name (suffix)
+                        local_name = prop_uri[len(namespace):]
 
-                            if prefix not in predicates_by_namespace:
-                                predicates_by_namespace[prefix] = []
+                        if prefix not in predicates_by_namespace:
+                            predicates_by_namespace[prefix] = []
 
-                            if local_name not in predicates_by_namespace[prefix]:
-                                predicates_by_namespace[prefix].append(local_name)
-                            break
+                        if local_name not in predicates_by_namespace[prefix]:
+                            predicates_by_namespace[prefix].append(local_name)
+                        break
 
             self.predicates_to_evaluate_config = predicates_by_namespace
 
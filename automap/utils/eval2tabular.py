@@ -1,6 +1,6 @@
 from tkinter.filedialog import test
 from printers import print_title, print_metrics
-from automap.utils import get_in_domain, get_common
+from automap.utils import get_in_domain, get_common, merge_details
 from typing import List
 
 
@@ -23,7 +23,11 @@ class Eval2Tabular:
         self.basic_mark = '$ '
         self.details_mark = '# '
 
-    def __call__(self, eval_json: dict, only_common=False, only_in_domain=False):
+    def __call__(self, eval_json: dict, only_common=False, only_in_domain=False, details: dict = None):
+        # Compact results (compute_metrics --compact) get their term lists back from the details sidecar
+        if details:
+            eval_json = merge_details(eval_json, details)
+
         if only_common:
             self._print_common(eval_json)
         elif only_in_domain:
@@ -72,6 +76,7 @@ if __name__ == "__main__":
     import argparse
     import json
     import sys
+    from automap.utils import load_json
 
     parser = argparse.ArgumentParser()
     group = parser.add_mutually_exclusive_group()
@@ -85,7 +90,17 @@ if __name__ == "__main__":
         action="store_true",
         help="Evaluate only in domain metrics.",
     )
+    parser.add_argument(
+        "--details",
+        type=str,
+        help="Details sidecar written by compute_metrics --details (.json or .json.gz).",
+    )
     args = parser.parse_args()
 
     eval2tabular = Eval2Tabular()
-    eval2tabular(json.loads(sys.stdin.read()), only_common=args.only_common, only_in_domain=args.only_in_domain)
+    eval2tabular(
+        json.loads(sys.stdin.read()),
+        only_common=args.only_common,
+        only_in_domain=args.only_in_domain,
+        details=load_json(args.details) if args.details else None,
+    )
@@ -0,0 +1,129 @@
+"""
+Substring Matching
+
+This module provides an Aho-Corasick automaton to test many patterns
+against a text at once, in time linear in the text length (plus the
+number of reported matches), instead of one ``pattern in text`` scan
+per pattern.
+"""
+
+from collections import deque
+from typing import Iterable, Iterator, List, Set, Tuple
+
+
+class SubstringMatcher:
+    """
+    Aho-Corasick automaton over a fixed list of patterns.
+
+    Patterns are identified by their index in the list given at construction.
+    The empty pattern is supported and, as with ``'' in text``, matches any text.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns: List[str] = list(patterns)
+        self._empty = [index for index, pattern in enumerate(self.patterns) if not pattern]
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            if pattern:
+                self._insert(pattern, index)
+        self._build_links()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _insert(self, pattern: str, index: int) -> None:
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = next_node
+        self._out[node].append(index)
+
+    def _build_links(self) -> None:
+        """Compute failure links, output (dictionary suffix) links and terminal flags breadth-first."""
+        goto, fail, out = self._goto, self._fail, self._out
+        self._dict_link = [-1] * len(goto)
+        self._terminal = [bool(out[node]) for node in range(len(goto))]
+
+        # Children of the root keep the root as failure link
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                queue.append(child)
+
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+
+                suffix = fail[child]
+                self._dict_link[child] = suffix if out[suffix] else self._dict_link[suffix]
+                self._terminal[child] = self._terminal[child] or self._terminal[suffix]
+
+    def _step(self, node: int, char: str) -> int:
+        goto, fail = self._goto, self._fail
+        while node and char not in goto[node]:
+            node = fail[node]
+        return goto[node].get(char, 0)
+
+    def contains_any(self, text: str) -> bool:
+        """Return True if any pattern occurs in ``text``."""
+        if self._empty:
+            return True
+
+        terminal = self._terminal
+        node = 0
+        for char in text:
+            node = self._step(node, char)
+            if terminal[node]:
+                return True
+        return False
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Yield every occurrence of every pattern in ``text``.
+
+        Yields:
+            Tuples (end, pattern_index) where ``text[end - len(pattern):end] == pattern``
+        """
+        for index in self._empty:
+            for end in range(len(text) + 1):
+                yield end, index
+
+        out, dict_link = self._out, self._dict_link
+        node = 0
+        for position, char in enumerate(text, start=1):
+            node = self._step(node, char)
+            match = node if out[node] else dict_link[node]
+            while match > 0:
+                for index in out[match]:
+                    yield position, index
+                match = dict_link[match]
+
+    def find_all(self, text: str) -> Set[int]:
+        """Return the indices of all patterns occurring in ``text``."""
+        found = set(self._empty)
+        if len(found) == len(self.patterns):
+            return found
+
+        terminal, out, dict_link = self._terminal, self._out, self._dict_link
+        node = 0
+        for char in text:
+            node = self._step(node, char)
+            if not terminal[node]:
+                continue
+            match = node if out[node] else dict_link[node]
+            while match > 0:
+                found.update(out[match])
+                match = dict_link[match]
+        return found
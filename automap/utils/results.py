@@ -0,0 +1,103 @@
+"""
+Evaluation Results I/O
+
+Helpers to write evaluation results as JSON without first building the whole
+document as one string, and to split the detail lists of the results (test
+and reference terms, alignments, detailed scores) from their counts and
+scores, so that the lists can go to a separate gzip-compressed sidecar.
+"""
+
+import gzip
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import IO, Tuple, Union
+
+
+def split_details(results: dict) -> Tuple[dict, dict]:
+    """
+    Split results into their compact part and their detail lists.
+
+    Args:
+        results: Evaluation results (nested dicts)
+
+    Returns:
+        tuple: (results without any list, nested dict holding only the lists)
+    """
+    compact, details = {}, {}
+    for key, value in results.items():
+        if isinstance(value, list):
+            details[key] = value
+        elif isinstance(value, dict):
+            compact[key], value_details = split_details(value)
+            if value_details:
+                details[key] = value_details
+        else:
+            compact[key] = value
+    return compact, details
+
+
+def merge_details(results: dict, details: dict) -> dict:
+    """
+    Merge detail lists (from split_details) back into compact results.
+
+    Args:
+        results: Compact (or full) evaluation results
+        details: Detail lists
+
+    Returns:
+        dict: Results holding both, with the keys of ``results`` first
+    """
+    merged = dict(results)
+    for key, value in details.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_details(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _open_text(path: Union[str, Path], mode: str, compress: bool) -> IO[str]:
+    if compress:
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def dump_json(data: dict, destination: Union[str, Path, IO[str]]) -> None:
+    """
+    Write data as indented JSON, encoded and written chunk by chunk.
+
+    Args:
+        data: JSON-serializable data
+        destination: Text stream, or path of the file to write. Files are replaced
+            atomically, and gzip-compressed when the name ends with ``.gz``
+    """
+    if not isinstance(destination, (str, Path)):
+        json.dump(data, destination, ensure_ascii=False, indent=2)
+        destination.write('\n')
+        return
+
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=destination.parent, prefix=f".{destination.name}.", suffix='.tmp')
+    os.close(fd)
+    try:
+        # mkstemp creates the file readable by its owner only, give it the default permissions
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+
+        with _open_text(tmp_path, 'w', destination.suffix == '.gz') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        os.replace(tmp_path, destination)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_json(source: Union[str, Path]) -> dict:
+    """Read a JSON file, gzip-compressed if its name ends with ``.gz``."""
+    with _open_text(source, 'r', Path(source).suffix == '.gz') as f:
+        return json.load(f)
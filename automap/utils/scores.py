@@ -5,6 +5,13 @@ This module provides pure mathematical functions for calculating
 evaluation metrics such as precision, recall, and F1-score.
 """
 
+from array import array
+from collections import Counter
+import numpy as np
+
+# Minimum combined size for which integer inputs go through the NumPy path
+NUMPY_OVERLAP_THRESHOLD = 1 << 16
+
 
 def precision_score(tp: int, fp: int) -> float:
     return tp / (tp + fp) if tp + fp > 0 else 0.0
@@ -32,38 +39,65 @@ def calculate_metrics(tp: int, fp: int, fn: int, tn: int = 0) -> dict:
     }
 
 
+def _is_integer_array(values) -> bool:
+    if isinstance(values, np.ndarray):
+        return np.issubdtype(values.dtype, np.integer)
+    if isinstance(values, memoryview):
+        return values.format in ('b', 'B', 'h', 'H', 'i', 'I', 'l', 'L', 'q', 'Q')
+    return isinstance(values, array) and values.typecode in 'bBhHiIlLqQ'
+
+
+def _numpy_multiset_overlap(values1, values2) -> int:
+    unique1, counts1 = np.unique(np.asarray(values1), return_counts=True)
+    unique2, counts2 = np.unique(np.asarray(values2), return_counts=True)
+    _, index1, index2 = np.intersect1d(unique1, unique2, assume_unique=True, return_indices=True)
+    return int(np.minimum(counts1[index1], counts2[index2]).sum())
+
+
+def multiset_overlap(list1, list2) -> int:
+    """
+    Count the elements shared by two multisets (duplicates matched one to one).
+
+    Equivalent to ``len(overlapping_lists(list1, list2))`` without sorting the
+    inputs or materialising the overlap. Large integer arrays (NumPy integer
+    arrays, ``array.array`` or integer memoryviews) are counted with NumPy; anything else is counted
+    with hash-based Counters, so elements only need to be hashable.
+    Time complexity: O(n + m)
+
+    Args:
+        list1: First collection
+        list2: Second collection
+
+    Returns:
+        int: Size of the multiset intersection
+    """
+    if (_is_integer_array(list1) and _is_integer_array(list2)
+            and len(list1) + len(list2) >= NUMPY_OVERLAP_THRESHOLD):
+        return _numpy_multiset_overlap(list1, list2)
+
+    counts1 = Counter(list1)
+    counts2 = Counter(list2)
+    if len(counts1) > len(counts2):
+        counts1, counts2 = counts2, counts1
+
+    return sum(min(count, counts2[element]) for element, count in counts1.items() if element in counts2)
+
+
 def overlapping_lists(list1: list, list2: list) -> list:
     """
-    Find overlapping elements between two lists using a two-pointer approach.
+    Find overlapping elements between two lists (multiset intersection).
 
-    This function sorts both lists and finds common elements efficiently.
-    Time complexity: O(n log n + m log m + n + m)
+    Kept for compatibility; use ``multiset_overlap`` when only the number of
+    matches is needed. Only the overlap is sorted, not the input lists.
 
     Args:
         list1: First list
         list2: Second list
 
     Returns:
-        list: List of overlapping elements
+        list: Sorted list of overlapping elements
     """
-    sorted1 = sorted(list1)
-    sorted2 = sorted(list2)
-
-    overlap = []
-    i = 0
-    j = 0
-
-    while i < len(sorted1) and j < len(sorted2):
-        if sorted1[i] < sorted2[j]:
-            i += 1
-        elif sorted1[i] > sorted2[j]:
-            j += 1
-        else:
-            overlap.append(sorted1[i])
-            i += 1
-            j += 1
-
-    return overlap
+    return sorted((Counter(list1) & Counter(list2)).elements())
 
 
 def average(scores: list) -> float:
@@ -46,6 +46,7 @@ remap="$python $automap/methods/remap/remap.py"
 
 # Evaluation
 compute_metrics="$python $automap/grapheval/compute_metrics.py"
+sort_ntriples="$python $automap/converters/ntriples.py"
 
 # Postprocessing
 map2rml="$python $automap/converters/map2rml.py"
@@ -142,12 +143,9 @@ for scenario in $scenarios; do
         echo "Starting evaluation $(date +"%Y-%m-%d %H:%M:%S")"
         echo "------------------------------------------------------------------------"
 
-        # Temp. It is needed to sort the files. This should be fixed in the code.
-        cat $gold_graph_path | sort > $exp_dir/gold_graph.nt.sorted
-        mv $exp_dir/gold_graph.nt.sorted $exp_dir/gold_graph.nt
-
-        cat $pred_graph_path | sort > $pred_graph_path.sorted
-        mv $pred_graph_path.sorted $pred_graph_path
+        # Canonicalise, sort and de-duplicate both graphs
+        $sort_ntriples $gold_graph_path -o $exp_dir/gold_graph.nt
+        $sort_ntriples $pred_graph_path -o $pred_graph_path
 
         cat $pred_graph_path | $compute_metrics \
             --config $data/../config.yaml \
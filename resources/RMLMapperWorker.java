@@ -0,0 +1,132 @@
+import java.io.BufferedReader;
+import java.io.ByteArrayOutputStream;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.nio.charset.StandardCharsets;
+import java.security.Permission;
+import java.util.ArrayList;
+import java.util.List;
+
+/**
+ * Long-running RMLMapper worker, used by automap/converters/rmlmapper_pool.py.
+ *
+ * Run with the RMLMapper jar on the class path (Java 17+ with the source launcher):
+ *
+ *     java -cp rmlmapper-8.0.0-r378-all.jar RMLMapperWorker.java
+ *
+ * The worker loads the RMLMapper classes once, writes "READY" and then reads one request
+ * per line from stdin: the RMLMapper command-line arguments followed by the directory
+ * relative paths are resolved against, tab-separated, with backslash, tab, carriage return
+ * and newline escaped as \\, \t, \r and \n. Each request is run in this JVM and answered
+ * with one line on stdout: the exit status, a tab and the (escaped) log output of the run.
+ * The worker exits at the end of stdin.
+ */
+public class RMLMapperWorker {
+
+    private static final String MAIN_CLASS = "be.ugent.rml.cli.Main";
+
+    /** Thrown instead of exiting the JVM when the mapper calls System.exit. */
+    private static class ExitTrapped extends SecurityException {
+        final int status;
+
+        ExitTrapped(int status) {
+            super("System.exit(" + status + ")");
+            this.status = status;
+        }
+    }
+
+    @SuppressWarnings("removal")
+    private static void trapExit() {
+        // Only possible up to Java 17; later the worker dies on exit and the caller runs the mapping again
+        try {
+            System.setSecurityManager(new SecurityManager() {
+                @Override
+                public void checkExit(int status) {
+                    throw new ExitTrapped(status);
+                }
+
+                @Override
+                public void checkPermission(Permission permission) {
+                }
+            });
+        } catch (UnsupportedOperationException | SecurityException e) {
+            // Exits are not trapped
+        }
+    }
+
+    private static String escape(String text) {
+        return text.replace("\\", "\\\\").replace("\t", "\\t").replace("\r", "\\r").replace("\n", "\\n");
+    }
+
+    private static List<String> split(String line) {
+        List<String> fields = new ArrayList<>();
+        StringBuilder field = new StringBuilder();
+        for (int i = 0; i < line.length(); i++) {
+            char c = line.charAt(i);
+            if (c == '\t') {
+                fields.add(field.toString());
+                field.setLength(0);
+            } else if (c == '\\' && i + 1 < line.length()) {
+                char next = line.charAt(++i);
+                field.append(next == 't' ? '\t' : next == 'r' ? '\r' : next == 'n' ? '\n' : next);
+            } else {
+                field.append(c);
+            }
+        }
+        fields.add(field.toString());
+        return fields;
+    }
+
+    public static void main(String[] args) throws Exception {
+        // Mapper output must not interleave with the protocol
+        PrintStream protocol = new PrintStream(new FileOutputStream(FileDescriptor.out), true, "UTF-8");
+        PrintStream log = System.err;
+        System.setOut(log);
+
+        Method run;
+        try {
+            run = Class.forName(MAIN_CLASS).getMethod("main", String[].class, String.class);
+        } catch (ClassNotFoundException | NoSuchMethodException e) {
+            // Without the base path entry point, relative sources would resolve against this JVM's directory
+            protocol.println("UNSUPPORTED\t" + escape(e.toString()));
+            return;
+        }
+        trapExit();
+
+        BufferedReader in = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        protocol.println("READY");
+
+        String line;
+        while ((line = in.readLine()) != null) {
+            List<String> fields = split(line);
+            String basePath = fields.remove(fields.size() - 1);
+            String[] mapperArgs = fields.toArray(new String[0]);
+
+            ByteArrayOutputStream output = new ByteArrayOutputStream();
+            PrintStream capture = new PrintStream(output, true, "UTF-8");
+            System.setErr(capture);
+            System.setOut(capture);
+            int status = 0;
+            try {
+                run.invoke(null, mapperArgs, basePath);
+            } catch (InvocationTargetException e) {
+                Throwable cause = e.getCause();
+                if (cause instanceof ExitTrapped) {
+                    status = ((ExitTrapped) cause).status;
+                } else {
+                    cause.printStackTrace(capture);
+                    status = 1;
+                }
+            } finally {
+                capture.flush();
+                System.setErr(log);
+                System.setOut(log);
+            }
+            protocol.println(status + "\t" + escape(output.toString("UTF-8")));
+        }
+    }
+}
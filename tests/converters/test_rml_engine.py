@@ -0,0 +1,77 @@
+"""Conformance cases of the in-process RML engine.
+
+Each directory under ``rml_engine/`` holds a mapping over a small CSV file and
+the canonical N-Triples (``expected.nt``) RMLMapper produces for it. The engine
+must produce the same graph; with ``RMLMAPPER_JAR`` set, RMLMapper itself is
+also run on every case. Mappings under ``rml_engine/unsupported/`` must be left
+to RMLMapper.
+"""
+
+import io
+import os
+from pathlib import Path
+
+import pytest
+
+from automap.converters.ntriples import sort_ntriples
+from automap.converters.rml2graph import map2graph
+from automap.converters.rml_engine import UnsupportedMapping, check_conformance, compile_mapping, materialize
+
+CASES = Path(__file__).parent / "rml_engine"
+SUPPORTED = sorted(case.name for case in CASES.iterdir() if (case / "expected.nt").is_file())
+UNSUPPORTED = sorted(path.name for path in (CASES / "unsupported").glob("*.rml.ttl"))
+
+
+def _canonical(text: str) -> list[str]:
+    output = io.StringIO()
+    sort_ntriples(io.StringIO(text), output)
+    return output.getvalue().splitlines()
+
+
+@pytest.mark.parametrize("case", SUPPORTED)
+def test_in_process_output(case):
+    output = io.StringIO()
+    materialize(CASES / case / "mapping.rml.ttl", output)
+
+    expected = (CASES / case / "expected.nt").read_text(encoding="utf-8")
+    assert _canonical(output.getvalue()) == expected.splitlines()
+
+
+@pytest.mark.parametrize("case", SUPPORTED)
+def test_expected_output_is_canonical(case):
+    expected = (CASES / case / "expected.nt").read_text(encoding="utf-8")
+    assert _canonical(expected) == expected.splitlines()
+
+
+@pytest.mark.parametrize("mapping", UNSUPPORTED)
+def test_unsupported_mapping_is_rejected(mapping):
+    with pytest.raises(UnsupportedMapping):
+        compile_mapping(CASES / "unsupported" / mapping)
+
+
+@pytest.mark.parametrize("mapping", UNSUPPORTED)
+def test_unsupported_mapping_falls_back_to_rmlmapper(mapping, monkeypatch, tmp_path):
+    # Without a jar the fallback fails on the jar lookup, before any output is written
+    monkeypatch.delenv("RMLMAPPER_JAR", raising=False)
+    with pytest.raises(RuntimeError, match="RMLMapper jar"):
+        map2graph(CASES / "unsupported" / mapping, output=tmp_path / "graph.nt", serialization="nquads",
+                  in_process=True)
+    assert not (tmp_path / "graph.nt").exists()
+
+
+@pytest.mark.parametrize("case", SUPPORTED)
+def test_supported_mapping_needs_no_rmlmapper(case, monkeypatch, tmp_path):
+    monkeypatch.delenv("RMLMAPPER_JAR", raising=False)
+    graph = map2graph(CASES / case / "mapping.rml.ttl", output=tmp_path / "graph.nt", serialization="nquads",
+                      in_process=True)
+
+    expected = (CASES / case / "expected.nt").read_text(encoding="utf-8")
+    assert _canonical(graph.read_text(encoding="utf-8")) == expected.splitlines()
+
+
+@pytest.mark.skipif(not os.getenv("RMLMAPPER_JAR"), reason="RMLMAPPER_JAR is not set")
+@pytest.mark.parametrize("case", SUPPORTED)
+def test_rmlmapper_conformance(case):
+    only_in_process, only_rmlmapper = check_conformance(CASES / case / "mapping.rml.ttl")
+    assert not only_in_process
+    assert not only_rmlmapper
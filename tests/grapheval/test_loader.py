@@ -0,0 +1,46 @@
+"""Loading piped graphs, which are read once and fall back to rdflib when they are not N-Triples."""
+
+import io
+
+import pytest
+from rdflib import Graph
+
+from automap.grapheval.metrics import loader
+from automap.grapheval.metrics.loader import load_graph
+from automap.grapheval.metrics.terms import TermDictionary
+
+LINES = [b"<http://e/s%d> <http://e/p> <http://e/o%d> .\n" % (i, i) for i in range(50)]
+NTRIPLES = b"".join(LINES)
+# One Turtle-only statement in the middle of N-Triples lines
+MIXED = b"".join(LINES[:25] + [b"<http://e/x> a <http://e/C> .\n"] + LINES[25:])
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    # Blocks end in the middle of lines, so every block leaves part of a line for the next one
+    monkeypatch.setattr(loader, "PARALLEL_THRESHOLD", 64)
+
+
+def _texts(encoded) -> set:
+    return set(encoded.iter_texts())
+
+
+def _rdflib_texts(data: bytes) -> set:
+    return _texts(TermDictionary().encode_graph(Graph().parse(data=data, format="turtle")))
+
+
+@pytest.mark.parametrize("data", [NTRIPLES, MIXED, b"@prefix e: <http://e/> .\n" + NTRIPLES],
+                         ids=["ntriples", "turtle_statement", "turtle_directive"])
+def test_piped_graph(data, small_blocks):
+    encoded = load_graph(io.BytesIO(data), TermDictionary())
+    assert _texts(encoded) == _rdflib_texts(data)
+
+
+def test_rdflib_fallback_drops_terms_of_ntriples_attempt(small_blocks):
+    terms = TermDictionary()
+    load_graph(io.BytesIO(MIXED), terms)
+
+    reference = TermDictionary()
+    reference.encode_graph(Graph().parse(data=MIXED, format="turtle"))
+    assert len(terms) == len(reference)
+    assert terms.bnode_scopes == 0